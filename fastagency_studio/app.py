@@ -1,6 +1,7 @@
+import asyncio
 import json
 import logging
-from collections.abc import Coroutine
+from collections.abc import AsyncIterator, Coroutine
 from os import environ
 from typing import (
     Annotated,
@@ -13,28 +14,71 @@ from uuid import UUID
 
 import httpx
 import yaml
-from fastapi import BackgroundTasks, Body, FastAPI, HTTPException, Path
+from fastapi import Body, FastAPI, HTTPException, Header, Path
+from fastapi.encoders import jsonable_encoder
 from fastapi.requests import Request
-from fastapi.responses import JSONResponse, Response
-from openai import AsyncAzureOpenAI
+from fastapi.responses import (
+    JSONResponse,
+    ORJSONResponse,
+    Response,
+    StreamingResponse,
+)
 from pydantic import BaseModel, ValidationError
 
 from .auth_token.auth import DeploymentAuthToken, create_deployment_auth_token
+from .chat_names import chat_namer
 from .db.base import DefaultDB, KeyNotFoundError
 from .db.prisma import fastapi_lifespan
 from .helpers import (
+    BulkModel,
     add_model_to_user,
+    add_models_to_user,
     check_model_name_uniqueness_and_raise,
     create_model,
+    delete_models_of_user,
     get_all_models_for_user,
+    invalidate_cached_models,
+    update_models_of_user,
 )
+from .io.fanout import ChatFanOut
+from .io.messages import InputResponseModel, ServerResponseModel
+from .models.deployments.cache import deployment_cache
 from .models.registry import Registry, Schemas
 from .models.toolboxes.toolbox import Toolbox
+from .tracing import configure_tracing, extract_context, start_span
 
 logging.basicConfig(level=logging.INFO)
 
 
-app = FastAPI(lifespan=fastapi_lifespan)
+def get_default_response_class() -> type[JSONResponse]:
+    """Return ORJSONResponse if orjson is installed, JSONResponse otherwise.
+
+    orjson serializes UUIDs and datetimes natively and is considerably faster than
+    the standard library for large responses such as the list of all user models.
+    """
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        return JSONResponse
+
+    return ORJSONResponse
+
+
+DefaultResponse = get_default_response_class()
+
+app = FastAPI(lifespan=fastapi_lifespan, default_response_class=DefaultResponse)
+
+
+def render_json(content: Any) -> Response:
+    """Render content with the default response class.
+
+    Returning the response directly skips response model validation and, with orjson,
+    the jsonable_encoder pass as well.
+    """
+    if DefaultResponse is ORJSONResponse:
+        return ORJSONResponse(content)
+
+    return JSONResponse(jsonable_encoder(content))
 
 
 @app.middleware("http")
@@ -47,10 +91,52 @@ async def handle_keynotfounderror_middleware(
         return JSONResponse(status_code=404, content={"detail": e.args[0]})
 
 
-@app.get("/models/schemas")
-async def get_models_schemas() -> Schemas:
-    schemas = Registry.get_default().get_schemas()
-    return schemas
+configure_tracing("fastagency-studio-api")
+
+
+@app.middleware("http")
+async def tracing_middleware(
+    request: Request, call_next: Callable[[Request], Coroutine[Any, Any, Response]]
+) -> Response:
+    # continue the trace started by the client, e.g. the Wasp app
+    with start_span(
+        request.method,
+        context=extract_context(request.headers),
+        **{"http.method": request.method, "http.target": request.url.path},
+    ) as span:
+        response = await call_next(request)
+
+        if span is not None:
+            route = request.scope.get("route")
+            if route is not None:
+                span.update_name(f"{request.method} {route.path}")
+            span.set_attribute("http.status_code", response.status_code)
+
+        return response
+
+
+SCHEMAS_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if if_none_match is None:
+        return False
+
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+@app.get("/models/schemas", response_model=Schemas)
+async def get_models_schemas(
+    if_none_match: Annotated[Optional[str], Header()] = None,
+) -> Response:
+    content, etag = Registry.get_default().get_schemas_json()
+    headers = {"ETag": etag, "Cache-Control": SCHEMAS_CACHE_CONTROL}
+
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=content, media_type="application/json", headers=headers)
 
 
 async def validate_toolbox(toolbox: Toolbox) -> None:
@@ -120,11 +206,11 @@ async def mask(value: str) -> str:
     return value[:3] + "*" * (len(value) - 7) + value[-4:]
 
 
-@app.get("/user/{user_uuid}/models")
+@app.get("/user/{user_uuid}/models", response_model=list[Any])
 async def get_all_models(
     user_uuid: str,
     type_name: Optional[str] = None,
-) -> list[Any]:
+) -> Response:
     ret_val_without_mask = await get_all_models_for_user(
         user_uuid=user_uuid, type_name=type_name
     )
@@ -137,7 +223,7 @@ async def get_all_models(
                     model["json_str"][k] = await mask(model["json_str"][k])
         ret_val.append(model)
 
-    return ret_val  # type: ignore[no-any-return]
+    return render_json(ret_val)
 
 
 @app.post("/user/{user_uuid}/models/{type_name}/{model_name}/{model_uuid}")
@@ -147,7 +233,6 @@ async def add_model(
     model_name: str,
     model_uuid: str,
     model: dict[str, Any],
-    background_tasks: BackgroundTasks,
 ) -> dict[str, Any]:
     await check_model_name_uniqueness_and_raise(user_uuid, model["name"])
 
@@ -157,10 +242,28 @@ async def add_model(
         model_name=model_name,
         model_uuid=model_uuid,
         model=model,
-        background_tasks=background_tasks,
     )
 
 
+@app.post("/user/{user_uuid}/models")
+async def add_models(user_uuid: str, models: list[BulkModel]) -> list[dict[str, Any]]:
+    return await add_models_to_user(user_uuid=user_uuid, models=models)
+
+
+@app.put("/user/{user_uuid}/models")
+async def update_models(
+    user_uuid: str, models: list[BulkModel]
+) -> list[dict[str, Any]]:
+    return await update_models_of_user(user_uuid=user_uuid, models=models)
+
+
+@app.delete("/user/{user_uuid}/models")
+async def delete_models(
+    user_uuid: str, model_uuids: Annotated[list[UUID], Body()]
+) -> list[dict[str, Any]]:
+    return await delete_models_of_user(user_uuid=user_uuid, model_uuids=model_uuids)
+
+
 async def create_toolbox_for_new_user(user_uuid: Union[str, UUID]) -> dict[str, Any]:
     await DefaultDB.frontend().get_user(user_uuid=user_uuid)  # type: ignore[arg-type]
 
@@ -219,6 +322,7 @@ async def update_model(
         model_name=model_name,
         json_str=validated_model.model_dump_json(),
     )
+    await invalidate_cached_models(found_model["uuid"])
 
     return validated_model.model_dump()
 
@@ -229,83 +333,10 @@ async def models_delete(
 ) -> dict[str, Any]:
     found_model = await DefaultDB.backend().find_model(model_uuid=model_uuid)
     model = await DefaultDB.backend().delete_model(model_uuid=found_model["uuid"])
+    await invalidate_cached_models(model["uuid"])
     return model["json_str"]  # type: ignore
 
 
-def get_azure_llm_client() -> tuple[AsyncAzureOpenAI, str]:
-    azure_gpt35_model = environ["AZURE_GPT35_MODEL"]
-    api_key = environ["AZURE_OPENAI_API_KEY"]
-    azure_endpoint = environ["AZURE_API_ENDPOINT"]
-    api_version = environ["AZURE_API_VERSION"]
-
-    aclient = AsyncAzureOpenAI(
-        api_key=api_key,
-        azure_endpoint=azure_endpoint,  # type: ignore
-        api_version=api_version,
-    )
-
-    return aclient, azure_gpt35_model
-
-
-# todo: fix monkeypatching in testing and remove global variables
-try:
-    aclient, azure_gpt35_model = get_azure_llm_client()
-except Exception:
-    aclient = None  # type: ignore[assignment]
-    azure_gpt35_model = None  # type: ignore[assignment]
-
-SYSTEM_PROMPT = """I am developing a chat application where users specify a task for the application to accomplish.
-Generate a concise, professional name for the chat that directly reflects the essence of the task.
-The name should consist of 2-3 words and be no more than 25 characters in total.
-It should be immediately recognizable, meaningful, and sound natural to users, making it easy to identify the chat's
-purpose at a glance. Please provide only the chat name in your response, with no additional text or explanation.
-The name should use clear, user-friendly terminology that precisely captures the task's intent.
-
-Note:
-- I will tip you $1000 every time you generate a chat name that is 1-3 words long and up to 25 characters.
-- Your chat name MUST be pertinent to the given task and avoids generic words such as "Forge" and "Hub".
-
-Task Name:
-{task_name}
-
-Chat Name:
-"""
-
-TOOLS = [
-    {
-        "type": "function",
-        "function": {
-            "name": "generate_chat_name",
-            "description": "Use this tool to generate a chat name based on the task description.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "chat_name": {
-                        "type": "string",
-                        "description": "The name of the chat",
-                    },
-                },
-                "required": ["chat_name"],
-            },
-        },
-    },
-]
-
-
-async def generate_chat_name(
-    team_name: str,
-    chat_id: int,
-    chat_name: str,
-) -> dict[str, Union[Optional[str], int]]:
-    return {
-        "team_status": "inprogress",
-        "team_name": team_name,
-        "team_id": chat_id,
-        "customer_brief": "Some customer brief",
-        "conversation_name": chat_name,
-    }
-
-
 class ChatRequest(BaseModel):
     chat_id: int
     message: list[dict[str, str]]
@@ -313,72 +344,127 @@ class ChatRequest(BaseModel):
 
 
 @app.post("/user/{user_uuid}/chat/{model_name}/{model_uuid}")
-async def chat(request: ChatRequest) -> dict[str, Any]:
+async def chat(user_uuid: str, request: ChatRequest) -> dict[str, Any]:
+    """Create a new chat.
+
+    The chat is named by the LLM, or after its task if the name takes longer
+    than CHAT_NAME_TIMEOUT.
+    """
     message = request.message[0]["content"]
     chat_id = request.chat_id
-    user_id = request.user_id
-    team_name = f"{user_id}_{chat_id}"
+    team_name = f"{request.user_id}_{chat_id}"
 
-    try:
-        messages = [
-            {"role": "system", "content": SYSTEM_PROMPT.format(task_name=message)}
-        ]
-        completion = await aclient.chat.completions.create(
-            model=azure_gpt35_model,
-            messages=messages,
-            tools=TOOLS,
-            tool_choice={
-                "type": "function",
-                "function": {"name": "generate_chat_name"},
-            },
-        )  # type: ignore
-
-        response_message = completion.choices[0].message
-        tool_calls = response_message.tool_calls
-        if tool_calls:
-            for tool_call in tool_calls:
-                function_name = tool_call.function.name
-                function_args = json.loads(tool_call.function.arguments)
-                if function_name == "generate_chat_name":
-                    return await generate_chat_name(  # type: ignore[return-value]
-                        team_name=team_name,
-                        chat_id=chat_id,
-                        **function_args,
-                    )
-
-    except Exception:
-        logging.error("Unable to generate chat name: ", exc_info=True)
+    conversation_name = await chat_namer.chat_name(message)
 
-    default_response = {
+    return {
         "team_status": "inprogress",
         "team_name": team_name,
         "team_id": chat_id,
         "customer_brief": "Some customer brief",
-        "conversation_name": message,
+        "conversation_name": conversation_name,
     }
 
-    return default_response
+
+SSE_HEARTBEAT_INTERVAL = 15.0
+
+
+async def chat_events(
+    queue: "asyncio.Queue[ServerResponseModel]",
+) -> AsyncIterator[str]:
+    """Format chat messages as Server-Sent Events until the chat ends."""
+    while True:
+        try:
+            message = await asyncio.wait_for(
+                queue.get(), timeout=SSE_HEARTBEAT_INTERVAL
+            )
+        except asyncio.TimeoutError:
+            yield ": heartbeat\n\n"
+            continue
+
+        yield f"event: {message.type}\ndata: {message.model_dump_json()}\n\n"
+
+        if message.type in ("terminate", "error"):
+            return
+
+
+@app.get("/user/{user_uuid}/thread/{thread_uuid}/messages")
+async def stream_chat_messages(
+    user_uuid: UUID, thread_uuid: UUID, deployment_uuid: str = "playground"
+) -> StreamingResponse:
+    """Stream the messages of a chat as Server-Sent Events.
+
+    Events are named after the message type (print, input, terminate and error) and
+    the stream ends after a terminate or an error message. Only messages sent after
+    the comment `: connected` is received are streamed, so the chat should be
+    initiated afterwards.
+    """
+    fan_out = ChatFanOut.get_default()
+
+    async def event_stream() -> AsyncIterator[str]:
+        async with fan_out.listen(user_uuid, thread_uuid, deployment_uuid) as queue:
+            yield ": connected\n\n"
+            async for event in chat_events(queue):
+                yield event
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/user/{user_uuid}/thread/{thread_uuid}/input")
+async def send_chat_input(
+    user_uuid: UUID,
+    thread_uuid: UUID,
+    input_response: InputResponseModel,
+    deployment_uuid: str = "playground",
+) -> InputResponseModel:
+    await ChatFanOut.get_default().send_input(
+        user_uuid, thread_uuid, input_response, deployment_uuid
+    )
+    return input_response
 
 
 @app.post("/deployment/{deployment_uuid}/chat")
 async def deployment_chat(deployment_uuid: str) -> dict[str, Any]:
-    found_model = await DefaultDB.backend().find_model(model_uuid=deployment_uuid)
-    team_name = found_model["json_str"]["name"]
-    team_uuid = found_model["json_str"]["team"]["uuid"]
+    deployment = await deployment_cache.get(deployment_uuid)
 
     return {
         "team_status": "inprogress",
-        "team_name": team_name,
-        "team_uuid": team_uuid,
+        "team_name": deployment.name,
+        "team_uuid": deployment.team_uuid,
         "conversation_name": "New Chat",
     }
 
 
 @app.get("/deployment/{deployment_uuid}/ping")
-async def deployment_ping() -> dict[str, str]:
-    return {
-        "status": "ok",
-    }
+async def deployment_ping(deployment_uuid: str, ready: bool = False) -> Response:
+    """Check that the API is up.
+
+    With `ready=true`, also check that chats of the deployment can be opened: the
+    deployment is read through the cache, so the database is queried only if the
+    deployment isn't cached. Returns 404 for an unknown deployment and 503 if the
+    database can't be reached.
+    """
+    if not ready:
+        return render_json({"status": "ok"})
+
+    cache = "hit" if deployment_cache.cached(deployment_uuid) else "miss"
+    try:
+        await deployment_cache.get(deployment_uuid)
+    except KeyNotFoundError:
+        raise
+    except Exception:
+        logging.error("Deployment readiness check failed: ", exc_info=True)
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "cache": cache, "db": "error"},
+        )
+
+    return render_json(
+        {"status": "ok", "cache": cache, "db": "ok" if cache == "miss" else "skipped"}
+    )
 
 
 @app.post("/user/{user_uuid}/deployment/{deployment_uuid}")
@@ -4,7 +4,7 @@ import secrets
 import string
 import uuid
 from datetime import datetime, timedelta
-from typing import Union
+from typing import Optional, Union
 
 from fastapi import HTTPException
 from pydantic import BaseModel
@@ -80,6 +80,7 @@ async def create_deployment_auth_token(
     deployment_uuid: Union[str, uuid.UUID],
     name: str = "Default deployment token",
     expiry: str = "99999d",
+    auth_token_uuid: Optional[Union[str, uuid.UUID]] = None,
 ) -> DeploymentAuthToken:
     user = await DefaultDB.frontend().get_user(user_uuid=user_uuid)
     deployment = await DefaultDB.backend().find_model(model_uuid=deployment_uuid)
@@ -94,7 +95,7 @@ async def create_deployment_auth_token(
     hashed_token = hash_auth_token(auth_token)
 
     await DefaultDB.backend().create_auth_token(
-        auth_token_uuid=uuid.uuid4(),
+        auth_token_uuid=auth_token_uuid or uuid.uuid4(),
         name=name,
         user_uuid=user_uuid,
         deployment_uuid=deployment_uuid,
@@ -0,0 +1,246 @@
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from collections.abc import Awaitable
+from functools import lru_cache
+from os import environ
+from typing import TYPE_CHECKING, Callable, Optional
+
+if TYPE_CHECKING:
+    from openai import AsyncAzureOpenAI
+    from openai.types.chat import ChatCompletionMessageParam, ChatCompletionToolParam
+
+__all__ = [
+    "ChatNamer",
+    "chat_namer",
+    "generate_chat_names",
+    "normalize_task",
+]
+
+logger = logging.getLogger(__name__)
+
+# maximum number of tasks named in a single LLM request
+CHAT_NAME_BATCH_SIZE = int(environ.get("CHAT_NAME_BATCH_SIZE", 16))
+# time in seconds to wait for more tasks before sending a batch
+CHAT_NAME_BATCH_WINDOW = float(environ.get("CHAT_NAME_BATCH_WINDOW", 0.05))
+# maximum number of generated names kept in memory
+CHAT_NAME_CACHE_SIZE = int(environ.get("CHAT_NAME_CACHE_SIZE", 10_000))
+# time in seconds a new chat waits for its name before it is named after its task
+CHAT_NAME_TIMEOUT = float(environ.get("CHAT_NAME_TIMEOUT", 3))
+
+SYSTEM_PROMPT = """I am developing a chat application where users specify a task for the application to accomplish.
+Generate a concise, professional name for each of the chats below that directly reflects the essence of its task.
+Each name should consist of 2-3 words and be no more than 25 characters in total.
+It should be immediately recognizable, meaningful, and sound natural to users, making it easy to identify the chat's
+purpose at a glance. Please provide only the chat names, with no additional text or explanation.
+The names should use clear, user-friendly terminology that precisely captures the task's intent.
+
+Note:
+- I will tip you $1000 every time you generate a chat name that is 1-3 words long and up to 25 characters.
+- Your chat names MUST be pertinent to the given tasks and avoid generic words such as "Forge" and "Hub".
+
+Tasks:
+{tasks}
+
+Chat Names:
+"""
+
+TOOLS: "list[ChatCompletionToolParam]" = [
+    {
+        "type": "function",
+        "function": {
+            "name": "generate_chat_names",
+            "description": "Use this tool to generate the chat names based on the task descriptions.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "chat_names": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "The names of the chats, one for each task in the same order",
+                    },
+                },
+                "required": ["chat_names"],
+            },
+        },
+    },
+]
+
+
+def normalize_task(task: str) -> str:
+    """Return the task with whitespace and case normalized, used as the cache key."""
+    return " ".join(task.split()).lower()
+
+
+@lru_cache(maxsize=1)
+def get_azure_llm_client() -> "tuple[AsyncAzureOpenAI, str]":
+    azure_gpt35_model = environ["AZURE_GPT35_MODEL"]
+    api_key = environ["AZURE_OPENAI_API_KEY"]
+    azure_endpoint = environ["AZURE_API_ENDPOINT"]
+    api_version = environ["AZURE_API_VERSION"]
+
+    from openai import AsyncAzureOpenAI
+
+    aclient = AsyncAzureOpenAI(
+        api_key=api_key,
+        azure_endpoint=azure_endpoint,  # type: ignore
+        api_version=api_version,
+    )
+
+    return aclient, azure_gpt35_model
+
+
+async def generate_chat_names(tasks: list[str]) -> list[Optional[str]]:
+    """Name the chats of the tasks with a single Azure OpenAI request.
+
+    Returns None for the tasks the LLM didn't name.
+    """
+    aclient, azure_gpt35_model = get_azure_llm_client()
+
+    numbered_tasks = "\n".join(f"{i}. {task}" for i, task in enumerate(tasks, 1))
+    messages: "list[ChatCompletionMessageParam]" = [
+        {"role": "system", "content": SYSTEM_PROMPT.format(tasks=numbered_tasks)}
+    ]
+    completion = await aclient.chat.completions.create(
+        model=azure_gpt35_model,
+        messages=messages,
+        tools=TOOLS,
+        tool_choice={
+            "type": "function",
+            "function": {"name": "generate_chat_names"},
+        },
+    )
+
+    names: list[Optional[str]] = []
+    for tool_call in completion.choices[0].message.tool_calls or []:
+        if (
+            tool_call.type == "function"
+            and tool_call.function.name == "generate_chat_names"
+        ):
+            names = json.loads(tool_call.function.arguments)["chat_names"]
+
+    return [*names[: len(tasks)], *[None] * (len(tasks) - len(names))]
+
+
+class ChatNamer:
+    """Name new chats, batching and caching the LLM requests.
+
+    Tasks arriving within the batch window are named with a single LLM request,
+    and a task is named only once, no matter how many chats are created for it.
+    """
+
+    def __init__(
+        self,
+        *,
+        generate: Callable[[list[str]], Awaitable[list[Optional[str]]]],
+        batch_size: int = CHAT_NAME_BATCH_SIZE,
+        batch_window: float = CHAT_NAME_BATCH_WINDOW,
+        cache_size: int = CHAT_NAME_CACHE_SIZE,
+        timeout: float = CHAT_NAME_TIMEOUT,
+    ) -> None:
+        """Initialize the chat namer.
+
+        Args:
+            generate (Callable[[list[str]], Awaitable[list[Optional[str]]]]): Names
+                a batch of tasks.
+            batch_size (int, optional): Maximum number of tasks in a batch.
+                Defaults to CHAT_NAME_BATCH_SIZE.
+            batch_window (float, optional): Time in seconds to wait for more tasks
+                before sending a batch. Defaults to CHAT_NAME_BATCH_WINDOW.
+            cache_size (int, optional): Maximum number of cached names. Defaults to
+                CHAT_NAME_CACHE_SIZE.
+            timeout (float, optional): Time in seconds a chat waits for its name.
+                Defaults to CHAT_NAME_TIMEOUT.
+        """
+        self.generate = generate
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.cache_size = cache_size
+        self.timeout = timeout
+
+        self._names: OrderedDict[str, str] = OrderedDict()
+        # normalized task -> (task, name of the task once generated)
+        self._pending: dict[str, tuple[str, asyncio.Future[Optional[str]]]] = {}
+        self._batch: list[str] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # keep references to the running batches, so they aren't garbage collected
+        self._running: set[asyncio.Task[None]] = set()
+
+    def cached_name(self, task: str) -> Optional[str]:
+        """Return the name of the task if it was already generated."""
+        key = normalize_task(task)
+        name = self._names.get(key)
+        if name is not None:
+            self._names.move_to_end(key)
+        return name
+
+    async def name(self, task: str) -> Optional[str]:
+        """Return the name of the task, None if it couldn't be generated."""
+        name = self.cached_name(task)
+        if name is not None:
+            return name
+
+        key = normalize_task(task)
+        if key not in self._pending:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = (task, future)
+            self._add_to_batch(key)
+
+        _, future = self._pending[key]
+        # shield the future, it is shared by all chats with the same task
+        return await asyncio.shield(future)
+
+    async def chat_name(self, task: str) -> str:
+        """Return the name of a new chat, the task itself if naming it takes too long.
+
+        A name that arrives after the timeout is still cached for the next chat
+        with the same task.
+        """
+        try:
+            name = await asyncio.wait_for(self.name(task), self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Naming the chat took longer than {self.timeout}s")
+            name = None
+
+        return name or task
+
+    def _add_to_batch(self, key: str) -> None:
+        self._batch.append(key)
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.batch_window, self._flush
+            )
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._batch = self._batch, []
+        if batch:
+            task = asyncio.create_task(self._generate(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _generate(self, keys: list[str]) -> None:
+        tasks = [self._pending[key][0] for key in keys]
+        try:
+            names = await self.generate(tasks)
+        except Exception:
+            logger.error("Unable to generate chat names", exc_info=True)
+            names = [None] * len(keys)
+
+        for key, name in zip(keys, names):
+            if name:
+                self._names[key] = name
+                if len(self._names) > self.cache_size:
+                    self._names.popitem(last=False)
+
+            _, future = self._pending.pop(key)
+            future.set_result(name or None)
+
+
+chat_namer = ChatNamer(generate=generate_chat_names)
@@ -30,10 +30,17 @@ class BackendDBProtocol(Protocol):
         json_str: str,
     ) -> dict[str, Any]: ...
 
-    async def find_model(self, model_uuid: Union[str, UUID]) -> dict[str, Any]: ...
+    async def find_model(
+        self, model_uuid: Union[str, UUID], json_as_text: bool = False
+    ) -> dict[str, Any]: ...
 
     async def find_many_model(
-        self, user_uuid: Union[str, UUID], type_name: Optional[str] = None
+        self,
+        user_uuid: Union[str, UUID],
+        type_name: Optional[str] = None,
+        name: Optional[str] = None,
+        names: Optional[list[str]] = None,
+        model_uuids: Optional[list[Union[str, UUID]]] = None,
     ) -> list[dict[str, Any]]: ...
 
     async def update_model(
@@ -47,6 +54,34 @@ class BackendDBProtocol(Protocol):
 
     async def delete_model(self, model_uuid: Union[str, UUID]) -> dict[str, Any]: ...
 
+    async def create_many_model(
+        self, user_uuid: Union[str, UUID], models: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """Create all models in a single transaction.
+
+        Each model is a dict with `uuid`, `type_name`, `model_name` and `json_str` keys.
+        """
+        ...
+
+    async def update_many_model(
+        self, user_uuid: Union[str, UUID], models: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """Update all models in a single transaction.
+
+        Each model is a dict with `uuid`, `type_name`, `model_name` and `json_str` keys.
+        Nothing is updated if any of the models is not found.
+        """
+        ...
+
+    async def delete_many_model(
+        self, user_uuid: Union[str, UUID], model_uuids: list[Union[str, UUID]]
+    ) -> list[dict[str, Any]]:
+        """Delete all models of the user in a single transaction.
+
+        Nothing is deleted if any of the models is not found.
+        """
+        ...
+
     async def create_auth_token(
         self,
         auth_token_uuid: Union[str, UUID],
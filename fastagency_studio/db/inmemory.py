@@ -3,6 +3,7 @@ from datetime import datetime
 from typing import Any, Optional, Union
 from uuid import UUID
 
+from ..tracing import traced
 from .base import BackendDBProtocol, FrontendDBProtocol, KeyNotFoundError
 
 
@@ -32,16 +33,40 @@ class InMemoryBackendDB(BackendDBProtocol):
         self._models.append(model)
         return model
 
-    async def find_model(self, model_uuid: Union[str, UUID]) -> dict[str, Any]:
+    @traced("find_model")
+    async def find_model(
+        self, model_uuid: Union[str, UUID], json_as_text: bool = False
+    ) -> dict[str, Any]:
         for model in self._models:
             if model["uuid"] == str(model_uuid):
+                if json_as_text:
+                    return {**model, "json_str": json.dumps(model["json_str"])}
                 return model
         raise KeyNotFoundError(f"model_uuid {model_uuid} not found")
 
     async def find_many_model(
-        self, user_uuid: Union[str, UUID], type_name: Optional[str] = None
+        self,
+        user_uuid: Union[str, UUID],
+        type_name: Optional[str] = None,
+        name: Optional[str] = None,
+        names: Optional[list[str]] = None,
+        model_uuids: Optional[list[Union[str, UUID]]] = None,
     ) -> list[dict[str, Any]]:
-        return [model for model in self._models if model["user_uuid"] == str(user_uuid)]
+        if name is not None:
+            names = [name, *(names or [])]
+        uuids = (
+            None
+            if model_uuids is None
+            else {str(model_uuid) for model_uuid in model_uuids}
+        )
+        return [
+            model
+            for model in self._models
+            if model["user_uuid"] == str(user_uuid)
+            and (type_name is None or model["type_name"] == type_name)
+            and (names is None or model["json_str"].get("name") in names)
+            and (uuids is None or model["uuid"] in uuids)
+        ]
 
     async def update_model(
         self,
@@ -67,6 +92,61 @@ class InMemoryBackendDB(BackendDBProtocol):
                 return model
         raise KeyNotFoundError(f"model_uuid {model_uuid} not found")
 
+    def _check_models_exist(
+        self, model_uuids: list[str], user_uuid: Optional[Union[str, UUID]] = None
+    ) -> None:
+        existing_uuids = {
+            model["uuid"]
+            for model in self._models
+            if user_uuid is None or model["user_uuid"] == str(user_uuid)
+        }
+        for model_uuid in model_uuids:
+            if model_uuid not in existing_uuids:
+                raise KeyNotFoundError(f"model_uuid {model_uuid} not found")
+
+    async def create_many_model(
+        self, user_uuid: Union[str, UUID], models: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        created_models = [
+            {
+                "uuid": str(model["uuid"]),
+                "user_uuid": str(user_uuid),
+                "type_name": model["type_name"],
+                "model_name": model["model_name"],
+                "json_str": json.loads(model["json_str"]),
+                "created_at": datetime.now(),
+                "updated_at": datetime.now(),
+            }
+            for model in models
+        ]
+        self._models.extend(created_models)
+        return created_models
+
+    async def update_many_model(
+        self, user_uuid: Union[str, UUID], models: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        self._check_models_exist([str(model["uuid"]) for model in models])
+
+        return [
+            await self.update_model(
+                model_uuid=model["uuid"],
+                user_uuid=user_uuid,
+                type_name=model["type_name"],
+                model_name=model["model_name"],
+                json_str=model["json_str"],
+            )
+            for model in models
+        ]
+
+    async def delete_many_model(
+        self, user_uuid: Union[str, UUID], model_uuids: list[Union[str, UUID]]
+    ) -> list[dict[str, Any]]:
+        self._check_models_exist(
+            [str(model_uuid) for model_uuid in model_uuids], user_uuid=user_uuid
+        )
+
+        return [await self.delete_model(model_uuid) for model_uuid in model_uuids]
+
     async def create_auth_token(
         self,
         auth_token_uuid: Union[str, UUID],
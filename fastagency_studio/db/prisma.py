@@ -8,6 +8,7 @@ from uuid import UUID
 from faststream import ContextRepo
 from prisma import Prisma  # type: ignore[attr-defined]
 
+from ..tracing import traced
 from .base import BackendDBProtocol, DefaultDB, FrontendDBProtocol, KeyNotFoundError
 
 if TYPE_CHECKING:
@@ -62,11 +63,20 @@ class PrismaBackendDB(BackendDBProtocol, PrismaBaseDB):
             )
         return created_model.model_dump()  # type: ignore[no-any-return]
 
-    async def find_model(self, model_uuid: Union[str, UUID]) -> dict[str, Any]:
+    @traced("find_model")
+    async def find_model(
+        self, model_uuid: Union[str, UUID], json_as_text: bool = False
+    ) -> dict[str, Any]:
         model_uuid = str(model_uuid)
+        # the JSON text can be validated directly, without decoding it first
+        columns = (
+            "uuid, user_uuid, type_name, model_name, json_str::text AS json_str, created_at, updated_at"
+            if json_as_text
+            else "*"
+        )
         async with self._get_db_connection() as db:
             model: Optional[dict[str, Any]] = await db.query_first(
-                'SELECT * from "Model" where uuid='  # nosec: [B608]
+                f'SELECT {columns} from "Model" where uuid='  # nosec: [B608]
                 + f"'{model_uuid}'"
             )
         if not model:
@@ -74,16 +84,56 @@ class PrismaBackendDB(BackendDBProtocol, PrismaBaseDB):
         return model
 
     async def find_many_model(
-        self, user_uuid: Union[str, UUID], type_name: Optional[str] = None
+        self,
+        user_uuid: Union[str, UUID],
+        type_name: Optional[str] = None,
+        name: Optional[str] = None,
+        names: Optional[list[str]] = None,
+        model_uuids: Optional[list[Union[str, UUID]]] = None,
     ) -> list[dict[str, Any]]:
+        if name is not None:
+            names = [name, *(names or [])]
+        if names is not None:
+            return await self._find_many_model_by_name(
+                user_uuid, names, type_name, model_uuids
+            )
+
         filters: dict[str, Any] = {"user_uuid": str(user_uuid)}
         if type_name:
             filters["type_name"] = type_name
+        if model_uuids is not None:
+            filters["uuid"] = {"in": [str(model_uuid) for model_uuid in model_uuids]}
 
         async with self._get_db_connection() as db:
             models = await db.model.find_many(where=filters)  # type: ignore[arg-type]
         return [model.model_dump() for model in models]
 
+    async def _find_many_model_by_name(
+        self,
+        user_uuid: Union[str, UUID],
+        names: list[str],
+        type_name: Optional[str],
+        model_uuids: Optional[list[Union[str, UUID]]],
+    ) -> list[dict[str, Any]]:
+        # Prisma cannot filter on a JSON path with an index, so we go raw here to
+        # hit the "Model_user_uuid_json_str_name_idx" expression index
+        query = (
+            "SELECT uuid, user_uuid, type_name, model_name, json_str, created_at, updated_at"
+            " FROM \"Model\" WHERE user_uuid = $1::uuid AND json_str->>'name' = ANY($2::text[])"
+        )
+        params: list[Any] = [str(user_uuid), names]
+        if type_name:
+            params.append(type_name)
+            query += f" AND type_name = ${len(params)}"
+        if model_uuids is not None:
+            params.append([str(model_uuid) for model_uuid in model_uuids])
+            query += f" AND uuid = ANY(${len(params)}::text[])"
+
+        async with self._get_db_connection() as db:
+            # parsed into Model, so the rows have the same shape as find_many
+            models = await db.model.query_raw(query, *params)
+        return [model.model_dump() for model in models]
+
     async def update_model(
         self,
         model_uuid: Union[str, UUID],
@@ -113,6 +163,61 @@ class PrismaBackendDB(BackendDBProtocol, PrismaBaseDB):
             raise KeyNotFoundError(f"model_uuid {model_uuid} not found")
         return deleted_model.model_dump()  # type: ignore[no-any-return,union-attr]
 
+    async def create_many_model(
+        self, user_uuid: Union[str, UUID], models: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        async with self._get_db_connection() as db, db.tx() as transaction:
+            created_models = [
+                await transaction.model.create(
+                    data={
+                        "uuid": str(model["uuid"]),
+                        "user_uuid": str(user_uuid),
+                        "type_name": model["type_name"],
+                        "model_name": model["model_name"],
+                        "json_str": model["json_str"],
+                    }
+                )
+                for model in models
+            ]
+        return [model.model_dump() for model in created_models]
+
+    async def update_many_model(
+        self, user_uuid: Union[str, UUID], models: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        async with self._get_db_connection() as db, db.tx() as transaction:
+            updated_models = []
+            for model in models:
+                updated_model = await transaction.model.update(
+                    where={"uuid": str(model["uuid"])},  # type: ignore[arg-type]
+                    data={  # type: ignore[typeddict-unknown-key]
+                        "type_name": model["type_name"],
+                        "model_name": model["model_name"],
+                        "json_str": model["json_str"],
+                        "user_uuid": str(user_uuid),
+                    },
+                )
+                # raising inside the transaction rolls back the updates done so far
+                if updated_model is None:
+                    raise KeyNotFoundError(f"model_uuid {model['uuid']} not found")
+                updated_models.append(updated_model.model_dump())
+        return updated_models
+
+    async def delete_many_model(
+        self, user_uuid: Union[str, UUID], model_uuids: list[Union[str, UUID]]
+    ) -> list[dict[str, Any]]:
+        uuids = [str(model_uuid) for model_uuid in model_uuids]
+        async with self._get_db_connection() as db, db.tx() as transaction:
+            found_models = await transaction.model.find_many(
+                where={"uuid": {"in": uuids}, "user_uuid": str(user_uuid)}  # type: ignore[typeddict-item]
+            )
+            found_uuids = {model.uuid for model in found_models}
+            for model_uuid in uuids:
+                if model_uuid not in found_uuids:
+                    raise KeyNotFoundError(f"model_uuid {model_uuid} not found")
+
+            await transaction.model.delete_many(where={"uuid": {"in": uuids}})
+        return [model.model_dump() for model in found_models]
+
     async def create_auth_token(
         self,
         auth_token_uuid: Union[str, UUID],
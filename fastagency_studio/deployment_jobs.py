@@ -0,0 +1,147 @@
+import asyncio
+import logging
+from collections.abc import Awaitable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from os import environ
+from typing import Callable, Optional
+
+from .io.messages import DeploymentJobModel
+
+__all__ = [
+    "DEPLOYMENT_CONCURRENCY",
+    "DEPLOYMENT_JOBS_SUBJECT",
+    "DeploymentWorker",
+    "enqueue_deployment",
+]
+
+logger = logging.getLogger(__name__)
+
+DEPLOYMENT_JOBS_SUBJECT = "deployments.jobs"
+
+# maximum number of deployments a worker process runs at the same time
+DEPLOYMENT_CONCURRENCY = int(environ.get("DEPLOYMENT_CONCURRENCY", 2))
+# number of attempts of a deployment before it is marked as failed
+DEPLOYMENT_MAX_ATTEMPTS = int(environ.get("DEPLOYMENT_MAX_ATTEMPTS", 3))
+# time in seconds before the first retry of a deployment, doubled for every further retry
+DEPLOYMENT_RETRY_DELAY = float(environ.get("DEPLOYMENT_RETRY_DELAY", 30))
+
+
+async def enqueue_deployment(job: DeploymentJobModel) -> None:
+    """Publish the deployment to the stream, it is kept there until a worker deploys it."""
+    from .io.app import broker, stream
+
+    await broker.connect()
+    # publishing to the stream waits until the job is stored
+    await broker.publish(job, DEPLOYMENT_JOBS_SUBJECT, stream=stream.name)
+
+
+class DeploymentWorker:
+    """Run deployments with bounded concurrency, retrying failed ones with backoff.
+
+    Deployments are generated in a dedicated thread pool, so they don't take
+    the threads of the chats running on the same worker.
+    """
+
+    def __init__(
+        self,
+        *,
+        deploy: Callable[[DeploymentJobModel, Executor], Awaitable[None]],
+        set_status: Callable[[DeploymentJobModel, str], Awaitable[None]],
+        concurrency: int = DEPLOYMENT_CONCURRENCY,
+        max_attempts: int = DEPLOYMENT_MAX_ATTEMPTS,
+        retry_delay: float = DEPLOYMENT_RETRY_DELAY,
+    ) -> None:
+        """Initialize the deployment worker.
+
+        Args:
+            deploy (Callable[[DeploymentJobModel, Executor], Awaitable[None]]): Deploys
+                the SaaS app of a job, running the blocking parts in the executor.
+            set_status (Callable[[DeploymentJobModel, str], Awaitable[None]]): Writes
+                the status of a job to its deployment.
+            concurrency (int, optional): Maximum number of deployments running at the
+                same time. Defaults to DEPLOYMENT_CONCURRENCY.
+            max_attempts (int, optional): Number of attempts of a deployment before
+                it is marked as failed. Defaults to DEPLOYMENT_MAX_ATTEMPTS.
+            retry_delay (float, optional): Time in seconds before the first retry,
+                doubled for every further retry. Defaults to DEPLOYMENT_RETRY_DELAY.
+        """
+        self.deploy = deploy
+        self.set_status = set_status
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="deployment"
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._running: set[asyncio.Future[None]] = set()
+        self.draining = False
+
+    def backoff(self, attempt: int) -> float:
+        """Return the time in seconds before retrying the attempt."""
+        return self.retry_delay * 2.0 ** (attempt - 1)
+
+    async def handle(self, job: DeploymentJobModel, attempt: int) -> Optional[float]:
+        """Run the attempt of the job.
+
+        Returns:
+            The time in seconds before the job should be retried, None if it is done.
+        """
+        if self.draining:
+            # redelivered right away, so another worker deploys it
+            return 0.0
+
+        done = asyncio.get_running_loop().create_future()
+        self._running.add(done)
+        try:
+            return await self._run(job, attempt)
+        finally:
+            self._running.discard(done)
+            done.set_result(None)
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """Stop starting new deployments and wait for the running ones to finish.
+
+        Returns:
+            True if all running deployments finished within the timeout.
+        """
+        self.draining = True
+        if not self._running:
+            return True
+
+        _, pending = await asyncio.wait(set(self._running), timeout=timeout)
+        return not pending
+
+    async def _run(self, job: DeploymentJobModel, attempt: int) -> Optional[float]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        async with self._semaphore:
+            try:
+                await self.deploy(job, self._executor)
+            except Exception:
+                if attempt < self.max_attempts:
+                    delay = self.backoff(attempt)
+                    logger.warning(
+                        f"Attempt {attempt} of deployment {job.model_uuid} failed, retrying in {delay:.0f}s",
+                        exc_info=True,
+                    )
+                    return delay
+
+                logger.error(
+                    f"Deployment {job.model_uuid} failed after {attempt} attempts",
+                    exc_info=True,
+                )
+                status = "failed"
+            else:
+                status = "completed"
+
+        try:
+            await self.set_status(job, status)
+        except Exception:
+            logger.error(
+                f"Unable to set the status of deployment {job.model_uuid} to {status}",
+                exc_info=True,
+            )
+        return None
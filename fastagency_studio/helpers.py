@@ -1,45 +1,56 @@
+import asyncio
 import json
+import logging
 import uuid
+from concurrent.futures import Executor
 from typing import Any, Optional, TypeVar, Union
 from uuid import UUID
 
 from asyncer import asyncify
-from fastapi import BackgroundTasks, HTTPException
+from fastapi import HTTPException
+from pydantic import BaseModel, ConfigDict, ValidationError
+from pydantic_core import to_json
 
 from .auth_token.auth import create_deployment_auth_token
-from .db.base import DefaultDB
+from .db.base import DefaultDB, KeyNotFoundError
+from .deployment_jobs import enqueue_deployment
+from .io.messages import DeploymentJobModel
 from .models.base import Model, ObjectReference
+from .models.deployments.cache import deployment_cache
 from .models.registry import Registry
+from .models.secrets.cache import publish_secret_invalidation, secret_cache
 from .saas_app_generator import (
     InvalidFlyTokenError,
     InvalidGHTokenError,
     SaasAppGenerator,
 )
+from .tracing import start_span
+
+logger = logging.getLogger(__name__)
 
 T = TypeVar("T", bound=Model)
 
+NAME_ALREADY_EXISTS_MSG = "Name already exists. Please enter a different name"
+
 
 async def get_model_by_uuid(model_uuid: Union[str, UUID]) -> Model:
-    model_dict = await DefaultDB.backend().find_model(model_uuid=model_uuid)
+    model_dict = await DefaultDB.backend().find_model(
+        model_uuid=model_uuid, json_as_text=True
+    )
 
-    registry = Registry.get_default()
-    model = registry.validate(
+    # the JSON text is validated directly, without decoding it into a dict first
+    return Registry.get_default().validate_json(
         type=model_dict["type_name"],
         name=model_dict["model_name"],
-        model=model_dict["json_str"],
+        json_str=model_dict["json_str"],
     )
 
-    return model
-
 
 async def get_model_by_ref(model_ref: ObjectReference) -> Model:
     return await get_model_by_uuid(model_ref.uuid)
 
 
-async def validate_tokens_and_create_gh_repo(
-    model: dict[str, Any],
-    model_uuid: str,
-) -> SaasAppGenerator:
+async def get_saas_app(model: dict[str, Any], model_uuid: str) -> SaasAppGenerator:
     found_gh_token = await DefaultDB.backend().find_model(
         model_uuid=model["gh_token"]["uuid"]
     )
@@ -50,7 +61,7 @@ async def validate_tokens_and_create_gh_repo(
     found_gh_token_uuid = found_gh_token["json_str"]["gh_token"]
     found_fly_token_uuid = found_fly_token["json_str"]["fly_token"]
 
-    saas_app = SaasAppGenerator(
+    return SaasAppGenerator(
         fly_api_token=found_fly_token_uuid,
         github_token=found_gh_token_uuid,
         app_name=model["name"],
@@ -59,49 +70,110 @@ async def validate_tokens_and_create_gh_repo(
         fastagency_deployment_uuid=model_uuid,
     )
 
-    saas_app.validate_tokens()
-    saas_app.create_new_repository()
+
+async def validate_tokens_and_create_gh_repo(
+    model: dict[str, Any],
+    model_uuid: str,
+) -> SaasAppGenerator:
+    saas_app = await get_saas_app(model, model_uuid)
+
+    # the gh and fly commands take seconds, so they run outside of the event loop
+    await asyncify(saas_app.validate_tokens)()
+    await asyncify(saas_app.create_new_repository)()
     return saas_app
 
 
 async def deploy_saas_app(
-    saas_app: SaasAppGenerator,
-    user_uuid: str,
-    model_uuid: str,
-    type_name: str,
-    model_name: str,
+    job: DeploymentJobModel, executor: Optional[Executor] = None
 ) -> None:
-    deployment_auth_token = await create_deployment_auth_token(user_uuid, model_uuid)
+    """Push the SaaS app of the deployment to the repository created by the API.
+
+    The app is generated in the executor, the default one of the event loop if None.
+    """
+    found_model = await DefaultDB.backend().find_model(model_uuid=job.model_uuid)
+    saas_app = await get_saas_app(found_model["json_str"], job.model_uuid)
+    saas_app.gh_repo_url = found_model["json_str"]["gh_repo_url"]
+
+    loop = asyncio.get_running_loop()
+    # a redelivered job may have been pushed already, pushing again would fail
+    if await loop.run_in_executor(executor, saas_app.is_pushed):
+        logger.info(f"Deployment {job.model_uuid} was already pushed")
+        return
+
+    auth_token_uuid = uuid.uuid4()
+    deployment_auth_token = await create_deployment_auth_token(
+        job.user_uuid, job.model_uuid, auth_token_uuid=auth_token_uuid
+    )
     saas_app.deployment_auth_token = deployment_auth_token.auth_token
-    saas_app.developer_uuid = user_uuid
+    saas_app.developer_uuid = job.user_uuid
 
-    await asyncify(saas_app.execute)()
+    try:
+        await loop.run_in_executor(executor, saas_app.execute)
+    except Exception:
+        # every attempt creates a new token, so the one of a failed attempt is
+        # revoked unless the app may already use it
+        if not saas_app.auth_token_stored:
+            await _revoke_auth_token(job, auth_token_uuid)
+        raise
 
-    found_model = await DefaultDB.backend().find_model(model_uuid=model_uuid)
-    found_model["json_str"]["app_deploy_status"] = "completed"
+
+async def _revoke_auth_token(job: DeploymentJobModel, auth_token_uuid: UUID) -> None:
+    try:
+        await DefaultDB.backend().delete_auth_token(
+            auth_token_uuid=auth_token_uuid,
+            deployment_uuid=job.model_uuid,
+            user_uuid=job.user_uuid,
+        )
+    except Exception:
+        logger.error(
+            f"Unable to revoke the auth token of deployment {job.model_uuid}",
+            exc_info=True,
+        )
+
+
+async def set_app_deploy_status(job: DeploymentJobModel, status: str) -> None:
+    found_model = await DefaultDB.backend().find_model(model_uuid=job.model_uuid)
+    found_model["json_str"]["app_deploy_status"] = status
     await DefaultDB.backend().update_model(
         model_uuid=found_model["uuid"],
-        user_uuid=user_uuid,
-        type_name=type_name,
-        model_name=model_name,
+        user_uuid=job.user_uuid,
+        type_name=job.type_name,
+        model_name=job.model_name,
         json_str=json.dumps(found_model["json_str"]),
     )
 
 
+async def _enqueue_deployment(job: DeploymentJobModel) -> str:
+    # the deployment is already created, so a failure is reported by its status
+    try:
+        await enqueue_deployment(job)
+    except Exception:
+        logger.error(f"Unable to enqueue deployment {job.model_uuid}", exc_info=True)
+    else:
+        return "inprogress"
+
+    try:
+        await set_app_deploy_status(job, "failed")
+    except Exception:
+        logger.error(
+            f"Unable to set the status of deployment {job.model_uuid} to failed",
+            exc_info=True,
+        )
+    return "failed"
+
+
 async def add_model_to_user(
     user_uuid: str,
     type_name: str,
     model_name: str,
     model_uuid: str,
     model: dict[str, Any],
-    background_tasks: BackgroundTasks,
 ) -> dict[str, Any]:
     try:
         registry = Registry.get_default()
         validated_model = registry.validate(type_name, model_name, model)
 
         validated_model_dict = validated_model.model_dump()
-        validated_model_json = validated_model.model_dump_json()
         saas_app = None
 
         if type_name == "deployment":
@@ -112,10 +184,7 @@ async def add_model_to_user(
             validated_model_dict["app_deploy_status"] = "inprogress"
             validated_model_dict["gh_repo_url"] = saas_app.gh_repo_url
 
-            updated_validated_model_dict = json.loads(validated_model_json)
-            updated_validated_model_dict["app_deploy_status"] = "inprogress"
-            updated_validated_model_dict["gh_repo_url"] = saas_app.gh_repo_url
-            validated_model_json = json.dumps(updated_validated_model_dict)
+        validated_model_json = to_json(validated_model_dict).decode()
 
         await DefaultDB.frontend().get_user(user_uuid=user_uuid)
         await DefaultDB.backend().create_model(
@@ -127,13 +196,14 @@ async def add_model_to_user(
         )
 
         if saas_app is not None:
-            background_tasks.add_task(
-                deploy_saas_app,
-                saas_app,
-                user_uuid,
-                model_uuid,
-                type_name,
-                model_name,
+            # the repository is created, the app is pushed to it by a worker
+            validated_model_dict["app_deploy_status"] = await _enqueue_deployment(
+                DeploymentJobModel(
+                    user_uuid=user_uuid,
+                    model_uuid=model_uuid,
+                    type_name=type_name,
+                    model_name=model_name,
+                )
             )
 
         return validated_model_dict
@@ -153,7 +223,6 @@ async def create_model(
     cls: type[T],
     type_name: str,
     user_uuid: Union[str, UUID],
-    background_tasks: Optional[BackgroundTasks] = None,
     **kwargs: Any,
 ) -> tuple[UUID, dict[str, Any]]:
     model = cls(**kwargs)
@@ -165,7 +234,6 @@ async def create_model(
         model_name=cls.__name__,  # type: ignore [attr-defined]
         model_uuid=str(model_uuid),
         model=model.model_dump(),
-        background_tasks=background_tasks,  # type: ignore[arg-type]
     )
     return model_uuid, validated_model
 
@@ -174,14 +242,12 @@ async def create_model_ref(
     cls: type[T],
     type_name: str,
     user_uuid: Union[str, UUID],
-    background_tasks: Optional[BackgroundTasks] = None,
     **kwargs: Any,
 ) -> ObjectReference:
     model_uuid, _ = await create_model(
         cls,
         type_name,
         user_uuid,
-        background_tasks,
         **kwargs,
     )
 
@@ -214,21 +280,193 @@ async def create_autogen(
     )
     model = await get_model_by_ref(model_ref)
 
-    return await model.create_autogen(model_id=model_id, user_id=user_id, **kwargs)
+    with start_span(
+        "create_autogen", model_type=model_ref.type, model_name=model_ref.name
+    ):
+        return await model.create_autogen(model_id=model_id, user_id=user_id, **kwargs)
 
 
 async def check_model_name_uniqueness_and_raise(
     user_uuid: str, model_name: str
 ) -> None:
-    existing_models = await DefaultDB.backend().find_many_model(user_uuid=user_uuid)
+    existing_models = await DefaultDB.backend().find_many_model(
+        user_uuid=user_uuid, name=model_name
+    )
 
-    if any(model["json_str"].get("name") == model_name for model in existing_models):
+    if existing_models:
         raise HTTPException(
             status_code=422,
             detail=[
                 {
                     "loc": ("name",),
-                    "msg": "Name already exists. Please enter a different name",
+                    "msg": NAME_ALREADY_EXISTS_MSG,
                 }
             ],
         )
+
+
+class BulkModel(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    uuid: UUID
+    type_name: str
+    model_name: str
+    json_str: dict[str, Any]
+
+
+def _validate_bulk_model(
+    i: int, model: BulkModel
+) -> tuple[Optional[Model], list[dict[str, Any]]]:
+    try:
+        validated_model = Registry.get_default().validate(
+            model.type_name, model.model_name, model.json_str
+        )
+    except ValidationError as e:
+        return None, [
+            {**error, "loc": (i, *error["loc"])} for error in json.loads(e.json())
+        ]
+    except ValueError as e:
+        return None, [{"loc": (i, "model_name"), "msg": str(e)}]
+
+    return validated_model, []
+
+
+def _validate_bulk_models(models: list[BulkModel]) -> list[Model]:
+    if len({model.uuid for model in models}) != len(models):
+        raise HTTPException(status_code=422, detail="Model UUIDs must be unique")
+
+    validated_models: list[Model] = []
+    errors: list[dict[str, Any]] = []
+    for i, model in enumerate(models):
+        validated_model, model_errors = _validate_bulk_model(i, model)
+        if validated_model is not None:
+            validated_models.append(validated_model)
+        errors.extend(model_errors)
+
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+
+    return validated_models
+
+
+async def _find_taken_names(
+    user_uuid: str, names: list[str], updated_uuids: set[str]
+) -> set[str]:
+    # only the models with one of the names are loaded, using the name index
+    found_models = await DefaultDB.backend().find_many_model(
+        user_uuid=user_uuid, names=list(dict.fromkeys(names))
+    )
+    return {
+        model["json_str"]["name"]
+        for model in found_models
+        if str(model["uuid"]) not in updated_uuids
+    }
+
+
+async def _check_bulk_model_names_uniqueness_and_raise(
+    user_uuid: str, names: list[str], updated_uuids: Optional[set[str]] = None
+) -> None:
+    taken_names = await _find_taken_names(user_uuid, names, updated_uuids or set())
+
+    errors: list[dict[str, Any]] = []
+    for i, name in enumerate(names):
+        if name in taken_names:
+            errors.append({"loc": (i, "name"), "msg": NAME_ALREADY_EXISTS_MSG})
+        taken_names.add(name)
+
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+
+
+def _to_bulk_rows(
+    models: list[BulkModel], validated_models: list[Model]
+) -> list[dict[str, Any]]:
+    return [
+        {
+            "uuid": str(model.uuid),
+            "type_name": model.type_name,
+            "model_name": model.model_name,
+            "json_str": validated_model.model_dump_json(),
+        }
+        for model, validated_model in zip(models, validated_models)
+    ]
+
+
+async def invalidate_cached_models(*model_uuids: Union[str, UUID]) -> None:
+    """Remove updated or deleted models from the caches of the API and the workers."""
+    secret_cache.invalidate(*model_uuids)
+    deployment_cache.invalidate(*model_uuids)
+    # the secrets are read by the workers, so their caches are invalidated too
+    await publish_secret_invalidation(*model_uuids)
+
+
+async def add_models_to_user(
+    user_uuid: str, models: list[BulkModel]
+) -> list[dict[str, Any]]:
+    """Validate and create all models in a single transaction.
+
+    Models can reference each other, so a whole team (secrets, LLMs, toolboxes,
+    agents and the team itself) can be created at once. Deployments are not
+    supported because creating them has side effects outside of the database.
+    """
+    if any(model.type_name == "deployment" for model in models):
+        raise HTTPException(
+            status_code=422, detail="Deployments cannot be created in bulk"
+        )
+
+    validated_models = _validate_bulk_models(models)
+
+    await _check_bulk_model_names_uniqueness_and_raise(
+        user_uuid, [model.name for model in validated_models]
+    )
+
+    await DefaultDB.frontend().get_user(user_uuid=user_uuid)
+    await DefaultDB.backend().create_many_model(
+        user_uuid=user_uuid, models=_to_bulk_rows(models, validated_models)
+    )
+
+    return [validated_model.model_dump() for validated_model in validated_models]
+
+
+async def update_models_of_user(
+    user_uuid: str, models: list[BulkModel]
+) -> list[dict[str, Any]]:
+    """Validate and update all models in a single transaction."""
+    validated_models = _validate_bulk_models(models)
+
+    updated_uuids = {str(model.uuid) for model in models}
+    # models of other users are not found, the same as missing ones
+    existing_models = await DefaultDB.backend().find_many_model(
+        user_uuid=user_uuid,
+        model_uuids=list(updated_uuids),  # type: ignore[arg-type]
+    )
+    existing_uuids = {str(model["uuid"]) for model in existing_models}
+    for model in models:
+        if str(model.uuid) not in existing_uuids:
+            raise KeyNotFoundError(f"model_uuid {model.uuid} not found")
+
+    await _check_bulk_model_names_uniqueness_and_raise(
+        user_uuid, [model.name for model in validated_models], updated_uuids
+    )
+
+    await DefaultDB.backend().update_many_model(
+        user_uuid=user_uuid, models=_to_bulk_rows(models, validated_models)
+    )
+    await invalidate_cached_models(*updated_uuids)
+
+    return [validated_model.model_dump() for validated_model in validated_models]
+
+
+async def delete_models_of_user(
+    user_uuid: str, model_uuids: list[UUID]
+) -> list[dict[str, Any]]:
+    """Delete all models in a single transaction."""
+    if len(set(model_uuids)) != len(model_uuids):
+        raise HTTPException(status_code=422, detail="Model UUIDs must be unique")
+
+    deleted_models = await DefaultDB.backend().delete_many_model(
+        user_uuid=user_uuid,
+        model_uuids=model_uuids,  # type: ignore[arg-type]
+    )
+    await invalidate_cached_models(*model_uuids)
+    return [model["json_str"] for model in deleted_models]
@@ -5,6 +5,7 @@ from faststream import FastStream
 from faststream.nats import JStream, NatsBroker
 
 from ..db.prisma import faststream_lifespan
+from ..tracing import telemetry_middlewares
 
 nats_url: Optional[str] = environ.get("NATS_URL", None)  # type: ignore[assignment]
 if nats_url is None:
@@ -18,7 +19,10 @@ print(f"{nats_url=}")  # noqa
 print("Starting IONats faststream app...")  # noqa
 
 
-broker = NatsBroker(nats_url, user=username, password=password)
+# the middlewares propagate the trace context in the headers of NATS messages
+broker = NatsBroker(
+    nats_url, user=username, password=password, middlewares=telemetry_middlewares()
+)
 app = FastStream(broker, lifespan=faststream_lifespan)
 
 stream = JStream(
@@ -30,6 +34,8 @@ stream = JStream(
         "chat.client.messages.*.*.*",
         # server prints message to client; chat.server.messages.<user_uuid>.<deployment_uuid>.<chat_uuid>
         "chat.server.messages.*.*.*",
+        # API enqueues deployments of SaaS apps for the workers
+        "deployments.jobs",
         # "function.server.call",
         # "function.client.call.*",
         # "code.server.execute",
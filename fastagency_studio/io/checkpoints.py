@@ -0,0 +1,102 @@
+from typing import TYPE_CHECKING, Any, Optional, Protocol, Union, runtime_checkable
+from uuid import UUID
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from faststream.nats import NatsBroker
+    from nats.js.kv import KeyValue
+
+__all__ = [
+    "ChatCheckpoint",
+    "CheckpointStoreProtocol",
+    "InMemoryCheckpointStore",
+    "NatsCheckpointStore",
+    "checkpoint_key",
+]
+
+
+class ChatCheckpoint(BaseModel):
+    # number of client replies consumed so far, replayed replies are skipped on resume
+    inputs_received: int = 0
+    # the state of the autogen team, see resume_chat() of the team
+    state: dict[str, Any] = {}
+
+
+def checkpoint_key(
+    user_id: Union[str, UUID],
+    thread_id: Union[str, UUID],
+    deployment_id: Optional[Union[str, UUID]] = "playground",
+) -> str:
+    return f"{user_id}.{deployment_id}.{thread_id}"
+
+
+@runtime_checkable
+class CheckpointStoreProtocol(Protocol):
+    async def get(self, key: str) -> Optional[ChatCheckpoint]: ...
+
+    async def put(self, key: str, checkpoint: ChatCheckpoint) -> None: ...
+
+    async def delete(self, key: str) -> None: ...
+
+
+class InMemoryCheckpointStore(CheckpointStoreProtocol):
+    def __init__(self) -> None:
+        """Initialize the in-memory checkpoint store."""
+        self._checkpoints: dict[str, str] = {}
+
+    async def get(self, key: str) -> Optional[ChatCheckpoint]:
+        if key not in self._checkpoints:
+            return None
+        return ChatCheckpoint.model_validate_json(self._checkpoints[key])
+
+    async def put(self, key: str, checkpoint: ChatCheckpoint) -> None:
+        self._checkpoints[key] = checkpoint.model_dump_json()
+
+    async def delete(self, key: str) -> None:
+        self._checkpoints.pop(key, None)
+
+
+class NatsCheckpointStore(CheckpointStoreProtocol):
+    """Store checkpoints in a JetStream key-value bucket shared by all workers."""
+
+    def __init__(
+        self,
+        broker: "NatsBroker",
+        bucket: str = "chat_checkpoints",
+        ttl: Optional[float] = 7 * 24 * 60 * 60,
+    ) -> None:
+        """Initialize the checkpoint store.
+
+        Args:
+            broker (NatsBroker): The connected broker
+            bucket (str, optional): The name of the bucket. Defaults to "chat_checkpoints".
+            ttl (Optional[float], optional): Time after which abandoned checkpoints are
+                removed, in seconds. Defaults to one week.
+        """
+        self._broker = broker
+        self._bucket = bucket
+        self._ttl = ttl
+
+    async def _kv(self) -> "KeyValue":
+        # buckets are cached by the broker
+        return await self._broker.key_value(self._bucket, ttl=self._ttl)
+
+    async def get(self, key: str) -> Optional[ChatCheckpoint]:
+        from nats.js.errors import KeyDeletedError, KeyNotFoundError
+
+        kv = await self._kv()
+        try:
+            entry = await kv.get(key)
+        except (KeyNotFoundError, KeyDeletedError):
+            return None
+
+        return ChatCheckpoint.model_validate_json(entry.value or b"")
+
+    async def put(self, key: str, checkpoint: ChatCheckpoint) -> None:
+        kv = await self._kv()
+        await kv.put(key, checkpoint.model_dump_json().encode())
+
+    async def delete(self, key: str) -> None:
+        kv = await self._kv()
+        await kv.delete(key)
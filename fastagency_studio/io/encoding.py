@@ -0,0 +1,73 @@
+from typing import Literal, Optional, TypeVar
+
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+__all__ = [
+    "CONTENT_TYPE_HEADER",
+    "JSON_CONTENT_TYPE",
+    "MSGPACK_CONTENT_TYPE",
+    "Encoding",
+    "decode_message",
+    "encode_message",
+    "is_msgpack_available",
+    "negotiate_encoding",
+]
+
+CONTENT_TYPE_HEADER = "content-type"
+JSON_CONTENT_TYPE = "application/json"
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+
+Encoding = Literal["json", "msgpack"]
+
+T = TypeVar("T", bound=BaseModel)
+
+
+def is_msgpack_available() -> bool:
+    try:
+        import msgpack  # noqa: F401
+    except ImportError:
+        return False
+
+    return True
+
+
+def negotiate_encoding(requested: Optional[Encoding]) -> Encoding:
+    """Return the requested encoding if it is supported, JSON otherwise."""
+    if requested == "msgpack" and is_msgpack_available():
+        return "msgpack"
+
+    return "json"
+
+
+def encode_message(
+    model: BaseModel, encoding: Encoding = "json"
+) -> tuple[bytes, dict[str, str]]:
+    """Encode a message and return its payload together with the NATS headers.
+
+    The content type header tells the receiver how to decode the payload.
+    """
+    if encoding == "msgpack":
+        import msgpack
+
+        payload: bytes = msgpack.packb(model.model_dump(mode="json"))
+        return payload, {CONTENT_TYPE_HEADER: MSGPACK_CONTENT_TYPE}
+
+    return to_json(model), {CONTENT_TYPE_HEADER: JSON_CONTENT_TYPE}
+
+
+def decode_message(
+    model_type: type[T], payload: bytes, content_type: Optional[str] = None
+) -> T:
+    """Decode a message from the raw NATS payload.
+
+    Messages without a content type, such as those published by browser clients,
+    are decoded as JSON.
+    """
+    if content_type == MSGPACK_CONTENT_TYPE:
+        import msgpack
+
+        return model_type.model_validate(msgpack.unpackb(payload))
+
+    # validating bytes directly avoids decoding the payload to str first
+    return model_type.model_validate_json(payload)
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Optional, Union
+from uuid import UUID
+
+from .encoding import decode_message
+from .messages import InputResponseModel, ServerResponseModel
+
+if TYPE_CHECKING:
+    from faststream.nats import NatsBroker
+    from faststream.nats.subscriber.asyncapi import AsyncAPISubscriber
+
+__all__ = ["ChatFanOut", "chat_client_subject", "chat_server_subject"]
+
+logger = logging.getLogger(__name__)
+
+
+def chat_client_subject(
+    user_id: Union[str, UUID],
+    thread_id: Union[str, UUID],
+    deployment_id: Optional[Union[str, UUID]] = "playground",
+) -> str:
+    """Subject on which the server sends messages to the client."""
+    return f"chat.client.messages.{user_id}.{deployment_id}.{thread_id}"
+
+
+def chat_server_subject(
+    user_id: Union[str, UUID],
+    thread_id: Union[str, UUID],
+    deployment_id: Optional[Union[str, UUID]] = "playground",
+) -> str:
+    """Subject on which the client sends input replies to the server."""
+    return f"chat.server.messages.{user_id}.{deployment_id}.{thread_id}"
+
+
+class ChatFanOut:
+    """Fan out chat messages from a single NATS subscription to local listeners.
+
+    Every API process opens one wildcard subscription to all client messages and
+    forwards each message to the listeners of its thread, so clients such as
+    browsers or deployed SaaS apps don't need their own NATS connection.
+    """
+
+    SUBJECT = "chat.client.messages.*.*.*"
+
+    def __init__(self, broker: "NatsBroker", max_queue_size: int = 1000) -> None:
+        """Initialize the fan-out.
+
+        Args:
+            broker (NatsBroker): The broker used to subscribe and publish
+            max_queue_size (int, optional): The maximum number of undelivered
+                messages per listener. Defaults to 1000.
+        """
+        self._broker = broker
+        self._max_queue_size = max_queue_size
+        self._listeners: dict[str, set[asyncio.Queue[ServerResponseModel]]] = (
+            defaultdict(set)
+        )
+        self._subscriber: Optional["AsyncAPISubscriber"] = None
+        self._lock = asyncio.Lock()
+
+    _default_fan_out: "Optional[ChatFanOut]" = None
+
+    @classmethod
+    def get_default(cls) -> "ChatFanOut":
+        if cls._default_fan_out is None:
+            from .app import broker
+
+            cls._default_fan_out = cls(broker)
+        return cls._default_fan_out
+
+    async def start(self) -> None:
+        async with self._lock:
+            if self._subscriber is not None:
+                return
+
+            from faststream.nats import NatsMessage
+
+            # workers may publish in any of the supported encodings
+            async def handle_message(msg: NatsMessage) -> None:
+                body = decode_message(ServerResponseModel, msg.body, msg.content_type)
+                self._dispatch(body, msg.raw_message.subject)
+
+            await self._broker.connect()
+
+            subscriber = self._broker.subscriber(subject=self.SUBJECT)
+            subscriber(handle_message)
+            self._broker.setup_subscriber(subscriber)
+            await subscriber.start()
+
+            self._subscriber = subscriber
+
+    async def close(self) -> None:
+        async with self._lock:
+            if self._subscriber is not None:
+                await self._subscriber.close()
+                self._subscriber = None
+
+    def _dispatch(self, body: ServerResponseModel, subject: str) -> None:
+        for queue in self._listeners.get(subject, ()):
+            if queue.full():
+                logger.warning(f"Dropping message for slow listener on '{subject}'")
+                continue
+            queue.put_nowait(body)
+
+    @asynccontextmanager
+    async def listen(
+        self,
+        user_id: Union[str, UUID],
+        thread_id: Union[str, UUID],
+        deployment_id: Union[str, UUID] = "playground",
+    ) -> AsyncIterator["asyncio.Queue[ServerResponseModel]"]:
+        """Receive messages sent by the server to the client for the given thread.
+
+        Only messages published after the listener is registered are received, so
+        clients should start listening before initiating the chat.
+        """
+        await self.start()
+
+        subject = chat_client_subject(user_id, thread_id, deployment_id)
+        queue: asyncio.Queue[ServerResponseModel] = asyncio.Queue(
+            maxsize=self._max_queue_size
+        )
+        self._listeners[subject].add(queue)
+        try:
+            yield queue
+        finally:
+            self._listeners[subject].discard(queue)
+            if not self._listeners[subject]:
+                del self._listeners[subject]
+
+    async def send_input(
+        self,
+        user_id: Union[str, UUID],
+        thread_id: Union[str, UUID],
+        input_response: InputResponseModel,
+        deployment_id: Union[str, UUID] = "playground",
+    ) -> None:
+        """Send the client's reply to an input request to the server."""
+        await self._broker.connect()
+        await self._broker.publish(
+            input_response, chat_server_subject(user_id, thread_id, deployment_id)
+        )
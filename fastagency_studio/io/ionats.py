@@ -1,59 +1,93 @@
 import asyncio
 import os
+import socket
 import time
 import traceback
+from datetime import datetime, timedelta, timezone
 from queue import Queue
-from typing import TYPE_CHECKING, Any, Callable, Literal, Optional, Union
+from typing import TYPE_CHECKING, Any, Literal, Optional, Union
 from uuid import UUID
 
 from asyncer import asyncify, syncify
 from autogen.io.base import IOStream
 from faststream import Logger
 from faststream.nats import NatsMessage
+from nats.errors import NotJSMessageError
 from nats.js import api
 from pydantic import BaseModel
 
 from ..db.base import DefaultDB
-from ..models.teams.multi_agent_team import MultiAgentTeam
-from ..models.teams.two_agent_teams import TwoAgentTeam
-from .app import app, broker, stream  # noqa
+from ..deployment_jobs import (
+    DEPLOYMENT_CONCURRENCY,
+    DEPLOYMENT_JOBS_SUBJECT,
+    DeploymentWorker,
+)
+from ..helpers import deploy_saas_app, set_app_deploy_status
+from ..models.llms.client_pool import llm_client_pool
+from ..models.llms.response_cache import llm_response_cache
+from ..models.secrets.cache import SECRET_CACHE_INVALIDATE_SUBJECT, secret_cache
+from ..models.teams.multi_agent_team import AutogenMultiAgentTeam, MultiAgentTeam
+from ..models.teams.two_agent_teams import AutogenTwoAgentTeam, TwoAgentTeam
+from ..tracing import configure_tracing, start_span
+from .app import app, broker, stream
+from .checkpoints import (
+    ChatCheckpoint,
+    CheckpointStoreProtocol,
+    NatsCheckpointStore,
+    checkpoint_key,
+)
+from .encoding import Encoding, decode_message, encode_message, negotiate_encoding
+from .fanout import chat_client_subject, chat_server_subject
+from .messages import (
+    CacheInvalidationModel,
+    DeltaModel,
+    DeploymentJobModel,
+    ErrorResoponseModel,
+    InputRequestModel,
+    InputResponseModel,
+    PrintModel,
+    ServerResponseModel,
+    TerminateModel,
+)
+from .metrics import MetricsProtocol, PrometheusMetrics, create_metrics
 
 if TYPE_CHECKING:
     from faststream.nats.subscriber.asyncapi import AsyncAPISubscriber
 
 
-class PrintModel(BaseModel):
-    msg: str
-
-
-class InputRequestModel(BaseModel):
-    prompt: str
-    is_password: bool
-
-
-class InputResponseModel(BaseModel):
-    msg: str
+class ChatHandedOffError(RuntimeError):
+    pass
 
 
-class TerminateModel(BaseModel):
-    msg: str = "Chat completed."
+configure_tracing("fastagency-studio-worker")
 
 
-class ErrorResoponseModel(BaseModel):
-    msg: str
-
+# patch this is tests
+metrics: MetricsProtocol = create_metrics()
+secret_cache.metrics = metrics
+llm_client_pool.metrics = metrics
+llm_response_cache.metrics = metrics
 
-TYPE_LITERAL = Literal["input", "print", "terminate", "error"]
+# the worker exposes the metrics on http://<host>:<METRICS_PORT>/metrics if set
+METRICS_PORT: Optional[str] = os.environ.get("METRICS_PORT")
 
 
-class ServerResponseModel(BaseModel):
-    data: Union[InputRequestModel, PrintModel, TerminateModel, ErrorResoponseModel]
-    type: TYPE_LITERAL
+def team_type(team: Any) -> str:
+    # AutogenTwoAgentTeam -> TwoAgentTeam
+    return type(team).__name__.removeprefix("Autogen")
 
 
 class IONats(IOStream):  # type: ignore[misc]
+    # streamed tokens are coalesced and sent at most once per interval (in seconds)
+    DELTA_INTERVAL = 0.05
+
     def __init__(
-        self, user_id: str, thread_id: str, deployment_id: Optional[str] = "playground"
+        self,
+        user_id: str,
+        thread_id: str,
+        deployment_id: Optional[str] = "playground",
+        encoding: Encoding = "json",
+        inputs_received: int = 0,
     ) -> None:
         """Initialize the IO class."""
         self.queue: Queue = Queue()  # type: ignore[type-arg]
@@ -61,13 +95,25 @@ class IONats(IOStream):  # type: ignore[misc]
         self._user_id = user_id
         self._thread_id = thread_id
         self._deployment_id = deployment_id
+        self._encoding = encoding
+        # replies consumed before the chat was resumed are replayed by JetStream
+        self._inputs_to_skip = inputs_received
+        self.inputs_received = inputs_received
+        # set when the chat is handed off to another worker
+        self.closed = False
         self.subscriber: "AsyncAPISubscriber"
+        self.subscriber_setup_seconds = 0.0
+        # known only after the team is built
+        self.team_type = "unknown"
+
+        self._delta_buffer: list[str] = []
+        self._delta_sent_at = 0.0
 
-        self._input_request_subject = (
-            f"chat.client.messages.{user_id}.{deployment_id}.{thread_id}"
+        self._input_request_subject = chat_client_subject(
+            user_id, thread_id, deployment_id
         )
-        self._input_receive_subject = (
-            f"chat.server.messages.{user_id}.{deployment_id}.{thread_id}"
+        self._input_receive_subject = chat_server_subject(
+            user_id, thread_id, deployment_id
         )
 
     @classmethod
@@ -76,13 +122,22 @@ class IONats(IOStream):  # type: ignore[misc]
         user_id: Union[str, UUID],
         thread_id: Union[str, UUID],
         deployment_id: Optional[Union[str, UUID]] = "playground",
+        encoding: Optional[Encoding] = None,
+        inputs_received: int = 0,
     ) -> "IONats":
         thread_id = str(thread_id)
         user_id = str(user_id)
         deployment_id = str(deployment_id)
-        self = cls(user_id=user_id, thread_id=thread_id, deployment_id=deployment_id)
+        self = cls(
+            user_id=user_id,
+            thread_id=thread_id,
+            deployment_id=deployment_id,
+            encoding=negotiate_encoding(encoding),
+            inputs_received=inputs_received,
+        )
 
         # dynamically subscribe to the chat server
+        start = time.monotonic()
         self.subscriber = broker.subscriber(
             subject=self._input_receive_subject,
             stream=stream,
@@ -91,9 +146,21 @@ class IONats(IOStream):  # type: ignore[misc]
         self.subscriber(self.handle_input)
         broker.setup_subscriber(self.subscriber)
         await self.subscriber.start()
+        self.subscriber_setup_seconds = time.monotonic() - start
 
         return self
 
+    @property
+    def metrics_labels(self) -> dict[str, str]:
+        return {"deployment_id": str(self._deployment_id), "team_type": self.team_type}
+
+    def observe_phase(self, phase: str, seconds: float) -> None:
+        metrics.observe(
+            "chat_phase_duration_seconds",
+            seconds,
+            {**self.metrics_labels, "phase": phase},
+        )
+
     def print(
         self, *objects: Any, sep: str = " ", end: str = "\n", flush: bool = False
     ) -> None:
@@ -107,10 +174,46 @@ class IONats(IOStream):  # type: ignore[misc]
         """
         xs = sep.join(map(str, objects)) + end
 
+        # autogen prints the tokens of a streamed response with end="" and flush=True
+        if flush and not end:
+            if xs:
+                self._delta_buffer.append(xs)
+            if time.monotonic() - self._delta_sent_at >= self.DELTA_INTERVAL:
+                self.flush_deltas()
+            return
+
+        self.flush_deltas()
+
         print_data = PrintModel(msg=xs)
         msg = ServerResponseModel(data=print_data, type="print")
 
-        syncify(self._publisher)(msg, self._input_request_subject)
+        self.send(msg)
+
+    def _pop_deltas(self) -> Optional[ServerResponseModel]:
+        if not self._delta_buffer:
+            return None
+
+        delta_data = DeltaModel(msg="".join(self._delta_buffer))
+        self._delta_buffer.clear()
+        self._delta_sent_at = time.monotonic()
+
+        return ServerResponseModel(data=delta_data, type="delta")
+
+    def flush_deltas(self) -> None:
+        """Send the buffered tokens of a streamed response to the client."""
+        msg = self._pop_deltas()
+        if msg is not None:
+            self.send(msg)
+
+    def send(self, msg: ServerResponseModel) -> None:
+        """Send a message to the client in the negotiated encoding."""
+        if self.closed:
+            return
+
+        payload, headers = encode_message(msg, self._encoding)
+        metrics.inc("messages_total", {**self.metrics_labels, "type": msg.type})
+
+        syncify(self._publisher)(payload, self._input_request_subject, headers=headers)
 
     def input(self, prompt: str = "", *, password: bool = False) -> str:
         """Read a line from the input stream.
@@ -123,36 +226,55 @@ class IONats(IOStream):  # type: ignore[misc]
             str: The line read from the input stream.
 
         """
+        self.flush_deltas()
+
         # request a new input
         input_request_data = InputRequestModel(prompt=prompt, is_password=password)
         input_request_msg = ServerResponseModel(data=input_request_data, type="input")
 
-        syncify(self._publisher)(input_request_msg, self._input_request_subject)
+        self.send(input_request_msg)
 
         # wait for the input to arrive and be propagated to queue
+        start = time.monotonic()
         while self.queue.empty():
+            if self.closed:
+                raise ChatHandedOffError("The chat was handed off to another worker")
             time.sleep(0.1)
+        self.observe_phase("input_wait", time.monotonic() - start)
 
         msg: NatsMessage = self.queue.get()
 
         self.queue.task_done()
         syncify(msg.ack)()
+        self.inputs_received += 1
 
-        retval = InputResponseModel.model_validate_json(
-            msg.raw_message.data.decode("utf-8")
-        ).msg
+        retval = decode_message(InputResponseModel, msg.body, msg.content_type).msg
 
         return retval
 
-    async def handle_input(
-        self, body: InputResponseModel, msg: NatsMessage, logger: Logger
-    ) -> None:
+    # the body is decoded in input() according to its content type
+    async def handle_input(self, msg: NatsMessage, logger: Logger) -> None:
         logger.info(
-            f"Received message in subject '{self._input_receive_subject}': {body}"
+            f"Received message in subject '{self._input_receive_subject}': {msg.body!r}"
         )
 
+        if self._inputs_to_skip > 0:
+            self._inputs_to_skip -= 1
+            await msg.ack()
+            return
+
         self.queue.put(msg)
 
+    async def close(self) -> None:
+        """Flush the buffered output and stop sending and receiving messages."""
+        msg = self._pop_deltas()
+        if msg is not None:
+            payload, headers = encode_message(msg, self._encoding)
+            await self._publisher(payload, self._input_request_subject, headers=headers)
+
+        self.closed = True
+        await self.subscriber.close()
+
 
 class InitiateModel(BaseModel):
     user_id: UUID
@@ -160,12 +282,22 @@ class InitiateModel(BaseModel):
     team_id: UUID
     deployment_id: Optional[Union[str, UUID]] = "playground"
     msg: str
+    # encoding of the messages sent to the client, JSON if msgpack isn't installed
+    encoding: Encoding = "json"
+
+
+# patch this is tests
+checkpoint_store: CheckpointStoreProtocol = NatsCheckpointStore(broker)
+
+# the initiate message is kept in progress while the chat is running, so it is
+# redelivered to another worker if this one dies before the chat is finished
+CHAT_HEARTBEAT_INTERVAL = 10.0
 
 
 # patch this is tests
 async def create_team(
     team_id: UUID, user_id: UUID
-) -> Callable[[str], list[dict[str, Any]]]:
+) -> Union[AutogenTwoAgentTeam, AutogenMultiAgentTeam]:
     team_dict = await DefaultDB.backend().find_model(team_id)
 
     team_model: Union[TwoAgentTeam, MultiAgentTeam]
@@ -176,33 +308,100 @@ async def create_team(
     else:
         raise ValueError(f"Unknown team model {team_dict['json_str']}")
 
-    autogen_team = await team_model.create_autogen(team_id, user_id)
+    with start_span(
+        "create_autogen", model_type="team", model_name=type(team_model).__name__
+    ):
+        autogen_team = await team_model.create_autogen(team_id, user_id)
+
+    return autogen_team  # type: ignore[no-any-return]
+
+
+async def keep_in_progress(msg: NatsMessage) -> None:
+    while True:
+        await asyncio.sleep(CHAT_HEARTBEAT_INTERVAL)
+        await msg.in_progress()
+
+
+class RunningChat:
+    def __init__(
+        self,
+        iostream: IONats,
+        msg: NatsMessage,
+        task: "asyncio.Task[Any]",
+        heartbeat: "asyncio.Task[None]",
+    ) -> None:
+        """Track a chat running on this worker."""
+        self.iostream = iostream
+        self.msg = msg
+        self.task = task
+        self.heartbeat = heartbeat
+
+    async def hand_off(self) -> None:
+        """Stop the chat and let another worker resume it from its checkpoint."""
+        self.heartbeat.cancel()
+        await self.iostream.close()
+        # redelivered right away instead of after the ack wait expires
+        await self.msg.nack()
+
+
+running_chats: dict[str, RunningChat] = {}
+
+WORKER_ID = f"{socket.gethostname()}-{os.getpid()}"
+WORKER_STATUS_SUBJECT = "chat.workers.status"
+
+# how long running chats can take to finish after the worker receives SIGTERM
+DRAIN_TIMEOUT = float(os.environ.get("DRAIN_TIMEOUT", 60))
+
 
-    return autogen_team.initiate_chat  # type: ignore[no-any-return]
+class WorkerStatusModel(BaseModel):
+    worker_id: str
+    status: Literal["draining", "stopped"]
+    running_chats: int
+    deadline: Optional[datetime] = None
 
 
-@broker.subscriber(
+initiate_subscriber = broker.subscriber(
     "chat.server.initiate_chat",
     stream=stream,
     queue="initiate_workers",
     deliver_policy=api.DeliverPolicy("all"),
+    no_ack=True,
 )
-async def initiate_handler(
+
+
+@initiate_subscriber
+async def initiate_handler(  # noqa: C901
     body: InitiateModel, msg: NatsMessage, logger: Logger
 ) -> None:
-    await msg.ack()
-
     logger.info(
         f"Received a message in subject 'chat.server.initiate_chat': {body=} -> from process id {os.getpid()}"
     )
 
+    key = checkpoint_key(body.user_id, body.thread_id, body.deployment_id)
+    client_subject = chat_client_subject(
+        body.user_id, body.thread_id, body.deployment_id
+    )
+    started_at = time.monotonic()
+
     try:
+        checkpoint = await checkpoint_store.get(key)
+        if checkpoint is not None:
+            logger.info(f"Resuming chat '{key}' from a checkpoint")
+
         iostream = await IONats.create(
             user_id=body.user_id,
             thread_id=body.thread_id,
             deployment_id=body.deployment_id,
+            encoding=body.encoding,
+            inputs_received=checkpoint.inputs_received if checkpoint else 0,
         )
 
+        def save_checkpoint(state: dict[str, Any]) -> None:
+            syncify(checkpoint_store.put)(
+                key,
+                ChatCheckpoint(inputs_received=iostream.inputs_received, state=state),
+            )
+
         def start_chat() -> Optional[list[dict[str, Any]]]:  # type: ignore [return]
             try:
                 terminate_data = TerminateModel()
@@ -210,33 +409,97 @@ async def initiate_handler(
                     data=terminate_data, type="terminate"
                 )
 
-                with IOStream.set_default(iostream):
-                    initiate_chat = syncify(create_team)(
+                chat_span = start_span(
+                    "chat",
+                    thread_id=body.thread_id,
+                    deployment_id=body.deployment_id,
+                    resumed=checkpoint is not None,
+                )
+                with chat_span, IOStream.set_default(iostream):
+                    create_team_start = time.monotonic()
+                    team = syncify(create_team)(
                         team_id=body.team_id, user_id=body.user_id
                     )
-                    chat_result = initiate_chat(body.msg)
+                    iostream.team_type = team_type(team)
+                    iostream.observe_phase(
+                        "create_team", time.monotonic() - create_team_start
+                    )
+                    iostream.observe_phase(
+                        "subscriber_setup", iostream.subscriber_setup_seconds
+                    )
+                    metrics.inc(
+                        "chats_total",
+                        {
+                            **iostream.metrics_labels,
+                            "status": "started" if checkpoint is None else "resumed",
+                        },
+                    )
 
-                syncify(broker.publish)(
-                    terminate_chat_msg, iostream._input_request_subject
-                )  # type: ignore [arg-type]
+                    team.on_checkpoint(save_checkpoint)
+                    team.on_reply_timing(iostream.observe_phase)
+                    if checkpoint is None:
+                        chat_result = team.initiate_chat(body.msg)
+                    else:
+                        chat_result = team.resume_chat(checkpoint.state)
+
+                if iostream.closed:
+                    metrics.inc(
+                        "chats_total",
+                        {**iostream.metrics_labels, "status": "handed_off"},
+                    )
+                    return None
+
+                metrics.inc(
+                    "chats_total", {**iostream.metrics_labels, "status": "completed"}
+                )
+                iostream.flush_deltas()
+                iostream.send(terminate_chat_msg)
+                syncify(checkpoint_store.delete)(key)
                 return chat_result
             except Exception as e:
+                if iostream.closed:
+                    logger.info(f"Chat '{key}' was handed off to another worker")
+                    metrics.inc(
+                        "chats_total",
+                        {**iostream.metrics_labels, "status": "handed_off"},
+                    )
+                    return None
+
+                metrics.inc(
+                    "chats_total", {**iostream.metrics_labels, "status": "failed"}
+                )
                 logger.error(f"Error in chat: {e}")
                 logger.error(traceback.format_exc())
 
+                iostream.flush_deltas()
                 error_data = ErrorResoponseModel(msg=str(e))
                 error_msg = ServerResponseModel(data=error_data, type="error")
-                syncify(broker.publish)(error_msg, iostream._input_request_subject)
+                iostream.send(error_msg)
+                syncify(checkpoint_store.delete)(key)
 
         async_start_chat = asyncify(start_chat)
 
         background_tasks = set()
         task = asyncio.create_task(async_start_chat())  # type: ignore
         background_tasks.add(task)
+        heartbeat = asyncio.create_task(keep_in_progress(msg))
+        running_chats[key] = RunningChat(iostream, msg, task, heartbeat)
 
         async def callback(t: asyncio.Task[Any]) -> None:
             try:
                 background_tasks.discard(t)
+                if iostream.closed:
+                    return
+
+                metrics.observe(
+                    "chat_duration_seconds",
+                    time.monotonic() - started_at,
+                    iostream.metrics_labels,
+                )
+
+                running_chats.pop(key, None)
+                heartbeat.cancel()
+                await msg.ack()
                 await iostream.subscriber.close()
             except Exception as e:
                 logger.error(f"Error in callback: {e}")
@@ -248,6 +511,134 @@ async def initiate_handler(
         logger.error(f"Error in handling initiate chat: {e}")
         logger.error(traceback.format_exc())
 
+        await msg.ack()
+        metrics.inc(
+            "chats_total",
+            {
+                "deployment_id": str(body.deployment_id),
+                "team_type": "unknown",
+                "status": "failed",
+            },
+        )
+
         error_data = ErrorResoponseModel(msg=str(e))
         error_msg = ServerResponseModel(data=error_data, type="error")
-        syncify(broker.publish)(error_msg, iostream._input_request_subject)  # type: ignore [arg-type]
+        await broker.publish(error_msg, client_subject)
+
+
+# patch this is tests
+deployment_worker = DeploymentWorker(
+    deploy=deploy_saas_app, set_status=set_app_deploy_status
+)
+
+deployment_subscriber = broker.subscriber(
+    DEPLOYMENT_JOBS_SUBJECT,
+    stream=stream,
+    queue="deployment_workers",
+    deliver_policy=api.DeliverPolicy("all"),
+    max_workers=DEPLOYMENT_CONCURRENCY,
+    no_ack=True,
+)
+
+
+def delivery_attempt(msg: NatsMessage) -> int:
+    """Return how many times the message was delivered, 1 if it isn't a JetStream message."""
+    try:
+        return msg.raw_message.metadata.num_delivered or 1
+    except NotJSMessageError:
+        return 1
+
+
+@deployment_subscriber
+async def deployment_handler(
+    body: DeploymentJobModel, msg: NatsMessage, logger: Logger
+) -> None:
+    attempt = delivery_attempt(msg)
+    logger.info(f"Deploying {body.model_uuid}, attempt {attempt}")
+
+    # redelivered to another worker if this one dies before the deployment is done
+    heartbeat = asyncio.create_task(keep_in_progress(msg))
+    try:
+        delay = await deployment_worker.handle(body, attempt)
+    finally:
+        heartbeat.cancel()
+
+    if delay is None:
+        await msg.ack()
+    else:
+        await msg.nack(delay=delay)
+
+
+# no queue group, every worker drops the secrets from its own cache
+@broker.subscriber(SECRET_CACHE_INVALIDATE_SUBJECT)
+async def secret_invalidation_handler(body: CacheInvalidationModel) -> None:
+    secret_cache.invalidate(*body.model_uuids)
+
+
+async def drain(logger: Logger, timeout: float = DRAIN_TIMEOUT) -> None:
+    """Stop accepting new chats and deployments and wait for the running ones to finish.
+
+    Chats still running after the timeout are handed off to other workers, which
+    resume them from their last checkpoint. Deployments are waited for until they
+    finish, their threads can't be stopped and a redelivered job would push to
+    the same repository at the same time.
+    """
+    await initiate_subscriber.close()
+    # closing the subscriber cancels its handlers, so it is closed after the wait
+    deployments = asyncio.create_task(deployment_worker.drain(timeout))
+
+    deadline = datetime.now(timezone.utc) + timedelta(seconds=timeout)
+    logger.info(
+        f"Draining worker '{WORKER_ID}' with {len(running_chats)} running chats until {deadline}"
+    )
+    await broker.publish(
+        WorkerStatusModel(
+            worker_id=WORKER_ID,
+            status="draining",
+            running_chats=len(running_chats),
+            deadline=deadline,
+        ),
+        WORKER_STATUS_SUBJECT,
+    )
+
+    if running_chats:
+        await asyncio.wait(
+            [chat.task for chat in running_chats.values()], timeout=timeout
+        )
+
+    for key, chat in list(running_chats.items()):
+        if chat.task.done():
+            continue
+
+        logger.warning(f"Handing chat '{key}' off to another worker")
+        await chat.hand_off()
+        del running_chats[key]
+
+    # the chats are handed off first, so they don't wait for the deployments
+    if not await deployments:
+        logger.warning("Waiting for the running deployments to finish")
+        await deployment_worker.drain()
+    await deployment_subscriber.close()
+
+    await broker.publish(
+        WorkerStatusModel(worker_id=WORKER_ID, status="stopped", running_chats=0),
+        WORKER_STATUS_SUBJECT,
+    )
+
+
+@app.on_shutdown
+async def drain_on_shutdown(logger: Logger) -> None:
+    await drain(logger)
+
+
+@app.after_startup
+async def start_metrics_server(logger: Logger) -> None:
+    if METRICS_PORT is None:
+        return
+
+    if not isinstance(metrics, PrometheusMetrics):
+        logger.warning("METRICS_PORT is set, but prometheus_client is not installed")
+        return
+
+    metrics.start_http_server(int(METRICS_PORT))
+    logger.info(f"Serving metrics on port {METRICS_PORT}")
@@ -0,0 +1,66 @@
+from typing import Literal, Union
+
+from pydantic import BaseModel, ConfigDict
+
+__all__ = [
+    "CacheInvalidationModel",
+    "DeltaModel",
+    "DeploymentJobModel",
+    "ErrorResoponseModel",
+    "InputRequestModel",
+    "InputResponseModel",
+    "PrintModel",
+    "ServerResponseModel",
+    "TerminateModel",
+]
+
+
+class PrintModel(BaseModel):
+    msg: str
+
+
+class DeltaModel(BaseModel):
+    msg: str
+
+
+class InputRequestModel(BaseModel):
+    prompt: str
+    is_password: bool
+
+
+class InputResponseModel(BaseModel):
+    msg: str
+
+
+class TerminateModel(BaseModel):
+    msg: str = "Chat completed."
+
+
+class ErrorResoponseModel(BaseModel):
+    msg: str
+
+
+TYPE_LITERAL = Literal["input", "print", "delta", "terminate", "error"]
+
+
+class CacheInvalidationModel(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    model_uuids: list[str]
+
+
+class DeploymentJobModel(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    # the tokens are read from the database by the worker, they are never sent
+    user_uuid: str
+    model_uuid: str
+    type_name: str
+    model_name: str
+
+
+class ServerResponseModel(BaseModel):
+    data: Union[
+        InputRequestModel, PrintModel, DeltaModel, TerminateModel, ErrorResoponseModel
+    ]
+    type: TYPE_LITERAL
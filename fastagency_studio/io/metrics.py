@@ -0,0 +1,174 @@
+from collections import defaultdict
+from typing import TYPE_CHECKING, Optional, Protocol, runtime_checkable
+
+if TYPE_CHECKING:
+    from prometheus_client import CollectorRegistry
+
+__all__ = [
+    "COUNTERS",
+    "HISTOGRAMS",
+    "InMemoryMetrics",
+    "MetricsProtocol",
+    "NoopMetrics",
+    "PrometheusMetrics",
+    "create_metrics",
+    "is_prometheus_available",
+]
+
+NAMESPACE = "fastagency"
+
+# name -> (documentation, label names)
+COUNTERS: dict[str, tuple[str, tuple[str, ...]]] = {
+    "chats_total": (
+        "Number of chats by outcome: started, resumed, completed, failed or handed_off",
+        ("deployment_id", "team_type", "status"),
+    ),
+    "messages_total": (
+        "Number of messages sent to the client by message type",
+        ("deployment_id", "team_type", "type"),
+    ),
+    "secret_cache_lookups_total": (
+        "Number of secret cache lookups by result: hit, miss or expired",
+        ("result",),
+    ),
+    "llm_client_pool_total": (
+        "Number of LLM HTTP clients reused (hit), created (miss) or evicted from the pool",
+        ("result",),
+    ),
+    "llm_response_cache_lookups_total": (
+        "Number of LLM response cache lookups by backend and result: hit, miss or expired",
+        ("backend", "result"),
+    ),
+    "llm_response_cache_saved_cost_total": (
+        "Cost in USD of the LLM responses served from the response cache",
+        ("backend",),
+    ),
+}
+
+HISTOGRAMS: dict[str, tuple[str, tuple[str, ...]]] = {
+    "chat_duration_seconds": (
+        "Time from receiving the initiate message until the chat is finished",
+        ("deployment_id", "team_type"),
+    ),
+    "chat_phase_duration_seconds": (
+        "Time spent in a phase of the chat: subscriber_setup, create_team, llm, tool or input_wait",
+        ("deployment_id", "team_type", "phase"),
+    ),
+}
+
+# chats and waiting for human input take much longer than the default buckets
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+@runtime_checkable
+class MetricsProtocol(Protocol):
+    def inc(self, name: str, labels: dict[str, str], value: float = 1.0) -> None: ...
+
+    def observe(self, name: str, value: float, labels: dict[str, str]) -> None: ...
+
+
+class NoopMetrics(MetricsProtocol):
+    def inc(self, name: str, labels: dict[str, str], value: float = 1.0) -> None:
+        pass
+
+    def observe(self, name: str, value: float, labels: dict[str, str]) -> None:
+        pass
+
+
+class InMemoryMetrics(MetricsProtocol):
+    """Keep the counters and observations in memory, useful for testing."""
+
+    def __init__(self) -> None:
+        """Initialize the in-memory metrics."""
+        self.counters: dict[tuple[str, tuple[tuple[str, str], ...]], float] = (
+            defaultdict(float)
+        )
+        self.observations: dict[
+            tuple[str, tuple[tuple[str, str], ...]], list[float]
+        ] = defaultdict(list)
+
+    def inc(self, name: str, labels: dict[str, str], value: float = 1.0) -> None:
+        self.counters[(name, tuple(sorted(labels.items())))] += value
+
+    def observe(self, name: str, value: float, labels: dict[str, str]) -> None:
+        self.observations[(name, tuple(sorted(labels.items())))].append(value)
+
+    def count(self, name: str, **labels: str) -> float:
+        """Return the sum of the counter over all label sets matching labels."""
+        return sum(
+            value
+            for (n, label_set), value in self.counters.items()
+            if n == name and labels.items() <= dict(label_set).items()
+        )
+
+    def values(self, name: str, **labels: str) -> list[float]:
+        """Return the observations of the histogram over all label sets matching labels."""
+        return [
+            value
+            for (n, label_set), values in self.observations.items()
+            if n == name and labels.items() <= dict(label_set).items()
+            for value in values
+        ]
+
+
+class PrometheusMetrics(MetricsProtocol):
+    def __init__(self, registry: Optional["CollectorRegistry"] = None) -> None:
+        """Initialize the metrics backed by prometheus_client.
+
+        Args:
+            registry (Optional[CollectorRegistry], optional): The registry of the
+                metrics. Defaults to a new registry.
+        """
+        from prometheus_client import CollectorRegistry, Counter, Histogram
+
+        self.registry = registry if registry is not None else CollectorRegistry()
+        self._counters = {
+            name: Counter(
+                name.removesuffix("_total"),
+                doc,
+                labels,
+                namespace=NAMESPACE,
+                registry=self.registry,
+            )
+            for name, (doc, labels) in COUNTERS.items()
+        }
+        self._histograms = {
+            name: Histogram(
+                name,
+                doc,
+                labels,
+                namespace=NAMESPACE,
+                registry=self.registry,
+                buckets=BUCKETS,
+            )
+            for name, (doc, labels) in HISTOGRAMS.items()
+        }
+
+    def inc(self, name: str, labels: dict[str, str], value: float = 1.0) -> None:
+        self._counters[name].labels(**labels).inc(value)
+
+    def observe(self, name: str, value: float, labels: dict[str, str]) -> None:
+        self._histograms[name].labels(**labels).observe(value)
+
+    def start_http_server(self, port: int, addr: str = "0.0.0.0") -> None:  # nosec B104
+        """Expose the metrics on http://<addr>:<port>/metrics in a background thread."""
+        from prometheus_client import start_http_server
+
+        start_http_server(port, addr=addr, registry=self.registry)
+
+
+def is_prometheus_available() -> bool:
+    try:
+        import prometheus_client  # noqa: F401
+    except ImportError:
+        return False
+
+    return True
+
+
+def create_metrics() -> MetricsProtocol:
+    """Return Prometheus metrics if prometheus_client is installed, no-op metrics otherwise."""
+    if is_prometheus_available():
+        return PrometheusMetrics()
+
+    return NoopMetrics()
@@ -1,13 +1,14 @@
-from typing import Annotated, Any
+from typing import TYPE_CHECKING, Annotated, Any
 from uuid import UUID
 
-import autogen
-from fastagency.api.openapi import OpenAPI
-
 from ..base import Field
 from ..registry import register
 from .base import AgentBaseModel
 
+if TYPE_CHECKING:
+    import autogen
+    from fastagency.api.openapi import OpenAPI
+
 
 @register("agent")
 class AssistantAgent(AgentBaseModel):
@@ -22,7 +23,9 @@ class AssistantAgent(AgentBaseModel):
     @classmethod
     async def create_autogen(
         cls, model_id: UUID, user_id: UUID, **kwargs: Any
-    ) -> tuple[autogen.agentchat.AssistantAgent, list[OpenAPI]]:
+    ) -> "tuple[autogen.agentchat.AssistantAgent, list[OpenAPI]]":
+        import autogen
+
         my_model = await cls.from_db(model_id)
 
         llm_model = await my_model.llm.get_data_model().from_db(my_model.llm.uuid)
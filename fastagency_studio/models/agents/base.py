@@ -1,13 +1,15 @@
-from typing import Annotated, Optional, Union
+from typing import TYPE_CHECKING, Annotated, Optional, Union
 from uuid import UUID
 
-from fastagency.api.openapi import OpenAPI
 from typing_extensions import TypeAlias
 
 from ..base import Field, Model
 from ..registry import Registry
 from ..toolboxes.toolbox import ToolboxRef
 
+if TYPE_CHECKING:
+    from fastagency.api.openapi import OpenAPI
+
 __all__ = ["AgentBaseModel"]
 
 # Agents can work with any LLM, so we construct a union of all LLM references
@@ -53,10 +55,10 @@ class AgentBaseModel(Model):
         ),
     ] = None
 
-    async def get_clients_from_toolboxes(self, user_id: UUID) -> list[OpenAPI]:
+    async def get_clients_from_toolboxes(self, user_id: UUID) -> "list[OpenAPI]":
         clients: list[OpenAPI] = []
         for i in range(3):
-            toolbox_property = getattr(self, f"toolbox_{i+1}")
+            toolbox_property = getattr(self, f"toolbox_{i + 1}")
             if toolbox_property is None:
                 continue
 
@@ -1,12 +1,13 @@
-from typing import Annotated, Any, Optional
+from typing import TYPE_CHECKING, Annotated, Any, Optional
 from uuid import UUID
 
-import autogen
-from fastagency.api.openapi import OpenAPI
-
 from ..base import Field, Model
 from ..registry import register
 
+if TYPE_CHECKING:
+    import autogen
+    from fastagency.api.openapi import OpenAPI
+
 
 @register("agent")
 class UserProxyAgent(Model):
@@ -21,7 +22,9 @@ class UserProxyAgent(Model):
     @classmethod
     async def create_autogen(
         cls, model_id: UUID, user_id: UUID, **kwargs: Any
-    ) -> tuple[autogen.agentchat.AssistantAgent, list[OpenAPI]]:
+    ) -> "tuple[autogen.agentchat.AssistantAgent, list[OpenAPI]]":
+        import autogen
+
         my_model = await cls.from_db(model_id)
 
         agent_name = my_model.name
@@ -1,16 +1,19 @@
-from typing import Annotated, Any, Optional
+from typing import TYPE_CHECKING, Annotated, Any, Optional
 from uuid import UUID
 
 from asyncer import syncify
-from autogen.agentchat import AssistantAgent as AutoGenAssistantAgent
-from autogen.agentchat import ConversableAgent as AutoGenConversableAgent
-from fastagency.runtimes.autogen.tools import WebSurferTool
 from typing_extensions import TypeAlias
 
 from ..base import Field, Model
 from ..registry import register
+from ..secrets.cache import secret_cache
 from .base import AgentBaseModel, llm_type_refs
 
+if TYPE_CHECKING:
+    from autogen.agentchat import AssistantAgent as AutoGenAssistantAgent
+    from autogen.agentchat import ConversableAgent as AutoGenConversableAgent
+    from fastagency.runtimes.autogen.tools import WebSurferTool
+
 
 @register("secret")
 class BingAPIKey(Model):
@@ -34,7 +37,7 @@ BingAPIKeyRef: TypeAlias = BingAPIKey.get_reference_model()  # type: ignore[vali
 
 
 class WebSurferToolbox:
-    def __init__(self, websurfer_tool: WebSurferTool):
+    def __init__(self, websurfer_tool: "WebSurferTool"):
         """Create a toolbox for the web surfer agent. This toolbox will contain functions to delegate web surfing tasks to the internal web surfer agent.
 
         Args:
@@ -76,11 +79,11 @@ class WebSurferToolbox:
             continue_task_with_additional_instructions,
         ]
 
-    def register_for_llm(self, agent: AutoGenConversableAgent) -> None:
+    def register_for_llm(self, agent: "AutoGenConversableAgent") -> None:
         for f in self.registered_funcs:
             agent.register_for_llm()(f)
 
-    def register_for_execution(self, agent: AutoGenConversableAgent) -> None:
+    def register_for_execution(self, agent: "AutoGenConversableAgent") -> None:
         for f in self.registered_funcs:
             agent.register_for_execution()(f)
 
@@ -114,7 +117,10 @@ class WebSurferAgent(AgentBaseModel):
     @classmethod
     async def create_autogen(
         cls, model_id: UUID, user_id: UUID, **kwargs: Any
-    ) -> tuple[AutoGenAssistantAgent, list[WebSurferToolbox]]:
+    ) -> "tuple[AutoGenAssistantAgent, list[WebSurferToolbox]]":
+        from autogen.agentchat import AssistantAgent as AutoGenAssistantAgent
+        from fastagency.runtimes.autogen.tools import WebSurferTool
+
         from ...helpers import create_autogen, get_model_by_uuid
 
         websurfer_model: WebSurferAgent = await get_model_by_uuid(model_id)  # type: ignore [assignment]
@@ -123,11 +129,15 @@ class WebSurferAgent(AgentBaseModel):
             websurfer_model.summarizer_llm, user_id
         )
 
-        bing_api_key = (
-            await create_autogen(websurfer_model.bing_api_key, user_id)
-            if websurfer_model.bing_api_key
-            else None
-        )
+        bing_api_key = None
+        bing_api_key_ref = websurfer_model.bing_api_key
+        if bing_api_key_ref:
+            bing_api_key = await secret_cache.get(
+                bing_api_key_ref.uuid,
+                lambda: bing_api_key_ref.get_data_model().create_autogen(
+                    bing_api_key_ref.uuid, user_id
+                ),
+            )
 
         viewport_size = websurfer_model.viewport_size
 
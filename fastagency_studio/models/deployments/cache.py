@@ -0,0 +1,113 @@
+import asyncio
+import time
+from os import environ
+from typing import NamedTuple, Union
+from uuid import UUID
+
+from ...db.base import DefaultDB
+
+__all__ = [
+    "DEPLOYMENT_CACHE_TTL",
+    "DeploymentCache",
+    "DeploymentInfo",
+    "deployment_cache",
+]
+
+# deployments are cached for this many seconds, 0 disables the cache. Other API
+# processes see a changed team of a deployment when their entry expires, so keep it short
+DEPLOYMENT_CACHE_TTL = float(environ.get("DEPLOYMENT_CACHE_TTL", 10))
+
+
+class DeploymentInfo(NamedTuple):
+    name: str
+    team_uuid: str
+    # updated_at of the deployment when it was read
+    version: str
+
+
+class DeploymentCache:
+    """Read-through cache of the deployment details needed to open a chat.
+
+    Concurrent lookups of a deployment that isn't cached share a single
+    database read. Invalidation is local to the process, like for secrets.
+    """
+
+    def __init__(
+        self, ttl: float = DEPLOYMENT_CACHE_TTL, max_size: int = 10_000
+    ) -> None:
+        """Initialize the deployment cache.
+
+        Args:
+            ttl (float, optional): Time in seconds until an entry expires.
+                Defaults to DEPLOYMENT_CACHE_TTL.
+            max_size (int, optional): Maximum number of entries, the oldest entry
+                is evicted when it is reached. Defaults to 10_000.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self._entries: dict[str, tuple[DeploymentInfo, float]] = {}
+        self._loading: dict[str, asyncio.Task[DeploymentInfo]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of cached deployments, including expired ones."""
+        return len(self._entries)
+
+    def cached(self, deployment_uuid: Union[str, UUID]) -> bool:
+        """Return whether the deployment is cached and not expired."""
+        entry = self._entries.get(str(deployment_uuid))
+        return entry is not None and time.monotonic() < entry[1]
+
+    async def get(self, deployment_uuid: Union[str, UUID]) -> DeploymentInfo:
+        """Return the deployment, reading it from the database if it isn't cached.
+
+        Raises:
+            KeyNotFoundError: If the deployment doesn't exist.
+        """
+        key = str(deployment_uuid)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            info, expires_at = entry
+            if time.monotonic() < expires_at:
+                return info
+            del self._entries[key]
+
+        if key not in self._loading:
+            # the read runs in its own task, so that a cancelled caller, e.g. on a
+            # client disconnect, doesn't abort it for the others waiting on it
+            task = asyncio.create_task(self._load(key))
+            self._loading[key] = task
+            task.add_done_callback(lambda task: self._loaded(key, task))
+
+        return await asyncio.shield(self._loading[key])
+
+    def _loaded(self, key: str, task: "asyncio.Task[DeploymentInfo]") -> None:
+        del self._loading[key]
+        # exception() also marks the exception as retrieved if nobody was waiting
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        if self.ttl > 0:
+            if len(self._entries) >= self.max_size:
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = (task.result(), time.monotonic() + self.ttl)
+
+    async def _load(self, deployment_uuid: str) -> DeploymentInfo:
+        found_model = await DefaultDB.backend().find_model(model_uuid=deployment_uuid)
+        return DeploymentInfo(
+            name=found_model["json_str"]["name"],
+            team_uuid=found_model["json_str"]["team"]["uuid"],
+            version=str(found_model["updated_at"]),
+        )
+
+    def invalidate(self, *deployment_uuids: Union[str, UUID]) -> None:
+        """Remove the deployments from the cache, unknown ids are ignored."""
+        for deployment_uuid in deployment_uuids:
+            self._entries.pop(str(deployment_uuid), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+deployment_cache = DeploymentCache()
@@ -7,6 +7,9 @@ from typing_extensions import TypeAlias
 
 from ..base import Field, Model
 from ..registry import register
+from ..secrets.cache import secret_cache
+from .client_pool import llm_client_pool
+from .response_cache import ResponseCacheBackend, llm_response_cache
 
 __all__ = [
     "AzureOAIAPIKey",
@@ -109,6 +112,22 @@ class AzureOAI(Model):
         ),
     ] = 0.8
 
+    stream: Annotated[
+        bool,
+        Field(
+            description="Whether to stream the response token by token",
+            tooltip_message="Enable streaming to see the response while it is being generated instead of waiting for the complete answer.",
+        ),
+    ] = False
+
+    response_cache: Annotated[
+        ResponseCacheBackend,
+        Field(
+            description="Where to cache responses when the temperature is 0: 'disabled', 'memory' or 'sqlite'",
+            tooltip_message="Reuse the responses to repeated requests instead of sending them to the LLM again. Responses are cached only if the temperature is 0.",
+        ),
+    ] = "disabled"
+
     @field_validator("base_url")
     @classmethod
     def validate_base_url(cls: type["AzureOAI"], value: Any) -> Any:
@@ -122,24 +141,32 @@ class AzureOAI(Model):
     ) -> dict[str, Any]:
         my_model = await cls.from_db(model_id)
 
-        api_key_model = await my_model.api_key.get_data_model().from_db(
-            my_model.api_key.uuid
+        api_key = await secret_cache.get(
+            my_model.api_key.uuid,
+            lambda: my_model.api_key.get_data_model().create_autogen(
+                my_model.api_key.uuid, user_id
+            ),
         )
-        api_key = await api_key_model.create_autogen(my_model.api_key.uuid, user_id)
 
         config_list = [
-            {
-                "model": my_model.model,
-                "api_key": api_key,
-                "base_url": str(my_model.base_url),
-                "api_type": my_model.api_type,
-                "api_version": my_model.api_version,
-            }
+            llm_client_pool.with_http_client(
+                {
+                    "model": my_model.model,
+                    "api_key": api_key,
+                    "base_url": str(my_model.base_url),
+                    "api_type": my_model.api_type,
+                    "api_version": my_model.api_version,
+                }
+            )
         ]
 
         llm_config = {
             "config_list": config_list,
             "temperature": my_model.temperature,
+            "stream": my_model.stream,
+            **llm_response_cache.llm_config(
+                model_id, my_model.response_cache, my_model.temperature
+            ),
         }
 
         return llm_config
@@ -0,0 +1,154 @@
+import hashlib
+import threading
+import time
+from os import environ
+from typing import Any, Optional
+
+import httpx
+
+from ...io.metrics import MetricsProtocol, NoopMetrics
+
+__all__ = [
+    "LLMClientPool",
+    "SharedHttpxClient",
+    "llm_client_pool",
+]
+
+# maximum number of connections of each client to a provider
+LLM_CLIENT_MAX_CONNECTIONS = int(environ.get("LLM_CLIENT_MAX_CONNECTIONS", 100))
+# idle connections are closed after this many seconds
+LLM_CLIENT_KEEPALIVE_EXPIRY = float(environ.get("LLM_CLIENT_KEEPALIVE_EXPIRY", 30))
+# clients unused for this many seconds are removed from the pool
+LLM_CLIENT_IDLE_TIMEOUT = float(environ.get("LLM_CLIENT_IDLE_TIMEOUT", 600))
+# set to "false" to let autogen create a new client for every agent
+LLM_CLIENT_POOL_ENABLED = environ.get("LLM_CLIENT_POOL", "true").lower() == "true"
+
+# (api_type, base_url, api_key hash, api_version)
+PoolKey = tuple[str, str, str, Optional[str]]
+
+
+class SharedHttpxClient(httpx.Client):
+    """HTTP client shared by the OpenAI SDK clients of all agents using the same provider.
+
+    Autogen deep-copies llm_config, so a copy must be the shared client itself.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        """Create the client with the defaults of the OpenAI SDK client.
+
+        The openai package is not imported here, as the API must not import it.
+        """
+        kwargs.setdefault("timeout", httpx.Timeout(timeout=600, connect=5.0))
+        kwargs.setdefault("follow_redirects", True)
+        super().__init__(**kwargs)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> "SharedHttpxClient":
+        """Return the client itself instead of a copy."""
+        return self
+
+
+class LLMClientPool:
+    """Process-wide pool of HTTP clients for the OpenAI compatible LLM providers.
+
+    Each client keeps its connections to a provider alive, so a new chat
+    reuses them instead of paying for a new TCP and TLS handshake.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections: int = LLM_CLIENT_MAX_CONNECTIONS,
+        keepalive_expiry: float = LLM_CLIENT_KEEPALIVE_EXPIRY,
+        idle_timeout: float = LLM_CLIENT_IDLE_TIMEOUT,
+        enabled: bool = LLM_CLIENT_POOL_ENABLED,
+    ) -> None:
+        """Initialize the pool.
+
+        Args:
+            max_connections (int, optional): Maximum number of connections of each
+                client. Defaults to LLM_CLIENT_MAX_CONNECTIONS.
+            keepalive_expiry (float, optional): Time in seconds after which idle
+                connections are closed. Defaults to LLM_CLIENT_KEEPALIVE_EXPIRY.
+            idle_timeout (float, optional): Time in seconds after which an unused
+                client is removed from the pool. Defaults to LLM_CLIENT_IDLE_TIMEOUT.
+            enabled (bool, optional): Whether clients are shared at all. Defaults
+                to LLM_CLIENT_POOL_ENABLED.
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.idle_timeout = idle_timeout
+        self.enabled = enabled
+        self.metrics: MetricsProtocol = NoopMetrics()
+
+        self._clients: dict[PoolKey, tuple[SharedHttpxClient, float]] = {}
+        # agents are created in the event loop, but also in the threads of chats
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of clients in the pool."""
+        return len(self._clients)
+
+    def get(
+        self,
+        api_type: str,
+        base_url: str,
+        api_key: str,
+        api_version: Optional[str] = None,
+    ) -> SharedHttpxClient:
+        """Return the client for the provider, creating it if needed."""
+        key = (
+            api_type,
+            base_url,
+            hashlib.sha256(api_key.encode()).hexdigest(),
+            api_version,
+        )
+        now = time.monotonic()
+
+        with self._lock:
+            self._evict_idle(now)
+
+            entry = self._clients.get(key)
+            if entry is None:
+                client = SharedHttpxClient(limits=self.limits)
+                self.metrics.inc("llm_client_pool_total", {"result": "miss"})
+            else:
+                client, _ = entry
+                self.metrics.inc("llm_client_pool_total", {"result": "hit"})
+
+            self._clients[key] = (client, now)
+
+        return client
+
+    def _evict_idle(self, now: float) -> None:
+        # evicted clients are not closed, agents of running chats may still use them,
+        # their idle connections are closed after keepalive_expiry anyway
+        for key, (_, last_used) in list(self._clients.items()):
+            if now - last_used >= self.idle_timeout:
+                del self._clients[key]
+                self.metrics.inc("llm_client_pool_total", {"result": "evicted"})
+
+    def with_http_client(self, config: dict[str, Any]) -> dict[str, Any]:
+        """Return the config_list entry using the shared client of its provider."""
+        if not self.enabled:
+            return config
+
+        http_client = self.get(
+            api_type=config["api_type"],
+            base_url=config["base_url"],
+            api_key=config["api_key"],
+            api_version=config.get("api_version"),
+        )
+        return {**config, "http_client": http_client}
+
+    def close(self) -> None:
+        """Close all clients and empty the pool."""
+        with self._lock:
+            for client, _ in self._clients.values():
+                client.close()
+            self._clients.clear()
+
+
+llm_client_pool = LLMClientPool()
@@ -0,0 +1,333 @@
+import hashlib
+import logging
+import pickle  # nosec B403
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from os import environ
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Literal, Optional, Protocol, Union
+from uuid import UUID
+
+from typing_extensions import TypeAlias
+
+from ...io.metrics import MetricsProtocol, NoopMetrics
+
+__all__ = [
+    "InMemoryResponseStore",
+    "LLMResponseCache",
+    "ModelResponseCache",
+    "ResponseCacheBackend",
+    "SQLiteResponseStore",
+    "llm_response_cache",
+]
+
+logger = logging.getLogger(__name__)
+
+ResponseCacheBackend: TypeAlias = Literal["disabled", "memory", "sqlite"]
+
+# cached responses expire after this many seconds
+LLM_RESPONSE_CACHE_TTL = float(environ.get("LLM_RESPONSE_CACHE_TTL", 24 * 60 * 60))
+# maximum number of responses in each backend, the least recently used are evicted
+LLM_RESPONSE_CACHE_MAX_SIZE = int(environ.get("LLM_RESPONSE_CACHE_MAX_SIZE", 10_000))
+# the SQLite database of the "sqlite" backend, shared by all processes on the host
+LLM_RESPONSE_CACHE_PATH = environ.get(
+    "LLM_RESPONSE_CACHE_PATH", ".cache/llm_responses.sqlite"
+)
+
+
+class ResponseStore(Protocol):
+    def get(self, key: str) -> Optional[tuple[bytes, float]]: ...
+
+    def set(self, key: str, value: bytes, expires_at: float) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def close(self) -> None: ...
+
+    def __len__(self) -> int: ...
+
+
+class InMemoryResponseStore(ResponseStore):
+    """LRU store of pickled responses in the memory of this process."""
+
+    def __init__(self, max_size: int = LLM_RESPONSE_CACHE_MAX_SIZE) -> None:
+        """Initialize the store.
+
+        Args:
+            max_size (int, optional): Maximum number of responses. Defaults to
+                LLM_RESPONSE_CACHE_MAX_SIZE.
+        """
+        self.max_size = max_size
+
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        # autogen calls the LLM from the threads of the chats
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of stored responses, including expired ones."""
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[tuple[bytes, float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: bytes, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def close(self) -> None:
+        self.clear()
+
+
+class SQLiteResponseStore(ResponseStore):
+    """LRU store of pickled responses in a SQLite database.
+
+    The database survives restarts and is shared by all worker processes
+    using the same path.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = LLM_RESPONSE_CACHE_PATH,
+        max_size: int = LLM_RESPONSE_CACHE_MAX_SIZE,
+    ) -> None:
+        """Initialize the store, creating the database if needed.
+
+        Args:
+            path (Union[str, Path], optional): Path of the database. Defaults to
+                LLM_RESPONSE_CACHE_PATH.
+            max_size (int, optional): Maximum number of responses. Defaults to
+                LLM_RESPONSE_CACHE_MAX_SIZE.
+        """
+        self.path = Path(path)
+        self.max_size = max_size
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None, timeout=5
+        )
+        self._lock = threading.Lock()
+
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                "expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS llm_responses_last_used "
+                "ON llm_responses (last_used)"
+            )
+
+    def __len__(self) -> int:
+        """Return the number of stored responses, including expired ones."""
+        with self._lock:
+            (count,) = self._connection.execute(
+                "SELECT COUNT(*) FROM llm_responses"
+            ).fetchone()
+        return int(count)
+
+    def get(self, key: str) -> Optional[tuple[bytes, float]]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self._connection.execute(
+                    "UPDATE llm_responses SET last_used = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+        return None if row is None else (row[0], row[1])
+
+    def set(self, key: str, value: bytes, expires_at: float) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, time.time()),
+            )
+            (count,) = self._connection.execute(
+                "SELECT COUNT(*) FROM llm_responses"
+            ).fetchone()
+            if count > self.max_size:
+                self._connection.execute(
+                    "DELETE FROM llm_responses WHERE key IN "
+                    "(SELECT key FROM llm_responses ORDER BY last_used LIMIT ?)",
+                    (count - self.max_size,),
+                )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM llm_responses")
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class LLMResponseCache:
+    """Process-wide cache of LLM responses, used by LLMs with temperature 0.
+
+    Responses are keyed by the LLM model and the request autogen sends to the
+    provider, so a cached response is never shared between models of
+    different users.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float = LLM_RESPONSE_CACHE_TTL,
+        max_size: int = LLM_RESPONSE_CACHE_MAX_SIZE,
+        path: Union[str, Path] = LLM_RESPONSE_CACHE_PATH,
+    ) -> None:
+        """Initialize the cache, the stores are created on first use.
+
+        Args:
+            ttl (float, optional): Time in seconds until a response expires.
+                Defaults to LLM_RESPONSE_CACHE_TTL.
+            max_size (int, optional): Maximum number of responses in each store.
+                Defaults to LLM_RESPONSE_CACHE_MAX_SIZE.
+            path (Union[str, Path], optional): Path of the SQLite database.
+                Defaults to LLM_RESPONSE_CACHE_PATH.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.path = path
+        self.metrics: MetricsProtocol = NoopMetrics()
+
+        self._stores: dict[str, ResponseStore] = {}
+        self._lock = threading.Lock()
+
+    def store(self, backend: str) -> ResponseStore:
+        """Return the store of the backend, creating it if needed."""
+        with self._lock:
+            if backend not in self._stores:
+                self._stores[backend] = (
+                    SQLiteResponseStore(self.path, self.max_size)
+                    if backend == "sqlite"
+                    else InMemoryResponseStore(self.max_size)
+                )
+            return self._stores[backend]
+
+    def llm_config(
+        self,
+        model_id: Union[str, UUID],
+        backend: ResponseCacheBackend,
+        temperature: float,
+    ) -> dict[str, Any]:
+        """Return the caching options of the llm_config of an LLM model."""
+        if backend == "disabled" or temperature != 0:
+            # autogen caches every response on disk unless told otherwise
+            return {"cache_seed": None}
+
+        return {"cache": ModelResponseCache(self, str(model_id), backend)}
+
+    def close(self) -> None:
+        """Close all stores."""
+        with self._lock:
+            for store in self._stores.values():
+                store.close()
+            self._stores.clear()
+
+
+class ModelResponseCache:
+    """The response cache of a single LLM model, passed to autogen as `cache`.
+
+    Implements autogen's AbstractCache protocol.
+    """
+
+    def __init__(
+        self, cache: LLMResponseCache, model_id: str, backend: ResponseCacheBackend
+    ) -> None:
+        """Initialize the cache of the model.
+
+        Args:
+            cache (LLMResponseCache): The process-wide cache.
+            model_id (str): The id of the LLM model.
+            backend (ResponseCacheBackend): The backend storing the responses.
+        """
+        self.cache = cache
+        self.model_id = model_id
+        self.backend = backend
+
+    def __enter__(self) -> "ModelResponseCache":
+        """Return the cache itself."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Keep the store open, autogen enters the cache on every request."""
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> "ModelResponseCache":
+        """Return the cache itself instead of a copy, autogen deep-copies llm_config."""
+        return self
+
+    def _key(self, key: str) -> str:
+        return hashlib.sha256(f"{self.model_id}:{key}".encode()).hexdigest()
+
+    def _inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        self.cache.metrics.inc(name, {"backend": self.backend, **labels}, value)
+
+    def get(self, key: str, default: Optional[Any] = None) -> Optional[Any]:
+        store = self.cache.store(self.backend)
+        store_key = self._key(key)
+
+        entry = store.get(store_key)
+        if entry is None:
+            self._inc("llm_response_cache_lookups_total", result="miss")
+            return default
+
+        value, expires_at = entry
+        if time.time() >= expires_at:
+            store.delete(store_key)
+            self._inc("llm_response_cache_lookups_total", result="expired")
+            return default
+
+        response = pickle.loads(value)  # nosec B301
+        self._inc("llm_response_cache_lookups_total", result="hit")
+        self._inc("llm_response_cache_saved_cost_total", getattr(response, "cost", 0))
+        return response
+
+    def set(self, key: str, value: Any) -> None:
+        try:
+            data = pickle.dumps(value)
+        except Exception as e:
+            logger.warning(f"Response of LLM {self.model_id} can't be cached: {e}")
+            return
+
+        self.cache.store(self.backend).set(
+            self._key(key), data, time.time() + self.cache.ttl
+        )
+
+    def close(self) -> None:
+        pass
+
+
+llm_response_cache = LLMResponseCache()
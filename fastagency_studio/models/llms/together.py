@@ -6,6 +6,8 @@ from typing_extensions import TypeAlias
 
 from ..base import Field, Model
 from ..registry import register
+from ..secrets.cache import secret_cache
+from .response_cache import ResponseCacheBackend, llm_response_cache
 
 __all__ = [
     "TogetherAIAPIKey",
@@ -183,18 +185,27 @@ class TogetherAI(Model):
         ),
     ] = 0.8
 
+    response_cache: Annotated[
+        ResponseCacheBackend,
+        Field(
+            description="Where to cache responses when the temperature is 0: 'disabled', 'memory' or 'sqlite'",
+            tooltip_message="Reuse the responses to repeated requests instead of sending them to the LLM again. Responses are cached only if the temperature is 0.",
+        ),
+    ] = "disabled"
+
     @classmethod
     async def create_autogen(
         cls, model_id: UUID, user_id: UUID, **kwargs: Any
     ) -> dict[str, Any]:
         my_model: TogetherAI = await cls.from_db(model_id)
 
-        api_key_model: TogetherAIAPIKey = (
-            await my_model.api_key.get_data_model().from_db(my_model.api_key.uuid)
+        api_key = await secret_cache.get(
+            my_model.api_key.uuid,
+            lambda: my_model.api_key.get_data_model().create_autogen(
+                my_model.api_key.uuid, user_id
+            ),
         )
 
-        api_key = await api_key_model.create_autogen(my_model.api_key.uuid, user_id)
-
         config_list = [
             {
                 "model": together_model_string[my_model.model],
@@ -207,6 +218,9 @@ class TogetherAI(Model):
         llm_config = {
             "config_list": config_list,
             "temperature": my_model.temperature,
+            **llm_response_cache.llm_config(
+                model_id, my_model.response_cache, my_model.temperature
+            ),
         }
 
         return llm_config
@@ -1,3 +1,4 @@
+import hashlib
 from typing import (
     Annotated,
     Any,
@@ -6,10 +7,13 @@ from typing import (
     Optional,
     Tuple,
     Type,
+    Union,
 )
 
 from pydantic import BaseModel, Field
+from pydantic_core import SchemaValidator
 
+from ..tracing import traced
 from .base import (
     M,
     Model,
@@ -54,6 +58,8 @@ class Registry:
     def __init__(self) -> None:
         """Initialize the registry."""
         self._store: "Dict[str, Dict[str, Tuple[Optional[Type[Model]], Type[ObjectReference]]]]" = {}
+        self._schemas_cache: Optional[tuple[bytes, str]] = None
+        self._validators: dict[tuple[str, str], SchemaValidator] = {}
 
     def register(self, type_name: str) -> Callable[[type[M]], type[M]]:
         if type_name not in self._store:
@@ -83,11 +89,16 @@ class Registry:
             model._reference_model = reference_model
 
             type_store[model_type_name] = (model, reference_model)
+            self._invalidate_caches()
 
             return model
 
         return _inner
 
+    def _invalidate_caches(self) -> None:
+        self._schemas_cache = None
+        self._validators.clear()
+
     def get_model_type(self, type: str, name: str) -> type[Model]:
         if type not in self._store:
             raise ValueError(f"No models registered under '{type}'")
@@ -126,6 +137,7 @@ class Registry:
             type_name=type_name, model_name=model_name
         )
         self._store[type_name][model_name] = (None, reference_model)
+        self._invalidate_caches()
 
         return reference_model
 
@@ -180,9 +192,44 @@ class Registry:
 
         return Schemas(list_of_schemas=list_of_schemas)
 
+    def get_schemas_json(self) -> tuple[bytes, str]:
+        """Return the serialized schemas for all registered models and their ETag.
+
+        The result is computed once and cached until a new model or reference
+        is registered.
+        """
+        if self._schemas_cache is None:
+            content = self.get_schemas().model_dump_json().encode("utf-8")
+            etag = f'"{hashlib.sha256(content).hexdigest()}"'
+            self._schemas_cache = (content, etag)
+
+        return self._schemas_cache
+
+    def get_validator(self, type: str, name: str) -> SchemaValidator:
+        """Return the compiled validator for the model registered under type and name.
+
+        Validators are cached so that validation does not need to resolve the model
+        type on every call.
+        """
+        if (type, name) not in self._validators:
+            model_type = self.get_model_type(type, name)
+            if not model_type.__pydantic_complete__:
+                model_type.model_rebuild()
+            self._validators[(type, name)] = model_type.__pydantic_validator__  # type: ignore[assignment]
+
+        return self._validators[(type, name)]
+
+    @traced("registry.validate")
     def validate(self, type: str, name: str, model: dict[str, Any]) -> Model:
-        model_type = self.get_model_type(type, name)
-        return model_type(**model)
+        return self.get_validator(type, name).validate_python(model)  # type: ignore[no-any-return]
+
+    @traced("registry.validate")
+    def validate_json(self, type: str, name: str, json_str: Union[str, bytes]) -> Model:
+        """Validate the model directly from its JSON representation.
+
+        This skips decoding the JSON into an intermediate dictionary.
+        """
+        return self.get_validator(type, name).validate_json(json_str)  # type: ignore[no-any-return]
 
 
 def register(type_name: str) -> Callable[[type[M]], type[M]]:
@@ -0,0 +1,116 @@
+import logging
+import time
+from collections.abc import Awaitable
+from os import environ
+from typing import Callable, Union
+from uuid import UUID
+
+from pydantic import SecretStr
+
+from ...io.messages import CacheInvalidationModel
+from ...io.metrics import MetricsProtocol, NoopMetrics
+
+__all__ = [
+    "SECRET_CACHE_INVALIDATE_SUBJECT",
+    "SECRET_CACHE_TTL",
+    "SecretCache",
+    "publish_secret_invalidation",
+    "secret_cache",
+]
+
+logger = logging.getLogger(__name__)
+
+# secrets are cached for this many seconds, 0 disables the cache
+SECRET_CACHE_TTL = float(environ.get("SECRET_CACHE_TTL", 60))
+
+# every worker subscribes to it without a queue group, so all of them drop the secrets
+SECRET_CACHE_INVALIDATE_SUBJECT = "secrets.invalidate"
+
+
+class SecretCache:
+    """Cache-aside store for the values of secrets such as API keys.
+
+    Values are kept only in the memory of this process and are wrapped in
+    SecretStr, so they are masked if an entry ends up in a log or a repr.
+    invalidate is local to the process, publish_secret_invalidation tells the
+    workers to drop an updated or deleted secret as well.
+    """
+
+    def __init__(self, ttl: float = SECRET_CACHE_TTL, max_size: int = 10_000) -> None:
+        """Initialize the secret cache.
+
+        Args:
+            ttl (float, optional): Time in seconds until an entry expires.
+                Defaults to SECRET_CACHE_TTL.
+            max_size (int, optional): Maximum number of entries, the oldest entry
+                is evicted when it is reached. Defaults to 10_000.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.metrics: MetricsProtocol = NoopMetrics()
+
+        self._entries: dict[str, tuple[SecretStr, float]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of cached secrets, including expired ones."""
+        return len(self._entries)
+
+    async def get(
+        self, model_id: Union[str, UUID], load: Callable[[], Awaitable[str]]
+    ) -> str:
+        """Return the value of the secret, calling load if it isn't cached."""
+        key = str(model_id)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if time.monotonic() < expires_at:
+                self.metrics.inc("secret_cache_lookups_total", {"result": "hit"})
+                return value.get_secret_value()
+            del self._entries[key]
+
+        result = "miss" if entry is None else "expired"
+        self.metrics.inc("secret_cache_lookups_total", {"result": result})
+
+        loaded = await load()
+        if self.ttl > 0:
+            self._entries.pop(key, None)
+            if len(self._entries) >= self.max_size:
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = (SecretStr(loaded), time.monotonic() + self.ttl)
+
+        return loaded
+
+    def invalidate(self, *model_ids: Union[str, UUID]) -> None:
+        """Remove the secrets from the cache, unknown ids are ignored."""
+        for model_id in model_ids:
+            self._entries.pop(str(model_id), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+secret_cache = SecretCache()
+
+
+async def publish_secret_invalidation(*model_ids: Union[str, UUID]) -> None:
+    """Tell the workers to remove the secrets from their caches.
+
+    Errors are logged, not raised, the change is already saved and the workers
+    pick it up when their entries expire.
+    """
+    from ...io.app import broker
+
+    try:
+        await broker.connect()
+        await broker.publish(
+            CacheInvalidationModel(
+                model_uuids=[str(model_id) for model_id in model_ids]
+            ),
+            SECRET_CACHE_INVALIDATE_SUBJECT,
+        )
+    except Exception:
+        logger.warning(
+            f"Unable to invalidate the cached secrets {model_ids} on the workers",
+            exc_info=True,
+        )
@@ -1,12 +1,19 @@
+import functools
 import re
-from typing import Annotated, Any, Literal, Union
+import time
+from typing import TYPE_CHECKING, Annotated, Any, Callable, Literal, Union
 
-from autogen.agentchat import ConversableAgent
 from typing_extensions import TypeAlias
 
+from ...tracing import traced
 from ..base import Field, Model
 from ..registry import Registry
-from ..toolboxes.toolbox import OpenAPI
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from autogen.agentchat import ConversableAgent
+    from fastagency.api.openapi import OpenAPI
 
 __all__ = ["TeamBaseModel", "agent_type_refs"]
 
@@ -44,11 +51,65 @@ class TeamBaseModel(Model):
 
 
 def register_toolbox_functions(
-    agent: ConversableAgent,
-    execution_agents: list[ConversableAgent],
-    clients: list[OpenAPI],
+    agent: "ConversableAgent",
+    execution_agents: "list[ConversableAgent]",
+    clients: "list[OpenAPI]",
 ) -> None:
     for client in clients:
         client._register_for_llm(agent)
         for execution_agent in execution_agents:
             client._register_for_execution(execution_agent)
+
+
+# reply functions of autogen agents and the chat phase in which they spend their time
+TIMED_REPLY_FUNCS = {
+    "generate_oai_reply": "llm",
+    "generate_tool_calls_reply": "tool",
+    "generate_function_call_reply": "tool",
+    "generate_code_execution_reply": "tool",
+}
+
+
+def _timed_replies(
+    agent: "ConversableAgent",
+) -> "Iterator[tuple[str, dict[str, Any]]]":
+    for reply_func_tuple in agent._reply_func_list:
+        reply_func = reply_func_tuple["reply_func"]
+        phase = TIMED_REPLY_FUNCS.get(getattr(reply_func, "__name__", ""))
+        if phase is not None:
+            yield phase, reply_func_tuple
+
+
+def time_replies(
+    agent: "ConversableAgent", callback: Callable[[str, float], None]
+) -> None:
+    """Call callback with the phase and duration of each LLM and tool reply."""
+    for phase, reply_func_tuple in _timed_replies(agent):
+
+        @functools.wraps(reply_func_tuple["reply_func"])
+        def timed_reply_func(
+            *args: Any,
+            reply_func: Callable[..., Any] = reply_func_tuple["reply_func"],
+            phase: str = phase,
+            **kwargs: Any,
+        ) -> Any:
+            start = time.monotonic()
+            try:
+                return reply_func(*args, **kwargs)
+            finally:
+                callback(phase, time.monotonic() - start)
+
+        reply_func_tuple["reply_func"] = timed_reply_func
+
+
+def trace_replies(agent: "ConversableAgent") -> None:
+    """Run each LLM reply and each tool call of the agent in a new span."""
+    for phase, reply_func_tuple in _timed_replies(agent):
+        if phase == "llm":
+            reply_func_tuple["reply_func"] = traced("llm", agent=agent.name)(
+                reply_func_tuple["reply_func"]
+            )
+
+    function_map = agent.function_map
+    for name, f in function_map.items():
+        function_map[name] = traced("tool", agent=agent.name, tool=name)(f)
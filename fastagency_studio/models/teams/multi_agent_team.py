@@ -1,12 +1,21 @@
-from typing import Annotated, Any, Optional
+import copy
+from typing import TYPE_CHECKING, Annotated, Any, Callable, Optional
 from uuid import UUID
 
-from autogen import ConversableAgent, GroupChat, GroupChatManager
 from pydantic import Field
 
 from ..registry import Registry
-from ..toolboxes.toolbox import OpenAPI
-from .base import TeamBaseModel, agent_type_refs, register_toolbox_functions
+from .base import (
+    TeamBaseModel,
+    agent_type_refs,
+    register_toolbox_functions,
+    time_replies,
+    trace_replies,
+)
+
+if TYPE_CHECKING:
+    from autogen import Agent, ConversableAgent, GroupChatManager
+    from fastagency.api.openapi import OpenAPI
 
 __all__ = ["MultiAgentTeam"]
 
@@ -16,7 +25,7 @@ registry = Registry.get_default()
 class AutogenMultiAgentTeam:
     def __init__(
         self,
-        agents_and_clients: list[tuple[ConversableAgent, list[OpenAPI]]],
+        agents_and_clients: "list[tuple[ConversableAgent, list[OpenAPI]]]",
     ) -> None:
         self.agents = [agent for agent, _ in agents_and_clients]
         self.clients = [clients for _, clients in agents_and_clients]
@@ -29,13 +38,61 @@ class AutogenMultiAgentTeam:
             ]
             register_toolbox_functions(agent, other_agents, clients)
 
-    def initiate_chat(self, message: str) -> list[dict[str, Any]]:
+        # tools are registered for execution with the other agents
+        for agent in self.agents:
+            trace_replies(agent)
+
+        self._checkpoint_callback: Optional[Callable[[dict[str, Any]], None]] = None
+
+    def _create_manager(self) -> "GroupChatManager":
+        from autogen import GroupChat, GroupChatManager
+
         groupchat = GroupChat(agents=self.agents, messages=[])
         manager = GroupChatManager(groupchat=groupchat)
+
+        callback = self._checkpoint_callback
+        if callback is not None:
+            checkpointed = {"messages": 0}
+
+            # the manager broadcasts every message after appending it to the group chat
+            def checkpoint(
+                sender: "Agent",
+                message: Any,
+                recipient: "Agent",
+                silent: bool,
+            ) -> Any:
+                if len(groupchat.messages) != checkpointed["messages"]:
+                    checkpointed["messages"] = len(groupchat.messages)
+                    callback({"messages": copy.deepcopy(groupchat.messages)})
+                return message
+
+            manager.register_hook("process_message_before_send", checkpoint)
+
+        return manager
+
+    def initiate_chat(self, message: str) -> list[dict[str, Any]]:
+        manager = self._create_manager()
         return self.agents[0].initiate_chat(  # type: ignore[no-any-return]
             recipient=manager, message=message
         )
 
+    def on_checkpoint(self, callback: Callable[[dict[str, Any]], None]) -> None:
+        """Call callback with the state of the chat after each message."""
+        self._checkpoint_callback = callback
+
+    def on_reply_timing(self, callback: Callable[[str, float], None]) -> None:
+        """Call callback with the phase and duration of each LLM and tool reply."""
+        for agent in self.agents:
+            time_replies(agent, callback)
+
+    def resume_chat(self, state: dict[str, Any]) -> list[dict[str, Any]]:
+        """Continue a chat from the state passed to the on_checkpoint callback."""
+        manager = self._create_manager()
+        last_agent, last_message = manager.resume(messages=state["messages"])
+        return last_agent.initiate_chat(  # type: ignore[no-any-return]
+            recipient=manager, message=last_message, clear_history=False
+        )
+
 
 # @registry.register("team")
 class MultiAgentTeam(TeamBaseModel):
@@ -81,7 +138,7 @@ class MultiAgentTeam(TeamBaseModel):
 
         agents_and_clients: list[tuple[ConversableAgent, list[OpenAPI]]] = []
         for i in range(5):
-            agent_property = getattr(my_model, f"agent_{i+1}")
+            agent_property = getattr(my_model, f"agent_{i + 1}")
             if agent_property is None:
                 continue
 
@@ -90,7 +147,7 @@ class MultiAgentTeam(TeamBaseModel):
             )
 
             agent, clients = await agent_model.create_autogen(
-                getattr(my_model, f"agent_{i+1}").uuid, user_id
+                getattr(my_model, f"agent_{i + 1}").uuid, user_id
             )
             agents_and_clients.append((agent, clients))
 
@@ -1,12 +1,20 @@
-from typing import Annotated, Any
+import copy
+from typing import TYPE_CHECKING, Annotated, Any, Callable, Optional
 from uuid import UUID
 
-from autogen import ConversableAgent
-
 from ..base import Field
 from ..registry import Registry
-from ..toolboxes.toolbox import OpenAPI
-from .base import TeamBaseModel, agent_type_refs, register_toolbox_functions
+from .base import (
+    TeamBaseModel,
+    agent_type_refs,
+    register_toolbox_functions,
+    time_replies,
+    trace_replies,
+)
+
+if TYPE_CHECKING:
+    from autogen import Agent, ConversableAgent
+    from fastagency.api.openapi import OpenAPI
 
 __all__ = ["TwoAgentTeam"]
 
@@ -15,10 +23,10 @@ class AutogenTwoAgentTeam:
     def __init__(
         self,
         *,
-        initial_agent: ConversableAgent,
-        initial_agent_clients: list[OpenAPI],
-        secondary_agent: ConversableAgent,
-        secondary_agent_clients: list[OpenAPI],
+        initial_agent: "ConversableAgent",
+        initial_agent_clients: "list[OpenAPI]",
+        secondary_agent: "ConversableAgent",
+        secondary_agent_clients: "list[OpenAPI]",
     ) -> None:
         self.initial_agent = initial_agent
         self.secondary_agent = secondary_agent
@@ -29,12 +37,69 @@ class AutogenTwoAgentTeam:
         register_toolbox_functions(
             secondary_agent, [initial_agent], secondary_agent_clients
         )
+        trace_replies(initial_agent)
+        trace_replies(secondary_agent)
 
     def initiate_chat(self, message: str) -> list[dict[str, Any]]:
         return self.initial_agent.initiate_chat(  # type: ignore[no-any-return]
             recipient=self.secondary_agent, message=message
         )
 
+    def on_checkpoint(self, callback: Callable[[dict[str, Any]], None]) -> None:
+        """Call callback with the state of the chat before each reply is generated."""
+        agents = {
+            "initial_agent": self.initial_agent,
+            "secondary_agent": self.secondary_agent,
+        }
+
+        for name, agent in agents.items():
+            other = next(a for a in agents.values() if a is not agent)
+
+            def checkpoint(
+                recipient: "ConversableAgent",
+                messages: Optional[list[dict[str, Any]]] = None,
+                sender: Optional["Agent"] = None,
+                config: Optional[Any] = None,
+                name: str = name,
+            ) -> tuple[bool, None]:
+                callback(
+                    {"next_speaker": name, "messages": copy.deepcopy(messages or [])}
+                )
+                return False, None
+
+            agent.register_reply(trigger=[other], reply_func=checkpoint, position=0)
+
+    def on_reply_timing(self, callback: Callable[[str, float], None]) -> None:
+        """Call callback with the phase and duration of each LLM and tool reply."""
+        time_replies(self.initial_agent, callback)
+        time_replies(self.secondary_agent, callback)
+
+    def resume_chat(self, state: dict[str, Any]) -> list[dict[str, Any]]:
+        """Continue a chat from the state passed to the on_checkpoint callback."""
+        if state["next_speaker"] == "initial_agent":
+            speaker, sender = self.initial_agent, self.secondary_agent
+        else:
+            speaker, sender = self.secondary_agent, self.initial_agent
+
+        messages: list[dict[str, Any]] = state["messages"]
+
+        speaker._prepare_chat(sender, clear_history=False)
+        sender._prepare_chat(speaker, clear_history=False)
+        speaker._oai_messages[sender] = copy.deepcopy(messages)
+        sender._oai_messages[speaker] = [_swap_role(m) for m in messages]
+
+        reply = speaker.generate_reply(sender=sender)
+        if reply is not None:
+            speaker.send(reply, sender)
+
+        return self.initial_agent.chat_messages[self.secondary_agent]  # type: ignore[no-any-return]
+
+
+def _swap_role(message: dict[str, Any]) -> dict[str, Any]:
+    # messages sent by one agent are received by the other one
+    roles = {"user": "assistant", "assistant": "user"}
+    return {**message, "role": roles.get(message["role"], message["role"])}
+
 
 @Registry.get_default().register("team")
 class TwoAgentTeam(TeamBaseModel):
@@ -1,14 +1,16 @@
-from typing import Annotated, Any, Optional, Union
+from typing import TYPE_CHECKING, Annotated, Any, Optional, Union
 from uuid import UUID
 
 import httpx
-from fastagency.api.openapi.client import OpenAPI
 from pydantic import AfterValidator, HttpUrl
 from typing_extensions import TypeAlias
 
 from ..base import Field, Model
 from ..registry import Registry
 
+if TYPE_CHECKING:
+    from fastagency.api.openapi.client import OpenAPI
+
 # Pydantic adds trailing slash automatically to URLs, so we need to remove it
 # https://github.com/pydantic/pydantic/issues/7186#issuecomment-1691594032
 URL = Annotated[HttpUrl, AfterValidator(lambda x: str(x).rstrip("/"))]
@@ -88,7 +90,9 @@ class Toolbox(Model):
     @classmethod
     async def create_autogen(
         cls, model_id: UUID, user_id: UUID, **kwargs: Any
-    ) -> OpenAPI:
+    ) -> "OpenAPI":
+        from fastagency.api.openapi.client import OpenAPI
+
         my_model = await cls.from_db(model_id)
 
         # Download OpenAPI spec
@@ -103,3 +107,13 @@ class Toolbox(Model):
 
 
 ToolboxRef: TypeAlias = Toolbox.get_reference_model()  # type: ignore[valid-type]
+
+
+def __getattr__(name: str) -> Any:
+    # OpenAPI is imported lazily because importing it pulls in the whole code generator
+    if name == "OpenAPI":
+        from fastagency.api.openapi.client import OpenAPI
+
+        return OpenAPI
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
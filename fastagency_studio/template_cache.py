@@ -0,0 +1,345 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import stat
+import tempfile
+import threading
+import time
+from os import environ
+from pathlib import Path
+from typing import NamedTuple, Optional, Protocol, Union
+from urllib.parse import quote
+
+import httpx
+
+__all__ = [
+    "TEMPLATE_CACHE_DIR",
+    "TEMPLATE_CACHE_TTL",
+    "GitHubTemplateSource",
+    "LocalArchiveSource",
+    "TemplateCache",
+    "TemplateRef",
+    "TemplateSource",
+]
+
+logger = logging.getLogger(__name__)
+
+# directory with the extracted templates, shared by all processes on the host
+TEMPLATE_CACHE_DIR = Path(environ.get("TEMPLATE_CACHE_DIR", ".cache/templates"))
+# the commit of a branch is checked again after this many seconds, 0 checks it on every deployment
+TEMPLATE_CACHE_TTL = float(environ.get("TEMPLATE_CACHE_TTL", 300))
+# "hardlink" links the files of a deployment to the cached ones, "copy" copies them
+TEMPLATE_CACHE_LINK = environ.get("TEMPLATE_CACHE_LINK", "hardlink")
+# extracted commits no branch points to anymore are removed after this many seconds unused
+TEMPLATE_CACHE_KEEP = float(environ.get("TEMPLATE_CACHE_KEEP", 3600))
+
+_SHA_PATTERN = re.compile(r"[0-9a-f]{40,64}")
+
+
+class TemplateRef(NamedTuple):
+    sha: str
+    # validator for conditional requests, None if the source doesn't support them
+    etag: Optional[str]
+
+
+class TemplateSource(Protocol):
+    def resolve(self, branch: str, etag: Optional[str]) -> Optional[TemplateRef]:
+        """Return the commit of the branch, None if it didn't change since etag."""
+        ...
+
+    def download(self, ref: TemplateRef, directory: Path) -> Path:
+        """Write the archive of the commit to directory and return its path."""
+        ...
+
+
+class GitHubTemplateSource(TemplateSource):
+    """Template archives of a public GitHub repository.
+
+    The commit of a branch is resolved with a conditional request, an unchanged
+    branch is answered with 304 Not Modified, which doesn't count against the
+    rate limit of the GitHub API.
+    """
+
+    def __init__(
+        self,
+        repo_url: str,
+        timeout: float = 30.0,
+        transport: Optional[httpx.BaseTransport] = None,
+    ) -> None:
+        """Initialize the source.
+
+        Args:
+            repo_url (str): URL of the repository, e.g. https://github.com/owner/repo.
+            timeout (float, optional): Timeout of the requests in seconds. Defaults to 30.0.
+            transport (Optional[httpx.BaseTransport], optional): Transport of the HTTP
+                client, used for testing. Defaults to None.
+        """
+        self.owner, self.repo = repo_url.rstrip("/").rsplit("/", 2)[-2:]
+        self.timeout = timeout
+        self.transport = transport
+
+    def _client(self) -> httpx.Client:
+        return httpx.Client(
+            timeout=self.timeout, follow_redirects=True, transport=self.transport
+        )
+
+    def resolve(self, branch: str, etag: Optional[str]) -> Optional[TemplateRef]:
+        headers = {
+            "Accept": "application/vnd.github.sha",
+            "X-GitHub-Api-Version": "2022-11-28",
+        }
+        if etag is not None:
+            headers["If-None-Match"] = etag
+
+        url = f"https://api.github.com/repos/{self.owner}/{self.repo}/commits/{branch}"
+        with self._client() as client:
+            response = client.get(url, headers=headers)
+
+        if response.status_code == 304:
+            return None
+        if response.status_code != 200:
+            raise Exception(f"Error resolving repository: {response.status_code}")
+        return TemplateRef(sha=response.text.strip(), etag=response.headers.get("ETag"))
+
+    def download(self, ref: TemplateRef, directory: Path) -> Path:
+        url = f"https://github.com/{self.owner}/{self.repo}/archive/{ref.sha}.zip"
+        archive_path = directory / f"{self.repo}.zip"
+        with self._client() as client, client.stream("GET", url) as response:
+            if response.status_code != 200:
+                raise Exception(f"Error downloading repository: {response.status_code}")
+            with archive_path.open("wb") as file:
+                for chunk in response.iter_bytes():
+                    file.write(chunk)
+
+        return archive_path
+
+
+class LocalArchiveSource(TemplateSource):
+    """Template archive on the local disk, for offline setups and testing.
+
+    The archive is used for all branches and its SHA-256 stands in for the
+    commit SHA, so a changed archive is extracted again.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """Initialize the source.
+
+        Args:
+            path (Union[str, Path]): Path of the archive, in any format supported by
+                shutil.unpack_archive.
+        """
+        self.path = Path(path)
+
+    def resolve(self, branch: str, etag: Optional[str]) -> Optional[TemplateRef]:
+        stat_result = self.path.stat()
+        current_etag = f"{stat_result.st_mtime_ns}-{stat_result.st_size}"
+        if etag == current_etag:
+            return None
+
+        digest = hashlib.sha256()
+        with self.path.open("rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+
+        return TemplateRef(sha=digest.hexdigest(), etag=current_etag)
+
+    def download(self, ref: TemplateRef, directory: Path) -> Path:
+        archive_path = directory / self.path.name
+        shutil.copyfile(self.path, archive_path)
+        return archive_path
+
+
+def _load_ref(path: Path) -> tuple[Optional[TemplateRef], float]:
+    """Return the commit stored in the file and when it was checked."""
+    try:
+        data = json.loads(path.read_text())
+        return TemplateRef(sha=data["sha"], etag=data["etag"]), data["checked_at"]
+    except (OSError, ValueError, KeyError):
+        return None, 0.0
+
+
+def _make_read_only(directory: Path) -> None:
+    # only files, so that the directories can still be removed
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = Path(root) / name
+            if not path.is_symlink():
+                path.chmod(stat.S_IMODE(path.stat().st_mode) & ~0o222)
+
+
+def _copy(src: str, dst: str) -> None:
+    shutil.copy2(src, dst)
+    Path(dst).chmod(stat.S_IMODE(Path(dst).stat().st_mode) | stat.S_IWUSR)
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:
+        # e.g. the deployment is on another file system than the cache
+        _copy(src, dst)
+
+
+class TemplateCache:
+    """Content-addressed cache of the extracted SaaS app template.
+
+    A commit is downloaded and extracted once into cache_dir/trees/<sha>, and
+    the commit each branch points to is kept in cache_dir/refs. Deployments get
+    hardlinks to the extracted files instead of downloading and unpacking the
+    whole archive, so the cached files are read-only and must not be modified
+    in place. The cache directory can be shared by processes on the same host.
+    """
+
+    def __init__(
+        self,
+        source: TemplateSource,
+        cache_dir: Union[str, Path] = TEMPLATE_CACHE_DIR,
+        ttl: float = TEMPLATE_CACHE_TTL,
+        link: str = TEMPLATE_CACHE_LINK,
+        keep: float = TEMPLATE_CACHE_KEEP,
+    ) -> None:
+        """Initialize the template cache.
+
+        Args:
+            source (TemplateSource): Where the template archives come from.
+            cache_dir (Union[str, Path], optional): Directory of the cache.
+                Defaults to TEMPLATE_CACHE_DIR.
+            ttl (float, optional): Time in seconds until the commit of a branch is
+                checked again. Defaults to TEMPLATE_CACHE_TTL.
+            link (str, optional): "hardlink" to link the files of a deployment to
+                the cached ones, "copy" to copy them. Defaults to TEMPLATE_CACHE_LINK.
+            keep (float, optional): Time in seconds an extracted commit no branch
+                points to is kept after its last use. Defaults to TEMPLATE_CACHE_KEEP.
+        """
+        if link not in ("hardlink", "copy"):
+            raise ValueError(f"Unknown link mode: {link}")
+
+        self.source = source
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.link = link
+        self.keep = keep
+
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of extracted commits."""
+        trees_dir = self.cache_dir / "trees"
+        return len(list(trees_dir.iterdir())) if trees_dir.exists() else 0
+
+    def _ref_path(self, branch: str) -> Path:
+        return self.cache_dir / "refs" / f"{quote(branch, safe='')}.json"
+
+    def _tree_path(self, sha: str) -> Path:
+        return self.cache_dir / "trees" / sha
+
+    def _read_ref(self, branch: str) -> tuple[Optional[TemplateRef], float]:
+        return _load_ref(self._ref_path(branch))
+
+    def _write_ref(self, branch: str, ref: TemplateRef) -> None:
+        path = self._ref_path(branch)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"sha": ref.sha, "etag": ref.etag, "checked_at": time.time()}
+        # write and rename, so other processes never read a partial file
+        temp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        temp_path.write_text(json.dumps(data))
+        temp_path.replace(path)
+
+    def tree(self, branch: str) -> Path:
+        """Return the extracted template of the branch, refreshing it if needed.
+
+        If the branch can't be checked, the cached commit is used if there is one.
+        """
+        with self._lock:
+            ref, checked_at = self._read_ref(branch)
+            if ref is not None and not self._tree_path(ref.sha).exists():
+                ref = None
+            if ref is not None and time.time() - checked_at < self.ttl:
+                return self._tree_path(ref.sha)
+
+            try:
+                new_ref = self.source.resolve(branch, None if ref is None else ref.etag)
+            except Exception:
+                if ref is None:
+                    raise
+                logger.warning(
+                    f"Unable to check the template branch {branch}, using the cached commit {ref.sha}",
+                    exc_info=True,
+                )
+                return self._tree_path(ref.sha)
+
+            if new_ref is None and ref is not None:
+                # the branch still points to the cached commit
+                self._write_ref(branch, ref)
+                return self._tree_path(ref.sha)
+            if new_ref is None:
+                raise ValueError(f"Unable to resolve the template branch {branch}")
+
+            if not _SHA_PATTERN.fullmatch(new_ref.sha):
+                raise ValueError(f"Invalid commit SHA: {new_ref.sha!r}")
+            if not self._tree_path(new_ref.sha).exists():
+                self._extract(new_ref)
+
+            self._write_ref(branch, new_ref)
+            self._prune()
+            return self._tree_path(new_ref.sha)
+
+    def _extract(self, ref: TemplateRef) -> None:
+        logger.info(f"Extracting template commit {ref.sha}")
+        tree_path = self._tree_path(ref.sha)
+        tree_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with tempfile.TemporaryDirectory(dir=self.cache_dir) as temp_dir:
+            temp_dir_path = Path(temp_dir)
+            archive_path = self.source.download(ref, temp_dir_path)
+
+            extracted_path = temp_dir_path / "extracted"
+            shutil.unpack_archive(str(archive_path), str(extracted_path))
+
+            # archives of a repository have a single top-level directory
+            entries = list(extracted_path.iterdir())
+            if len(entries) == 1 and entries[0].is_dir():
+                extracted_path = entries[0]
+
+            _make_read_only(extracted_path)
+            try:
+                extracted_path.rename(tree_path)
+            except OSError:
+                # another process extracted the same commit in the meantime
+                if not tree_path.exists():
+                    raise
+
+    def _prune(self) -> None:
+        refs_dir = self.cache_dir / "refs"
+        refs = [_load_ref(ref_path)[0] for ref_path in refs_dir.glob("*.json")]
+        referenced = {ref.sha for ref in refs if ref is not None}
+
+        now = time.time()
+        for tree_path in (self.cache_dir / "trees").iterdir():
+            if (
+                tree_path.name not in referenced
+                and now - tree_path.stat().st_mtime > self.keep
+            ):
+                shutil.rmtree(tree_path, ignore_errors=True)
+
+    def copy_to(self, branch: str, destination: Path) -> None:
+        """Create the template of the branch at destination, which must not exist."""
+        tree_path = self.tree(branch)
+        # mark the commit as used, so it isn't pruned while it is copied
+        os.utime(tree_path)
+
+        copy_function = _link_or_copy if self.link == "hardlink" else _copy
+        shutil.copytree(
+            tree_path, destination, symlinks=True, copy_function=copy_function
+        )
+
+    def invalidate(self, *branches: str) -> None:
+        """Check the branches again on their next use, unknown branches are ignored."""
+        for branch in branches:
+            self._ref_path(branch).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
@@ -0,0 +1,210 @@
+import functools
+import importlib.util
+import inspect
+import logging
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from os import environ
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Optional, TypeVar
+
+if TYPE_CHECKING:
+    from faststream.broker.types import BrokerMiddleware
+    from opentelemetry.context import Context
+    from opentelemetry.sdk.trace.export import SpanExporter
+    from opentelemetry.trace import Span
+
+__all__ = [
+    "configure_tracing",
+    "create_exporter",
+    "extract_context",
+    "is_tracing_available",
+    "is_tracing_configured",
+    "start_span",
+    "telemetry_middlewares",
+    "traced",
+]
+
+logger = logging.getLogger(__name__)
+
+TRACER_NAME = "fastagency_studio"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _find_opentelemetry() -> bool:
+    try:
+        return importlib.util.find_spec("opentelemetry.trace") is not None
+    except ImportError:
+        return False
+
+
+# checked once, so that the hot paths don't retry the import on every call
+_TRACING_AVAILABLE = _find_opentelemetry()
+# spans are created only after configure_tracing installed an exporter
+_tracing_configured = False
+
+
+def is_tracing_available() -> bool:
+    return _TRACING_AVAILABLE
+
+
+def is_tracing_configured() -> bool:
+    return _tracing_configured
+
+
+@contextmanager
+def start_span(
+    name: str, context: Optional["Context"] = None, **attributes: Any
+) -> Iterator[Optional["Span"]]:
+    """Run the with block in a new span, or without tracing if it is not configured.
+
+    Attributes with None values are skipped, other values are converted to str
+    unless they are already a type supported by OpenTelemetry.
+    """
+    if not _tracing_configured:
+        yield None
+        return
+
+    from opentelemetry import trace
+
+    tracer = trace.get_tracer(TRACER_NAME)
+    with tracer.start_as_current_span(
+        name,
+        context=context,
+        attributes={
+            k: v if isinstance(v, (str, bool, int, float)) else str(v)
+            for k, v in attributes.items()
+            if v is not None
+        },
+    ) as span:
+        yield span
+
+
+def traced(name: str, **attributes: Any) -> Callable[[F], F]:
+    """Decorate a function or a coroutine function to run it in a new span.
+
+    The function is returned unchanged if OpenTelemetry is not installed, and
+    it is called directly while tracing is not configured.
+    """
+
+    def decorator(f: F) -> F:
+        if not _TRACING_AVAILABLE:
+            return f
+
+        if inspect.iscoroutinefunction(f):
+
+            @functools.wraps(f)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not _tracing_configured:
+                    return await f(*args, **kwargs)
+                with start_span(name, **attributes):
+                    return await f(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(f)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _tracing_configured:
+                return f(*args, **kwargs)
+            with start_span(name, **attributes):
+                return f(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def extract_context(headers: Mapping[str, str]) -> Optional["Context"]:
+    """Return the trace context sent in the headers, e.g. the traceparent header."""
+    if not _tracing_configured:
+        return None
+
+    from opentelemetry import propagate
+
+    return propagate.extract(headers)
+
+
+def telemetry_middlewares() -> "list[BrokerMiddleware[Any]]":
+    """Return the middlewares propagating the trace context in NATS headers."""
+    try:
+        from faststream.nats.opentelemetry import NatsTelemetryMiddleware
+    except ImportError:
+        return []
+
+    return [NatsTelemetryMiddleware()]
+
+
+def create_exporter(exporter: str) -> "SpanExporter":
+    """Create the span exporter.
+
+    Args:
+        exporter (str): Either "file" to append spans as JSON lines to the file set
+            in the TRACING_FILE environment variable (traces.jsonl by default), or
+            "otlp" to send them to the collector set in the standard
+            OTEL_EXPORTER_OTLP_ENDPOINT environment variable.
+    """
+    if exporter == "file":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        class FileSpanExporter(ConsoleSpanExporter):
+            # called when the tracer provider shuts down, also at exit
+            def shutdown(self) -> None:
+                super().shutdown()
+                self.out.close()
+
+        path = environ.get("TRACING_FILE", "traces.jsonl")
+        return FileSpanExporter(
+            out=Path(path).open("a"),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+
+    if exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+
+        otlp_exporter: SpanExporter = OTLPSpanExporter()
+        return otlp_exporter
+
+    raise ValueError(f"Unknown tracing exporter '{exporter}', use 'file' or 'otlp'")
+
+
+def configure_tracing(
+    service_name: str, exporter: Optional["SpanExporter"] = None
+) -> bool:
+    """Export the spans of this process.
+
+    If no exporter is passed, the exporter is selected by the TRACING_EXPORTER
+    environment variable. Tracing stays disabled if it isn't set or if the
+    OpenTelemetry SDK is not installed.
+
+    Returns:
+        bool: Whether tracing was configured.
+    """
+    if exporter is None:
+        exporter_name = environ.get("TRACING_EXPORTER")
+        if exporter_name is None:
+            return False
+
+        try:
+            exporter = create_exporter(exporter_name)
+        except ImportError:
+            logger.warning(
+                f"Tracing exporter '{exporter_name}' is not installed, tracing is disabled"
+            )
+            return False
+
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    provider = TracerProvider(resource=Resource.create({SERVICE_NAME: service_name}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
+    global _tracing_configured
+    _tracing_configured = True
+
+    return True
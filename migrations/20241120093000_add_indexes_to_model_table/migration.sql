@@ -0,0 +1,12 @@
+-- CreateIndex
+CREATE INDEX "Model_user_uuid_type_name_idx" ON "Model"("user_uuid", "type_name");
+
+-- CreateIndex
+CREATE INDEX "Model_user_uuid_updated_at_idx" ON "Model"("user_uuid", "updated_at");
+
+-- CreateIndex
+CREATE INDEX "Model_json_str_idx" ON "Model" USING GIN ("json_str" jsonb_path_ops);
+
+-- Index used by the name uniqueness check. Prisma cannot express expression
+-- indexes in schema.prisma, so this one only lives in the migration.
+CREATE INDEX "Model_user_uuid_json_str_name_idx" ON "Model"("user_uuid", ("json_str"->>'name'));
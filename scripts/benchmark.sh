@@ -0,0 +1,5 @@
+#!/usr/bin/env bash
+
+# Runs the performance benchmarks in tests/benchmarks and writes JSON reports
+# to $BENCHMARK_REPORT_DIR (defaults to .benchmarks)
+pytest -m benchmark tests/benchmarks -s "$@"
@@ -1,3 +1,13 @@
 #!/bin/bash
+set -e
+
+prisma migrate dev --create-only
+
+# Prisma cannot express the expression indexes in schema.prisma, so every new
+# migration drops them. Remove the DROP INDEX lines before applying it.
+if grep -n 'DROP INDEX "Model_user_uuid_json_str_name_idx"' migrations/*/migration.sql; then
+    echo 'The new migration drops "Model_user_uuid_json_str_name_idx", remove the DROP INDEX and apply it with "prisma migrate dev"'
+    exit 1
+fi
 
 prisma migrate dev
@@ -0,0 +1,93 @@
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from faststream.nats import NatsBroker, TestNatsBroker
+
+from fastagency_studio.app import app
+from fastagency_studio.io.fanout import (
+    ChatFanOut,
+    chat_client_subject,
+    chat_server_subject,
+)
+from fastagency_studio.io.messages import (
+    InputRequestModel,
+    InputResponseModel,
+    PrintModel,
+    ServerResponseModel,
+    TerminateModel,
+)
+
+
+@pytest.fixture
+def broker(monkeypatch: pytest.MonkeyPatch) -> NatsBroker:
+    broker = NatsBroker()
+    monkeypatch.setattr(ChatFanOut, "_default_fan_out", ChatFanOut(broker))
+    return broker
+
+
+@pytest.mark.asyncio
+class TestChatStream:
+    async def test_stream_chat_messages(self, broker: NatsBroker) -> None:
+        user_uuid, thread_uuid = uuid.uuid4(), uuid.uuid4()
+        subject = chat_client_subject(user_uuid, thread_uuid)
+        fan_out = ChatFanOut.get_default()
+
+        async with (
+            TestNatsBroker(broker),
+            httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client,
+        ):
+            request = asyncio.create_task(
+                client.get(f"/user/{user_uuid}/thread/{thread_uuid}/messages")
+            )
+
+            for _ in range(500):
+                if subject in fan_out._listeners:
+                    break
+                await asyncio.sleep(0.01)
+
+            for msg in [
+                ServerResponseModel(data=PrintModel(msg="Hello"), type="print"),
+                ServerResponseModel(
+                    data=InputRequestModel(prompt="Reply", is_password=False),
+                    type="input",
+                ),
+                ServerResponseModel(data=TerminateModel(), type="terminate"),
+            ]:
+                await broker.publish(msg, subject)
+
+            response = await asyncio.wait_for(request, 5)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text == (
+            ": connected\n\n"
+            'event: print\ndata: {"data":{"msg":"Hello"},"type":"print"}\n\n'
+            'event: input\ndata: {"data":{"prompt":"Reply","is_password":false},"type":"input"}\n\n'
+            'event: terminate\ndata: {"data":{"msg":"Chat completed."},"type":"terminate"}\n\n'
+        )
+        assert subject not in fan_out._listeners
+
+    async def test_send_chat_input(self, broker: NatsBroker) -> None:
+        user_uuid, thread_uuid = uuid.uuid4(), uuid.uuid4()
+
+        @broker.subscriber(chat_server_subject(user_uuid, thread_uuid))
+        async def handle_input(body: InputResponseModel) -> None: ...
+
+        async with (
+            TestNatsBroker(broker),
+            httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client,
+        ):
+            response = await client.post(
+                f"/user/{user_uuid}/thread/{thread_uuid}/input", json={"msg": "Hi"}
+            )
+
+            handle_input.mock.assert_called_once_with({"msg": "Hi"})  # type: ignore[union-attr]
+
+        assert response.status_code == 200
+        assert response.json() == {"msg": "Hi"}
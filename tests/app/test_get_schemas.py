@@ -48,3 +48,23 @@ class TestGetSchema:
         }
         # print(model_names)
         assert model_names == expected, f"{model_names}!={expected}"
+
+    def test_etag(self) -> None:
+        response = client.get("/models/schemas")
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == "public, max-age=0, must-revalidate"
+
+        response = client.get("/models/schemas", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+
+        response = client.get(
+            "/models/schemas", headers={"If-None-Match": f'"other", W/{etag}'}
+        )
+        assert response.status_code == 304
+
+        response = client.get("/models/schemas", headers={"If-None-Match": '"other"'})
+        assert response.status_code == 200
+        Schemas(**response.json())
@@ -0,0 +1,25 @@
+import subprocess  # nosec B404
+import sys
+
+import pytest
+
+# modules only needed when building autogen agents, the API must not import them
+HEAVY_MODULES = [
+    "anthropic",
+    "autogen",
+    "datamodel_code_generator",
+    "fastagency",
+    "openai",
+    "together",
+]
+
+
+@pytest.mark.parametrize(
+    "module", ["fastagency_studio.app", "fastagency_studio.models"]
+)
+def test_heavy_modules_not_imported(module: str) -> None:
+    code = f"import sys, {module}; print(' '.join(sorted(sys.modules)))"
+    output = subprocess.check_output([sys.executable, "-c", code], text=True)  # nosec B603
+    imported = set(output.split())
+
+    assert [m for m in HEAVY_MODULES if m in imported] == []
@@ -1,13 +1,18 @@
+import json
 import random
 import uuid
+from datetime import datetime
 from typing import Any, Optional
 from unittest.mock import AsyncMock, patch
 
 import pytest
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.testclient import TestClient
 
-from fastagency_studio.app import app, mask
+from fastagency_studio.app import app, get_default_response_class, mask, render_json
+from fastagency_studio.chat_names import ChatNamer, generate_chat_names
 from fastagency_studio.db.base import DefaultDB
+from fastagency_studio.io.messages import DeploymentJobModel
 from fastagency_studio.models.llms.azure import AzureOAIAPIKey
 from fastagency_studio.saas_app_generator import SaasAppGenerator
 
@@ -69,6 +74,24 @@ async def test_mask(api_key: str, expected: str) -> None:
     assert await mask(api_key) == expected
 
 
+def test_default_response_class() -> None:
+    assert get_default_response_class() is ORJSONResponse
+    assert app.router.default_response_class is ORJSONResponse
+
+    response = render_json(
+        [{"uuid": uuid.UUID(int=1), "created_at": datetime(2024, 1, 1)}]
+    )
+    assert json.loads(bytes(response.body)) == [
+        {
+            "uuid": "00000000-0000-0000-0000-000000000001",
+            "created_at": "2024-01-01T00:00:00",
+        }
+    ]
+
+    with patch.dict("sys.modules", {"orjson": None}):
+        assert get_default_response_class() is JSONResponse
+
+
 @pytest.mark.db
 class TestModelRoutes:
     @pytest.mark.asyncio
@@ -330,13 +353,22 @@ class TestModelRoutes:
                 "fastagency_studio.helpers.validate_tokens_and_create_gh_repo",
                 return_value=saas_app,
             ) as mock_task,
-            patch("fastagency_studio.helpers.deploy_saas_app"),
+            patch("fastagency_studio.helpers.enqueue_deployment") as mock_enqueue,
         ):
             response = client.post(
                 f"/user/{user_uuid}/models/{type_name}/{model_name}/{model_uuid}",
                 json=model,
             )
             mock_task.assert_called_once()
+            # the deployment is enqueued for the workers, without the tokens
+            mock_enqueue.assert_awaited_once_with(
+                DeploymentJobModel(
+                    user_uuid=user_uuid,
+                    model_uuid=model_uuid,
+                    type_name=type_name,
+                    model_name=model_name,
+                )
+            )
 
         assert response.status_code == 200
         expected = {
@@ -425,7 +457,7 @@ class TestModelRoutes:
                 "fastagency_studio.db.prisma.PrismaBackendDB._get_db_connection",
                 side_effect=Exception(),
             ),
-            patch("fastagency_studio.helpers.deploy_saas_app") as mock_task,
+            patch("fastagency_studio.helpers.enqueue_deployment") as mock_task,
         ):
             response = client.post(
                 f"/user/{user_uuid}/models/{type_name}/{model_name}/{model_uuid}",
@@ -512,7 +544,7 @@ class TestModelRoutes:
                 "fastagency_studio.helpers.validate_tokens_and_create_gh_repo",
                 return_value=saas_app,
             ) as mock_task,
-            patch("fastagency_studio.helpers.deploy_saas_app"),
+            patch("fastagency_studio.helpers.enqueue_deployment"),
         ):
             response = client.post(
                 f"/user/{user_uuid}/models/{type_name}/{model_name}/{model_uuid}",
@@ -595,32 +627,184 @@ class TestModelRoutes:
         actual = response.json()
         assert actual == expected
 
-    @pytest.mark.llm
     @pytest.mark.asyncio
-    async def test_chat_with_no_function_calling(
-        self, user_uuid: str, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
-        model_uuid = str(uuid.uuid4())
-        model_name = "MultiAgentTeam"
-        # Mocking the aclient.chat.completions.create function
-        mock_create = AsyncMock()
-        monkeypatch.setattr(
-            "fastagency_studio.app.aclient.chat.completions.create", mock_create
+    async def test_bulk_models(self, user_uuid: str) -> None:
+        key_uuid = str(uuid.uuid4())
+        llm_uuid = str(uuid.uuid4())
+        models = [
+            {
+                "uuid": key_uuid,
+                "type_name": "secret",
+                "model_name": "AzureOAIAPIKey",
+                "json_str": {"api_key": "whatever", "name": f"key_{key_uuid}"},
+            },
+            {
+                "uuid": llm_uuid,
+                "type_name": "llm",
+                "model_name": "AzureOAI",
+                "json_str": {
+                    "name": f"llm_{llm_uuid}",
+                    "api_key": {
+                        "type": "secret",
+                        "name": "AzureOAIAPIKey",
+                        "uuid": key_uuid,
+                    },
+                    "base_url": "https://my-model.openai.azure.com",
+                },
+            },
+        ]
+
+        # Create models
+        response = client.post(f"/user/{user_uuid}/models", json=models)
+        assert response.status_code == 200, response.json()
+        actual = response.json()
+        assert [model["name"] for model in actual] == [
+            f"key_{key_uuid}",
+            f"llm_{llm_uuid}",
+        ]
+
+        response = client.get(f"/user/{user_uuid}/models")
+        assert response.status_code == 200
+        assert {model["uuid"] for model in response.json()} >= {key_uuid, llm_uuid}
+
+        # Creating them again fails on duplicate names
+        duplicates = [{**model, "uuid": str(uuid.uuid4())} for model in models]
+        backend_db = DefaultDB.backend()
+        with patch.object(
+            backend_db, "find_many_model", wraps=backend_db.find_many_model
+        ) as mock_find_many_model:
+            response = client.post(f"/user/{user_uuid}/models", json=duplicates)
+        # only the models with the same names are loaded, in a single query
+        mock_find_many_model.assert_awaited_once_with(
+            user_uuid=user_uuid, names=[f"key_{key_uuid}", f"llm_{llm_uuid}"]
+        )
+        assert response.status_code == 422
+        assert response.json() == {
+            "detail": [
+                {
+                    "loc": [i, "name"],
+                    "msg": "Name already exists. Please enter a different name",
+                }
+                for i in range(2)
+            ]
+        }
+
+        # Update models
+        models[0]["json_str"]["api_key"] = "whatever else"  # type: ignore[index]
+        models[1]["json_str"]["name"] = f"llm_renamed_{llm_uuid}"  # type: ignore[index]
+        response = client.put(f"/user/{uuid.uuid4()}/models", json=models)
+        assert response.status_code == 404
+        response = client.put(f"/user/{user_uuid}/models", json=models)
+        assert response.status_code == 200, response.json()
+        actual = response.json()
+        assert actual[0]["api_key"] == "whatever else"  # pragma: allowlist secret
+        assert actual[1]["name"] == f"llm_renamed_{llm_uuid}"
+
+        # Delete models
+        response = client.request(
+            "DELETE", f"/user/{user_uuid}/models", json=[key_uuid, llm_uuid]
         )
+        assert response.status_code == 200
+        assert [model["name"] for model in response.json()] == [
+            f"key_{key_uuid}",
+            f"llm_renamed_{llm_uuid}",
+        ]
 
-        # Define the mock return value
-        mock_create.return_value = AsyncMock(
-            choices=[AsyncMock(message=AsyncMock(tool_calls=None))]
+        response = client.request(
+            "DELETE", f"/user/{user_uuid}/models", json=[key_uuid]
+        )
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_bulk_models_validation_error(self, user_uuid: str) -> None:
+        models = [
+            {
+                "uuid": str(uuid.uuid4()),
+                "type_name": "secret",
+                "model_name": "AzureOAIAPIKey",
+                "json_str": {"api_key": "whatever", "name": "valid"},
+            },
+            {
+                "uuid": str(uuid.uuid4()),
+                "type_name": "secret",
+                "model_name": "AzureOAIAPIKey",
+                "json_str": {"name": "invalid"},
+            },
+            {
+                "uuid": str(uuid.uuid4()),
+                "type_name": "secret",
+                "model_name": "NoSuchModel",
+                "json_str": {"name": "unknown"},
+            },
+        ]
+        response = client.post(f"/user/{user_uuid}/models", json=models)
+        assert response.status_code == 422
+        actual = response.json()["detail"]
+        assert [error["loc"] for error in actual] == [
+            [1, "api_key"],
+            [2, "model_name"],
+        ]
+
+        # Nothing was created
+        response = client.get(f"/user/{user_uuid}/models")
+        assert response.status_code == 200
+        assert "valid" not in [model["json_str"]["name"] for model in response.json()]
+
+    @pytest.mark.asyncio
+    async def test_bulk_models_deployment_not_allowed(self, user_uuid: str) -> None:
+        models = [
+            {
+                "uuid": str(uuid.uuid4()),
+                "type_name": "deployment",
+                "model_name": "Deployment",
+                "json_str": {"name": "deployment"},
+            }
+        ]
+        response = client.post(f"/user/{user_uuid}/models", json=models)
+        assert response.status_code == 422
+        assert response.json() == {"detail": "Deployments cannot be created in bulk"}
+
+    @pytest.fixture
+    def chat_namer(self, monkeypatch: pytest.MonkeyPatch) -> ChatNamer:
+        namer = ChatNamer(generate=generate_chat_names)
+        monkeypatch.setattr("fastagency_studio.app.chat_namer", namer)
+        return namer
+
+    @pytest.fixture
+    def mock_create(self, monkeypatch: pytest.MonkeyPatch) -> AsyncMock:
+        mock_create = AsyncMock()
+        aclient = AsyncMock()
+        aclient.chat.completions.create = mock_create
+        monkeypatch.setattr(
+            "fastagency_studio.chat_names.get_azure_llm_client",
+            lambda: (aclient, "gpt-35-turbo-16k"),
         )
+        return mock_create
 
-        # Define the request body
+    def post_chat(self, user_uuid: str, content: str) -> dict[str, Any]:
+        model_uuid = str(uuid.uuid4())
+        model_name = "MultiAgentTeam"
         request_body = {
-            "message": [{"role": "user", "content": "Hello"}],
+            "message": [{"role": "user", "content": content}],
             "chat_id": 123,
             "user_id": 456,
         }
 
-        # Define the expected response
+        response = client.post(
+            f"/user/{user_uuid}/chat/{model_name}/{model_uuid}", json=request_body
+        )
+        assert response.status_code == 200
+        return response.json()  # type: ignore[no-any-return]
+
+    @pytest.mark.llm
+    @pytest.mark.asyncio
+    async def test_chat_with_no_function_calling(
+        self, user_uuid: str, chat_namer: ChatNamer, mock_create: AsyncMock
+    ) -> None:
+        mock_create.return_value = AsyncMock(
+            choices=[AsyncMock(message=AsyncMock(tool_calls=None))]
+        )
+
         expected_response = {
             "team_status": "inprogress",
             "team_name": "456_123",
@@ -628,40 +812,18 @@ class TestModelRoutes:
             "customer_brief": "Some customer brief",
             "conversation_name": "Hello",
         }
+        assert self.post_chat(user_uuid, "Hello") == expected_response
 
-        response = client.post(
-            f"/user/{user_uuid}/chat/{model_name}/{model_uuid}", json=request_body
-        )
-
-        # Assert the status code and the response body
-        assert response.status_code == 200
-        assert response.json() == expected_response
-
-        # Assert the mock was called with the correct arguments
+        # the chat is named after its task
         mock_create.assert_called_once()
 
     @pytest.mark.llm
     @pytest.mark.asyncio
     async def test_chat_error(
-        self, user_uuid: str, monkeypatch: pytest.MonkeyPatch
+        self, user_uuid: str, chat_namer: ChatNamer, mock_create: AsyncMock
     ) -> None:
-        model_uuid = str(uuid.uuid4())
-        model_name = "MultiAgentTeam"
-
-        mock_create = AsyncMock()
-        monkeypatch.setattr(
-            "fastagency_studio.app.aclient.chat.completions.create", mock_create
-        )
         mock_create.side_effect = Exception("Error creating chat completion")
 
-        # Define the request body
-        request_body = {
-            "message": [{"role": "user", "content": "Hello"}],
-            "chat_id": 123,
-            "user_id": 456,
-        }
-
-        # Define the expected response
         expected_response = {
             "team_status": "inprogress",
             "team_name": "456_123",
@@ -669,34 +831,18 @@ class TestModelRoutes:
             "customer_brief": "Some customer brief",
             "conversation_name": "Hello",
         }
+        assert self.post_chat(user_uuid, "Hello") == expected_response
 
-        response = client.post(
-            f"/user/{user_uuid}/chat/{model_name}/{model_uuid}", json=request_body
-        )
-
-        # Assert the status code and the response body
-        assert response.status_code == 200
-        assert response.json() == expected_response
-
-        # Assert the mock was called with the correct arguments
         mock_create.assert_called_once()
 
     @pytest.mark.llm
     @pytest.mark.asyncio
     async def test_chat_with_function_calling(
-        self, user_uuid: str, monkeypatch: pytest.MonkeyPatch
+        self, user_uuid: str, chat_namer: ChatNamer, mock_create: AsyncMock
     ) -> None:
-        model_uuid = str(uuid.uuid4())
-        model_name = "MultiAgentTeam"
-
-        mock_create = AsyncMock()
-        monkeypatch.setattr(
-            "fastagency_studio.app.aclient.chat.completions.create", mock_create
-        )
-
         function = Function(
-            arguments='{\n  "chat_name": "Calculate 2 * 2"\n}',
-            name="generate_chat_name",
+            arguments='{\n  "chat_names": ["Calculate 2 * 2"]\n}',
+            name="generate_chat_names",
         )
         tool_call = ChatCompletionMessageToolCall(
             id="1", function=function, type="function"
@@ -709,14 +855,6 @@ class TestModelRoutes:
 
         mock_create.return_value = chat_completion
 
-        # Define the request body
-        request_body = {
-            "message": [{"role": "user", "content": "Hello"}],
-            "chat_id": 123,
-            "user_id": 456,
-        }
-
-        # Define the expected response
         expected_response = {
             "team_status": "inprogress",
             "team_name": "456_123",
@@ -724,16 +862,11 @@ class TestModelRoutes:
             "customer_brief": "Some customer brief",
             "conversation_name": "Calculate 2 * 2",
         }
+        assert self.post_chat(user_uuid, "What is 2 * 2?") == expected_response
 
-        response = client.post(
-            f"/user/{user_uuid}/chat/{model_name}/{model_uuid}", json=request_body
-        )
-
-        # Assert the status code and the response body
-        assert response.status_code == 200
-        assert response.json() == expected_response
+        # the name of the same task is reused
+        assert self.post_chat(user_uuid, "  what is 2 * 2? ") == expected_response
 
-        # Assert the mock was called with the correct arguments
         mock_create.assert_called_once()
 
     @pytest.mark.asyncio
@@ -3,7 +3,7 @@ import uuid
 from typing import Any
 
 import pytest
-from fastapi import BackgroundTasks, HTTPException
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 
 from fastagency_studio.app import add_model, app, validate_toolbox
@@ -65,7 +65,6 @@ class TestValidateOpenAIKey:
             model_name=OpenAIAPIKey.__name__,  # type: ignore [attr-defined]
             model_uuid=api_key_model_uuid,
             model=api_key.model_dump(),
-            background_tasks=BackgroundTasks(),
         )
 
         # Pass only name in the request, this should only update the name and retain the existing api_key
@@ -0,0 +1,150 @@
+import json
+import platform
+import statistics
+import subprocess  # nosec B404
+import time
+import tracemalloc
+from collections.abc import Awaitable
+from datetime import datetime, timezone
+from os import environ
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from pydantic import BaseModel
+
+__all__ = [
+    "BenchmarkResult",
+    "ameasure",
+    "measure",
+    "peak_allocation",
+    "summarize",
+    "write_report",
+]
+
+REPORT_DIR_ENV_VAR = "BENCHMARK_REPORT_DIR"
+DEFAULT_REPORT_DIR = ".benchmarks"
+
+
+class BenchmarkResult(BaseModel):
+    name: str
+    iterations: int
+    total_s: float
+    mean_ms: float
+    p50_ms: float
+    p99_ms: float
+    ops_per_sec: float
+    extra: dict[str, Any] = {}
+
+
+def _percentile(xs: list[float], q: float) -> float:
+    if len(xs) == 1:
+        return xs[0]
+    return statistics.quantiles(xs, n=100, method="inclusive")[int(q) - 1]
+
+
+def summarize(
+    name: str, timings: list[float], extra: Optional[dict[str, Any]]
+) -> BenchmarkResult:
+    total_s = sum(timings)
+    return BenchmarkResult(
+        name=name,
+        iterations=len(timings),
+        total_s=total_s,
+        mean_ms=statistics.fmean(timings) * 1000,
+        p50_ms=_percentile(timings, 50) * 1000,
+        p99_ms=_percentile(timings, 99) * 1000,
+        ops_per_sec=len(timings) / total_s if total_s > 0 else float("inf"),
+        extra=extra or {},
+    )
+
+
+def measure(
+    name: str,
+    f: Callable[[], Any],
+    *,
+    iterations: int = 100,
+    warmup: int = 5,
+    extra: Optional[dict[str, Any]] = None,
+) -> BenchmarkResult:
+    for _ in range(warmup):
+        f()
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        f()
+        timings.append(time.perf_counter() - start)
+
+    return summarize(name, timings, extra)
+
+
+async def ameasure(
+    name: str,
+    f: Callable[[], Awaitable[Any]],
+    *,
+    iterations: int = 100,
+    warmup: int = 5,
+    extra: Optional[dict[str, Any]] = None,
+) -> BenchmarkResult:
+    for _ in range(warmup):
+        await f()
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await f()
+        timings.append(time.perf_counter() - start)
+
+    return summarize(name, timings, extra)
+
+
+def peak_allocation(f: Callable[[], Any], *, iterations: int = 100) -> dict[str, int]:
+    """Return the peak and the retained per call memory allocated by f in bytes."""
+    f()
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for _ in range(iterations):
+            f()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "peak_bytes": peak - before,
+        "retained_bytes_per_call": (after - before) // iterations,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(  # nosec B603 B607
+            ["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return None
+
+
+def write_report(suite: str, results: list[BenchmarkResult], **metadata: Any) -> Path:
+    """Write benchmark results as JSON so they can be compared across commits.
+
+    The report is written to `$BENCHMARK_REPORT_DIR/<suite>.json` (defaults to
+    `.benchmarks/<suite>.json`).
+    """
+    report_dir = Path(environ.get(REPORT_DIR_ENV_VAR, DEFAULT_REPORT_DIR))
+    report_dir.mkdir(parents=True, exist_ok=True)
+    path = report_dir / f"{suite}.json"
+
+    report = {
+        "suite": suite,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "metadata": metadata,
+        "results": [result.model_dump() for result in results],
+    }
+    path.write_text(json.dumps(report, indent=2, default=str))
+
+    return path
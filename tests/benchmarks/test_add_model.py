@@ -0,0 +1,120 @@
+import json
+import uuid
+from os import environ
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from pydantic_core import to_json
+
+import fastagency_studio.models  # noqa: F401
+from fastagency_studio.db.base import DefaultDB
+from fastagency_studio.db.inmemory import InMemoryBackendDB, InMemoryFrontendDB
+from fastagency_studio.helpers import add_model_to_user
+from fastagency_studio.models.base import Model
+from fastagency_studio.models.registry import Registry
+
+from .helpers import BenchmarkResult, ameasure, measure, peak_allocation, write_report
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+ITERATIONS = int(environ.get("BENCHMARK_ADD_MODEL_ITERATIONS", 10_000))
+GH_REPO_URL = "https://github.com/whoever/whatever"
+
+
+def _ref(type_name: str, model_name: str) -> dict[str, Any]:
+    return {"type": type_name, "name": model_name, "uuid": str(uuid.uuid4())}
+
+
+MODELS: dict[tuple[str, str], dict[str, Any]] = {
+    ("secret", "GitHubToken"): {"name": "gh_token", "gh_token": "whatever"},
+    ("deployment", "Deployment"): {
+        "name": "deployment",
+        "repo_name": "whatever",
+        "fly_app_name": "whatever",
+        "team": _ref("team", "TwoAgentTeam"),
+        "gh_token": _ref("secret", "GitHubToken"),
+        "fly_token": _ref("secret", "FlyToken"),
+    },
+}
+
+
+def _serialize_legacy(model: Model) -> tuple[dict[str, Any], str]:
+    # serialization used by add_model_to_user for deployments before it was unified
+    model_dict = model.model_dump()
+    model_json = model.model_dump_json()
+
+    model_dict["app_deploy_status"] = "inprogress"
+    model_dict["gh_repo_url"] = GH_REPO_URL
+
+    updated_model_dict = json.loads(model_json)
+    updated_model_dict["app_deploy_status"] = "inprogress"
+    updated_model_dict["gh_repo_url"] = GH_REPO_URL
+    return model_dict, json.dumps(updated_model_dict)
+
+
+def _serialize(model: Model) -> tuple[dict[str, Any], str]:
+    model_dict = model.model_dump()
+
+    model_dict["app_deploy_status"] = "inprogress"
+    model_dict["gh_repo_url"] = GH_REPO_URL
+
+    return model_dict, to_json(model_dict).decode()
+
+
+def _measure_serialization() -> list[BenchmarkResult]:
+    model = Registry.get_default().validate(
+        "deployment", "Deployment", MODELS[("deployment", "Deployment")]
+    )
+    return [
+        measure(
+            f"serialize/{f.__name__.lstrip('_')}",
+            lambda f=f: f(model),  # type: ignore[misc]
+            iterations=ITERATIONS,
+            extra=peak_allocation(lambda f=f: f(model)),  # type: ignore[misc]
+        )
+        for f in [_serialize_legacy, _serialize]
+    ]
+
+
+async def _measure_add_model(
+    user_uuid: str, type_name: str, model_name: str
+) -> BenchmarkResult:
+    async def add_model() -> None:
+        await add_model_to_user(
+            user_uuid=user_uuid,
+            type_name=type_name,
+            model_name=model_name,
+            model_uuid=str(uuid.uuid4()),
+            model=MODELS[(type_name, model_name)],
+        )
+
+    return await ameasure(
+        f"add_model_to_user/{type_name}/{model_name}",
+        add_model,
+        iterations=ITERATIONS,
+    )
+
+
+@pytest.mark.asyncio
+async def test_add_model_benchmark() -> None:
+    frontend_db = InMemoryFrontendDB()
+    user_uuid = str(
+        await frontend_db._create_user(uuid.uuid4(), "user@airt.ai", "user")
+    )
+    saas_app = MagicMock(gh_repo_url=GH_REPO_URL)
+
+    with (
+        DefaultDB.set(backend_db=InMemoryBackendDB(), frontend_db=frontend_db),
+        patch(
+            "fastagency_studio.helpers.validate_tokens_and_create_gh_repo",
+            AsyncMock(return_value=saas_app),
+        ),
+    ):
+        results = _measure_serialization() + [
+            await _measure_add_model(user_uuid, type_name, model_name)
+            for type_name, model_name in MODELS
+        ]
+
+    path = write_report("add_model", results, iterations=ITERATIONS)
+    print(f"Benchmark report written to {path}")  # noqa: T201
@@ -0,0 +1,302 @@
+import json
+import uuid
+from collections.abc import Awaitable, Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from os import environ
+from typing import Any, Callable
+
+import httpx
+import pytest
+
+from fastagency_studio.app import app
+from fastagency_studio.db.base import BackendDBProtocol, DefaultDB
+from fastagency_studio.db.inmemory import InMemoryBackendDB, InMemoryFrontendDB
+from fastagency_studio.db.prisma import PrismaBackendDB
+
+from .helpers import BenchmarkResult, ameasure, write_report
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+# number of models of the benchmarked user
+SIZES = [
+    int(size)
+    for size in environ.get("BENCHMARK_API_SIZES", "10,1000,100000").split(",")
+]
+ITERATIONS = int(environ.get("BENCHMARK_API_ITERATIONS", 20))
+WARMUP = 5
+
+API_KEY = "sk-proj-" + "a" * 48  # pragma: allowlist secret
+SYSTEM_MESSAGE = "You are a helpful assistant." * 4
+
+# every third model is a secret, so get_all_models masks a realistic share of keys
+SEED_QUERY = """
+INSERT INTO "Model" (uuid, user_uuid, type_name, model_name, json_str, created_at, updated_at)
+SELECT
+    'bench-api-' || i || '-' || '{user_uuid}',
+    '{user_uuid}'::uuid,
+    CASE WHEN i % 3 = 0 THEN 'secret' ELSE 'agent' END,
+    CASE WHEN i % 3 = 0 THEN 'OpenAIAPIKey' ELSE 'AssistantAgent' END,
+    CASE WHEN i % 3 = 0
+        THEN jsonb_build_object('name', 'model_' || i, 'api_key', '{api_key}')
+        ELSE jsonb_build_object(
+            'name', 'model_' || i,
+            'llm', jsonb_build_object('type', 'llm', 'name', 'AzureOAI', 'uuid', gen_random_uuid()),
+            'toolbox_1', null,
+            'toolbox_2', null,
+            'toolbox_3', null,
+            'system_message', '{system_message}'
+        )
+    END,
+    now(),
+    now()
+FROM generate_series(1, {size}) AS i
+"""
+
+
+def _seed_model(user_uuid: str, i: int) -> dict[str, Any]:
+    if i % 3 == 0:
+        type_name, model_name = "secret", "OpenAIAPIKey"
+        json_str: dict[str, Any] = {"name": f"model_{i}", "api_key": API_KEY}
+    else:
+        type_name, model_name = "agent", "AssistantAgent"
+        json_str = {
+            "name": f"model_{i}",
+            "llm": {"type": "llm", "name": "AzureOAI", "uuid": str(uuid.uuid4())},
+            "toolbox_1": None,
+            "toolbox_2": None,
+            "toolbox_3": None,
+            "system_message": SYSTEM_MESSAGE,
+        }
+
+    return {
+        "uuid": f"bench-api-{i}-{user_uuid}",
+        "user_uuid": user_uuid,
+        "type_name": type_name,
+        "model_name": model_name,
+        "json_str": json_str,
+        "created_at": datetime.now(),
+        "updated_at": datetime.now(),
+    }
+
+
+async def _seed(backend_db: BackendDBProtocol, user_uuid: str, size: int) -> None:
+    if isinstance(backend_db, InMemoryBackendDB):
+        backend_db._models += [_seed_model(user_uuid, i) for i in range(1, size + 1)]
+    elif isinstance(backend_db, PrismaBackendDB):
+        await _execute(
+            backend_db,
+            SEED_QUERY.format(
+                user_uuid=user_uuid,
+                size=size,
+                api_key=API_KEY,
+                system_message=SYSTEM_MESSAGE,
+            ),
+            'ANALYZE "Model"',
+        )
+
+
+async def _cleanup(backend_db: BackendDBProtocol, user_uuid: str) -> None:
+    if isinstance(backend_db, PrismaBackendDB):
+        await _execute(
+            backend_db,
+            f"DELETE FROM \"Model\" WHERE user_uuid = '{user_uuid}'::uuid",
+            f"DELETE FROM \"AuthToken\" WHERE user_uuid = '{user_uuid}'::uuid",
+        )
+
+
+async def _execute(backend_db: PrismaBackendDB, *queries: str) -> None:
+    async with backend_db._get_db_connection() as db:
+        for query in queries:
+            await db.execute_raw(query)
+
+
+@contextmanager
+def _backend(name: str) -> Iterator[BackendDBProtocol]:
+    # users are always kept in memory, the routes read them only to check access
+    backend_db = InMemoryBackendDB() if name == "inmemory" else PrismaBackendDB()
+    with DefaultDB.set(backend_db=backend_db, frontend_db=InMemoryFrontendDB()):
+        yield backend_db
+
+
+def _checked(
+    client: httpx.AsyncClient, method: str, url: Callable[[], str], **kwargs: Any
+) -> Callable[[], Awaitable[httpx.Response]]:
+    async def request() -> httpx.Response:
+        response = await client.request(method, url(), **kwargs)
+        assert response.status_code == 200, response.text  # nosec B101
+        return response
+
+    return request
+
+
+async def _measure_models(
+    client: httpx.AsyncClient, user_uuid: str, extra: dict[str, Any]
+) -> list[BenchmarkResult]:
+    n = ITERATIONS + WARMUP
+    secret = {"name": "bench_api_key", "api_key": API_KEY}
+
+    add_uuids = iter([str(uuid.uuid4()) for _ in range(n)])
+    add_names = iter([f"bench_added_{i}" for i in range(n)])
+
+    async def add_model() -> None:
+        response = await client.post(
+            f"/user/{user_uuid}/models/secret/OpenAIAPIKey/{next(add_uuids)}",
+            json={**secret, "name": next(add_names)},
+        )
+        assert response.status_code == 200, response.text  # nosec B101
+
+    # the updated and the deleted models are created up front, outside of the timings
+    update_uuid = str(uuid.uuid4())
+    delete_uuids = [str(uuid.uuid4()) for _ in range(n)]
+    for i, model_uuid in enumerate([update_uuid, *delete_uuids]):
+        await DefaultDB.backend().create_model(
+            model_uuid=model_uuid,
+            user_uuid=user_uuid,
+            type_name="secret",
+            model_name="OpenAIAPIKey",
+            json_str=json.dumps({**secret, "name": f"bench_precreated_{i}"}),
+        )
+    delete_it = iter(delete_uuids)
+
+    routes: list[tuple[str, Callable[[], Awaitable[Any]]]] = [
+        (
+            "GET /models/schemas",
+            _checked(client, "GET", lambda: "/models/schemas"),
+        ),
+        (
+            "POST /models/{type}/{name}/validate",
+            _checked(
+                client,
+                "POST",
+                lambda: "/models/secret/OpenAIAPIKey/validate",
+                json=secret,
+            ),
+        ),
+        ("POST /user/{user_uuid}/models/{type}/{name}/{uuid}", add_model),
+        (
+            "PUT /user/{user_uuid}/models/{type}/{name}/{uuid}",
+            _checked(
+                client,
+                "PUT",
+                lambda: f"/user/{user_uuid}/models/secret/OpenAIAPIKey/{update_uuid}",
+                json={**secret, "name": "bench_precreated_0"},
+            ),
+        ),
+        (
+            "GET /user/{user_uuid}/models",
+            _checked(client, "GET", lambda: f"/user/{user_uuid}/models"),
+        ),
+        (
+            "GET /user/{user_uuid}/models?type_name=secret",
+            _checked(
+                client, "GET", lambda: f"/user/{user_uuid}/models?type_name=secret"
+            ),
+        ),
+        (
+            "DELETE /user/{user_uuid}/models/{type}/{uuid}",
+            _checked(
+                client,
+                "DELETE",
+                lambda: f"/user/{user_uuid}/models/secret/{next(delete_it)}",
+            ),
+        ),
+    ]
+
+    return [
+        await ameasure(name, f, iterations=ITERATIONS, warmup=WARMUP, extra=extra)
+        for name, f in routes
+    ]
+
+
+async def _measure_auth_tokens(
+    client: httpx.AsyncClient, user_uuid: str, extra: dict[str, Any]
+) -> list[BenchmarkResult]:
+    deployment_uuid = str(uuid.uuid4())
+    await DefaultDB.backend().create_model(
+        model_uuid=deployment_uuid,
+        user_uuid=user_uuid,
+        type_name="deployment",
+        model_name="Deployment",
+        json_str=json.dumps({"name": "bench_deployment"}),
+    )
+    url = f"/user/{user_uuid}/deployment/{deployment_uuid}"
+
+    create_auth_token = _checked(
+        client, "POST", lambda: url, json={"name": "bench", "expiry": "1d"}
+    )
+    get_all_auth_tokens = _checked(client, "GET", lambda: url)
+
+    results = [
+        await ameasure(
+            "POST /user/{user_uuid}/deployment/{deployment_uuid}",
+            create_auth_token,
+            iterations=ITERATIONS,
+            warmup=WARMUP,
+            extra=extra,
+        ),
+        await ameasure(
+            "GET /user/{user_uuid}/deployment/{deployment_uuid}",
+            get_all_auth_tokens,
+            iterations=ITERATIONS,
+            warmup=WARMUP,
+            extra=extra,
+        ),
+    ]
+
+    response = await get_all_auth_tokens()
+    delete_it = iter([auth_token["uuid"] for auth_token in response.json()])
+    results.append(
+        await ameasure(
+            "DELETE /user/{user_uuid}/deployment/{deployment_uuid}/{auth_token_uuid}",
+            _checked(client, "DELETE", lambda: f"{url}/{next(delete_it)}"),
+            iterations=ITERATIONS,
+            warmup=WARMUP,
+            extra=extra,
+        )
+    )
+
+    return results
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "backend", ["inmemory", pytest.param("prisma", marks=pytest.mark.db)]
+)
+async def test_api_throughput_benchmark(backend: str) -> None:
+    transport = httpx.ASGITransport(app=app)
+
+    results = []
+    with _backend(backend) as backend_db:
+        for size in SIZES:
+            user_uuid = str(uuid.uuid4())
+            await DefaultDB.frontend()._create_user(  # type: ignore[attr-defined]
+                user_uuid, f"{user_uuid}@airt.ai", user_uuid
+            )
+            await _seed(backend_db, user_uuid, size)
+
+            extra = {"backend": backend, "models": size}
+            try:
+                async with httpx.AsyncClient(
+                    transport=transport, base_url="http://test"
+                ) as client:
+                    size_results = [
+                        *await _measure_models(client, user_uuid, extra),
+                        *await _measure_auth_tokens(client, user_uuid, extra),
+                    ]
+            finally:
+                await _cleanup(backend_db, user_uuid)
+
+            results += [
+                result.model_copy(update={"name": f"{size}/{result.name}"})
+                for result in size_results
+            ]
+
+    path = write_report(
+        f"api_throughput_{backend}",
+        results,
+        backend=backend,
+        sizes=SIZES,
+        iterations=ITERATIONS,
+    )
+    print(f"Benchmark report written to {path}")  # noqa: T201
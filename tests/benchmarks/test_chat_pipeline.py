@@ -0,0 +1,210 @@
+import asyncio
+import json
+import time
+import tracemalloc
+import uuid
+from os import environ
+from typing import Any, Optional
+
+import pytest
+from faststream.nats import TestNatsBroker
+from pydantic import BaseModel
+
+import fastagency_studio.io.ionats
+from fastagency_studio.db.base import DefaultDB
+from fastagency_studio.io.app import broker
+from fastagency_studio.io.checkpoints import InMemoryCheckpointStore
+from fastagency_studio.io.fanout import ChatFanOut
+from fastagency_studio.io.ionats import InitiateModel
+from fastagency_studio.io.messages import InputResponseModel
+from fastagency_studio.models.teams.two_agent_teams import AutogenTwoAgentTeam
+
+from .helpers import summarize, write_report
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+# number of simulated clients chatting at the same time
+CLIENTS = int(environ.get("BENCHMARK_CHAT_CLIENTS", 20))
+# number of human replies per chat before the client ends it
+TURNS = int(environ.get("BENCHMARK_CHAT_TURNS", 3))
+# how long the simulated LLM takes to generate a reply, in seconds
+LLM_LATENCY = float(environ.get("BENCHMARK_LLM_LATENCY", 0.05))
+# use the NATS server at NATS_URL instead of the in-memory test broker
+REAL_NATS = environ.get("BENCHMARK_REAL_NATS", "false").lower() == "true"
+
+CHAT_TIMEOUT = float(environ.get("BENCHMARK_CHAT_TIMEOUT", 60))
+
+
+def create_simulated_team(llm_latency: float) -> AutogenTwoAgentTeam:
+    """Create a team of a human user and an assistant backed by a simulated LLM."""
+    from autogen import ConversableAgent
+
+    user = ConversableAgent(name="user", llm_config=False, human_input_mode="ALWAYS")
+    assistant = ConversableAgent(
+        name="assistant", llm_config=False, human_input_mode="NEVER"
+    )
+
+    def llm_reply(
+        recipient: ConversableAgent,
+        messages: Optional[list[dict[str, Any]]] = None,
+        sender: Optional[ConversableAgent] = None,
+        config: Optional[Any] = None,
+    ) -> tuple[bool, str]:
+        # the chat runs in a worker thread, just like a blocking LLM client
+        time.sleep(llm_latency)
+        return True, f"Reply to message {len(messages or [])}: " + "lorem ipsum " * 50
+
+    assistant.register_reply(trigger=[user], reply_func=llm_reply)
+
+    return AutogenTwoAgentTeam(
+        initial_agent=user,
+        initial_agent_clients=[],
+        secondary_agent=assistant,
+        secondary_agent_clients=[],
+    )
+
+
+class ChatStats(BaseModel):
+    # time until the first message of the server arrives
+    start_s: float
+    # time from each client reply until the first message of the server
+    message_latencies_s: list[float]
+    duration_s: float
+    messages: int
+
+
+async def run_client(
+    fan_out: ChatFanOut, user_id: uuid.UUID, team_id: uuid.UUID, turns: int
+) -> ChatStats:
+    thread_id = uuid.uuid4()
+
+    async with fan_out.listen(user_id, thread_id) as queue:
+        start = time.perf_counter()
+        await broker.publish(
+            InitiateModel(
+                user_id=user_id,
+                thread_id=thread_id,
+                team_id=team_id,
+                msg="What's the weather in New York?",
+            ),
+            "chat.server.initiate_chat",
+        )
+
+        first_message_at: Optional[float] = None
+        replied_at: Optional[float] = None
+        message_latencies: list[float] = []
+        messages = inputs = 0
+        while True:
+            msg = await asyncio.wait_for(queue.get(), CHAT_TIMEOUT)
+            now = time.perf_counter()
+            messages += 1
+
+            if first_message_at is None:
+                first_message_at = now
+            if replied_at is not None:
+                message_latencies.append(now - replied_at)
+                replied_at = None
+
+            if msg.type == "input":
+                reply = "exit" if inputs >= turns else f"Question {inputs}"
+                inputs += 1
+                replied_at = time.perf_counter()
+                await fan_out.send_input(
+                    user_id, thread_id, InputResponseModel(msg=reply)
+                )
+            elif msg.type in ["terminate", "error"]:
+                assert msg.type == "terminate", msg  # nosec B101
+                break
+
+    return ChatStats(
+        start_s=first_message_at - start,
+        message_latencies_s=message_latencies,
+        duration_s=time.perf_counter() - start,
+        messages=messages,
+    )
+
+
+async def run_load(
+    fan_out: ChatFanOut,
+    user_id: uuid.UUID,
+    team_id: uuid.UUID,
+    clients: int,
+    turns: int,
+) -> tuple[list[ChatStats], float]:
+    """Run the chats of all clients concurrently and return their stats and the wall time."""
+    start = time.perf_counter()
+    stats = await asyncio.gather(
+        *(run_client(fan_out, user_id, team_id, turns) for _ in range(clients))
+    )
+
+    return list(stats), time.perf_counter() - start
+
+
+@pytest.mark.asyncio
+async def test_chat_pipeline_benchmark(monkeypatch: pytest.MonkeyPatch) -> None:
+    user_id, team_id = uuid.uuid4(), uuid.uuid4()
+    await DefaultDB.backend().create_model(
+        model_uuid=team_id,
+        user_uuid=user_id,
+        type_name="team",
+        model_name="TwoAgentTeam",
+        json_str=json.dumps({"name": "benchmark_team"}),
+    )
+
+    async def create_team(team_id: uuid.UUID, user_id: uuid.UUID) -> Any:
+        await DefaultDB.backend().find_model(team_id)
+        return create_simulated_team(LLM_LATENCY)
+
+    monkeypatch.setattr(fastagency_studio.io.ionats, "create_team", create_team)
+    if not REAL_NATS:
+        # the in-memory test broker doesn't support key-value buckets
+        monkeypatch.setattr(
+            fastagency_studio.io.ionats, "checkpoint_store", InMemoryCheckpointStore()
+        )
+
+    async with TestNatsBroker(broker, with_real=REAL_NATS):
+        # a single fan-out is shared by all clients, like in the API process
+        fan_out = ChatFanOut(broker)
+
+        # warm up imports and caches before measuring
+        await run_load(fan_out, user_id, team_id, clients=1, turns=1)
+
+        stats, wall_s = await run_load(fan_out, user_id, team_id, CLIENTS, TURNS)
+
+        # memory is measured in a separate run as tracing allocations slows it down
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await run_load(fan_out, user_id, team_id, CLIENTS, TURNS)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        await fan_out.close()
+
+    messages = sum(s.messages for s in stats)
+    extra = {"clients": CLIENTS, "turns": TURNS}
+    results = [
+        summarize("chat_start", [s.start_s for s in stats], extra),
+        summarize(
+            "message_latency",
+            [latency for s in stats for latency in s.message_latencies_s],
+            extra,
+        ),
+        summarize("chat_duration", [s.duration_s for s in stats], extra),
+    ]
+
+    path = write_report(
+        "chat_pipeline",
+        results,
+        clients=CLIENTS,
+        turns=TURNS,
+        llm_latency_s=LLM_LATENCY,
+        real_nats=REAL_NATS,
+        wall_s=wall_s,
+        chats_per_sec=CLIENTS / wall_s,
+        messages_per_sec=messages / wall_s,
+        peak_bytes_per_chat=(peak - before) // CLIENTS,
+    )
+    print(f"Benchmark report written to {path}")  # noqa: T201
@@ -0,0 +1,215 @@
+import hashlib
+import uuid
+from collections.abc import Awaitable
+from datetime import datetime, timedelta
+from os import environ
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+
+from fastagency_studio.db.prisma import PrismaBackendDB
+
+from .helpers import BenchmarkResult, ameasure, write_report
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow, pytest.mark.db]
+
+MIGRATION_PATH = (
+    Path(__file__).parents[2]
+    / "migrations"
+    / "20241120093000_add_indexes_to_model_table"
+    / "migration.sql"
+)
+INDEXES = [
+    "Model_user_uuid_type_name_idx",
+    "Model_user_uuid_updated_at_idx",
+    "Model_json_str_idx",
+    "Model_user_uuid_json_str_name_idx",
+]
+
+N_ROWS = int(environ.get("BENCHMARK_DB_ROWS", 1_000_000))
+N_USERS = int(environ.get("BENCHMARK_DB_USERS", 10_000))
+ITERATIONS = int(environ.get("BENCHMARK_DB_ITERATIONS", 50))
+
+SEED_QUERY = """
+INSERT INTO "Model" (uuid, user_uuid, type_name, model_name, json_str, created_at, updated_at)
+SELECT
+    'bench-' || i,
+    md5('bench-user-' || (i % {n_users}))::uuid,
+    (ARRAY['secret', 'llm', 'agent', 'team', 'toolbox', 'deployment'])[1 + i % 6],
+    'BenchmarkModel',
+    jsonb_build_object(
+        'name', 'model_' || i,
+        'benchmark_seed', true,
+        'team', jsonb_build_object(
+            'uuid', md5('bench-team-' || i)::uuid, 'type', 'team', 'name', 'TwoAgentTeam'
+        )
+    ),
+    now(),
+    now() - (i || ' seconds')::interval
+FROM generate_series(1, {n_rows}) AS i
+"""
+
+
+def _hot_user_uuid() -> str:
+    return str(
+        uuid.UUID(hashlib.md5(b"bench-user-0", usedforsecurity=False).hexdigest())
+    )
+
+
+def _migration_statements() -> list[str]:
+    lines = [
+        line
+        for line in MIGRATION_PATH.read_text().splitlines()
+        if not line.strip().startswith("--")
+    ]
+    return [stmt.strip() for stmt in "\n".join(lines).split(";") if stmt.strip()]
+
+
+async def _execute(backend_db: PrismaBackendDB, *queries: str) -> None:
+    async with backend_db._get_db_connection() as db:
+        for query in queries:
+            await db.execute_raw(query)
+
+
+async def _measure_all(
+    fs: list[Callable[[], Awaitable[Any]]], extra: dict[str, Any]
+) -> list[BenchmarkResult]:
+    return [
+        await ameasure(f.__name__, f, iterations=ITERATIONS, extra=extra) for f in fs
+    ]
+
+
+async def _measure_model_reads(
+    backend_db: PrismaBackendDB, user_uuid: str, extra: dict[str, Any]
+) -> list[BenchmarkResult]:
+    async def find_model() -> Any:
+        return await backend_db.find_model(f"bench-{N_USERS}")
+
+    async def find_many_model() -> Any:
+        return await backend_db.find_many_model(user_uuid)
+
+    async def find_many_model_by_type() -> Any:
+        return await backend_db.find_many_model(user_uuid, type_name="llm")
+
+    async def find_many_model_by_name() -> Any:
+        return await backend_db.find_many_model(user_uuid, name=f"model_{N_USERS}")
+
+    return await _measure_all(
+        [find_model, find_many_model, find_many_model_by_type, find_many_model_by_name],
+        extra,
+    )
+
+
+async def _measure_model_writes(
+    backend_db: PrismaBackendDB, user_uuid: str, extra: dict[str, Any]
+) -> list[BenchmarkResult]:
+    # every iteration (including warmup) works on its own row
+    model_uuids = [str(uuid.uuid4()) for _ in range(ITERATIONS + 5)]
+    json_str = '{"name": "benchmark", "benchmark_seed": true}'
+    create_it, update_it, delete_it = (iter(model_uuids) for _ in range(3))
+
+    async def create_model() -> Any:
+        return await backend_db.create_model(
+            model_uuid=next(create_it),
+            user_uuid=user_uuid,
+            type_name="secret",
+            model_name="BenchmarkModel",
+            json_str=json_str,
+        )
+
+    async def update_model() -> Any:
+        return await backend_db.update_model(
+            model_uuid=next(update_it),
+            user_uuid=user_uuid,
+            type_name="secret",
+            model_name="BenchmarkModel",
+            json_str=json_str,
+        )
+
+    async def delete_model() -> Any:
+        return await backend_db.delete_model(next(delete_it))
+
+    return await _measure_all([create_model, update_model, delete_model], extra)
+
+
+async def _measure_auth_tokens(
+    backend_db: PrismaBackendDB, user_uuid: str, extra: dict[str, Any]
+) -> list[BenchmarkResult]:
+    deployment_uuid = str(uuid.uuid4())
+    token_uuids = [str(uuid.uuid4()) for _ in range(ITERATIONS + 5)]
+    create_it, delete_it = (iter(token_uuids) for _ in range(2))
+
+    async def create_auth_token() -> Any:
+        return await backend_db.create_auth_token(
+            auth_token_uuid=next(create_it),
+            name="benchmark",
+            user_uuid=user_uuid,
+            deployment_uuid=deployment_uuid,
+            hashed_auth_token="benchmark",  # pragma: allowlist secret
+            expiry="1d",
+            expires_at=datetime.utcnow() + timedelta(days=1),
+        )
+
+    async def find_many_auth_token() -> Any:
+        return await backend_db.find_many_auth_token(user_uuid, deployment_uuid)
+
+    async def delete_auth_token() -> Any:
+        return await backend_db.delete_auth_token(
+            next(delete_it), deployment_uuid, user_uuid
+        )
+
+    return await _measure_all(
+        [create_auth_token, find_many_auth_token, delete_auth_token], extra
+    )
+
+
+async def _run_phase(
+    backend_db: PrismaBackendDB, phase: str, user_uuid: str
+) -> list[BenchmarkResult]:
+    extra = {"phase": phase, "rows": N_ROWS, "users": N_USERS}
+    results = [
+        *await _measure_model_reads(backend_db, user_uuid, extra),
+        *await _measure_model_writes(backend_db, user_uuid, extra),
+        *await _measure_auth_tokens(backend_db, user_uuid, extra),
+    ]
+    return [
+        result.model_copy(update={"name": f"{phase}/{result.name}"})
+        for result in results
+    ]
+
+
+@pytest.mark.asyncio
+async def test_model_indexes_benchmark() -> None:
+    backend_db = PrismaBackendDB()
+    user_uuid = _hot_user_uuid()
+
+    await _execute(
+        backend_db,
+        SEED_QUERY.format(n_rows=N_ROWS, n_users=N_USERS),
+        'ANALYZE "Model"',
+    )
+    try:
+        # before: the table as it was with only the primary key
+        await _execute(
+            backend_db,
+            *[f'DROP INDEX IF EXISTS "{index}"' for index in INDEXES],
+            'ANALYZE "Model"',
+        )
+        before = await _run_phase(backend_db, "before", user_uuid)
+
+        # after: the indexes from the migration
+        await _execute(backend_db, *_migration_statements(), 'ANALYZE "Model"')
+        after = await _run_phase(backend_db, "after", user_uuid)
+    finally:
+        await _execute(
+            backend_db,
+            "DELETE FROM \"Model\" WHERE json_str->>'benchmark_seed' = 'true'",
+            *[
+                stmt.replace("CREATE INDEX", "CREATE INDEX IF NOT EXISTS", 1)
+                for stmt in _migration_statements()
+            ],
+        )
+
+    path = write_report("db_indexes", before + after, rows=N_ROWS, users=N_USERS)
+    print(f"Benchmark report written to {path}")  # noqa: T201
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import time
+import uuid
+from os import environ
+
+import httpx
+import pytest
+
+from fastagency_studio.app import app
+from fastagency_studio.db.base import DefaultDB
+from fastagency_studio.models.deployments.cache import deployment_cache
+
+from .helpers import BenchmarkResult, summarize, write_report
+from .test_api_throughput import _backend, _cleanup
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+# number of requests opening a chat of the same deployment
+REQUESTS = int(environ.get("BENCHMARK_DEPLOYMENT_CHAT_REQUESTS", 2000))
+# number of requests in flight at the same time, like many users of a popular SaaS app
+CONCURRENCY = int(environ.get("BENCHMARK_DEPLOYMENT_CHAT_CONCURRENCY", 50))
+
+
+async def _run(client: httpx.AsyncClient, url: str) -> tuple[list[float], float]:
+    """Send the requests with bounded concurrency, return the timings and the wall time."""
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    timings: list[float] = []
+
+    async def request() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(url)
+            timings.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text  # nosec B101
+
+    start = time.perf_counter()
+    await asyncio.gather(*[request() for _ in range(REQUESTS)])
+    return timings, time.perf_counter() - start
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "backend", ["inmemory", pytest.param("prisma", marks=pytest.mark.db)]
+)
+async def test_deployment_chat_benchmark(
+    backend: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    transport = httpx.ASGITransport(app=app)
+    user_uuid = str(uuid.uuid4())
+    deployment_uuid = str(uuid.uuid4())
+    url = f"/deployment/{deployment_uuid}/chat"
+
+    results: list[BenchmarkResult] = []
+    with _backend(backend) as backend_db:
+        await DefaultDB.backend().create_model(
+            model_uuid=deployment_uuid,
+            user_uuid=user_uuid,
+            type_name="deployment",
+            model_name="Deployment",
+            json_str=json.dumps(
+                {
+                    "name": "bench_deployment",
+                    "team": {"type": "team", "uuid": str(uuid.uuid4())},
+                }
+            ),
+        )
+        try:
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                for cache in ["off", "on"]:
+                    monkeypatch.setattr(
+                        deployment_cache,
+                        "ttl",
+                        0 if cache == "off" else deployment_cache.ttl,
+                    )
+                    deployment_cache.clear()
+
+                    timings, wall_s = await _run(client, url)
+                    result = summarize(
+                        f"POST /deployment/{{deployment_uuid}}/chat, cache {cache}",
+                        timings,
+                        {"backend": backend, "cache": cache},
+                    )
+                    # with concurrent requests, the throughput is requests per wall time
+                    results.append(
+                        result.model_copy(update={"ops_per_sec": REQUESTS / wall_s})
+                    )
+        finally:
+            await _cleanup(backend_db, user_uuid)
+
+    path = write_report(
+        f"deployment_chat_{backend}",
+        results,
+        backend=backend,
+        requests=REQUESTS,
+        concurrency=CONCURRENCY,
+    )
+    print(f"Benchmark report written to {path}")  # noqa: T201
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import shutil
+import time
+import uuid
+from collections.abc import Awaitable, Iterator
+from contextlib import contextmanager
+from os import environ
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+
+from fastagency_studio import helpers
+from fastagency_studio.app import app
+from fastagency_studio.db.base import DefaultDB
+from fastagency_studio.db.inmemory import InMemoryBackendDB, InMemoryFrontendDB
+
+from .helpers import BenchmarkResult, summarize, write_report
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+# number of deployments created at the same time
+DEPLOYMENTS = int(environ.get("BENCHMARK_DEPLOYMENT_JOBS_DEPLOYMENTS", 20))
+# latency in seconds of a GitHub or Fly.io round trip, simulated by the gh and fly stand-ins
+LATENCY = float(environ.get("BENCHMARK_DEPLOYMENT_JOBS_LATENCY", 0.2))
+# number of API requests sent during the burst
+REQUESTS = int(environ.get("BENCHMARK_DEPLOYMENT_JOBS_REQUESTS", 200))
+# time in seconds between the API requests
+INTERVAL_S = float(environ.get("BENCHMARK_DEPLOYMENT_JOBS_INTERVAL_S", 0.005))
+
+T = TypeVar("T")
+
+
+def _create_stand_ins(bin_dir: Path) -> None:
+    bin_dir.mkdir()
+
+    # gh repo create prints the URL of the new repository
+    gh = bin_dir / "gh"
+    gh.write_text(
+        f'#!/bin/sh\nsleep {LATENCY}\nif [ "$1" = repo ]; then echo "https://github.com/account/$3"; fi\n'
+    )
+    fly = bin_dir / "fly"
+    fly.write_text(f"#!/bin/sh\nsleep {LATENCY}\n")
+    for path in [gh, fly]:
+        path.chmod(0o755)
+
+
+@contextmanager
+def _blocking_subprocesses(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    # the previous path: the gh and fly commands run on the event loop of the API
+    def asyncify(f: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            return f(*args, **kwargs)
+
+        return wrapper
+
+    with monkeypatch.context() as m:
+        m.setattr(helpers, "asyncify", asyncify)
+        yield
+
+
+async def _create_secrets(
+    backend_db: InMemoryBackendDB, user_uuid: str
+) -> dict[str, dict[str, str]]:
+    refs = {}
+    for name, model_name in [("gh_token", "GitHubToken"), ("fly_token", "FlyToken")]:
+        model_uuid = str(uuid.uuid4())
+        await backend_db.create_model(
+            model_uuid=model_uuid,
+            user_uuid=user_uuid,
+            type_name="secret",
+            model_name=model_name,
+            json_str=json.dumps({"name": name, name: f"{name}-value"}),
+        )
+        refs[name] = {"uuid": model_uuid, "type": "secret", "name": model_name}
+    return refs
+
+
+async def _api_latencies(client: httpx.AsyncClient, user_uuid: str) -> list[float]:
+    timings: list[float] = []
+
+    async def request() -> None:
+        start = time.perf_counter()
+        response = await client.get(f"/user/{user_uuid}/models")
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200
+
+    # requests of independent users arrive at a steady rate during the burst
+    requests = []
+    for _ in range(REQUESTS):
+        requests.append(asyncio.create_task(request()))
+        await asyncio.sleep(INTERVAL_S)
+    await asyncio.gather(*requests)
+
+    return timings
+
+
+async def _deployment_burst(
+    client: httpx.AsyncClient, user_uuid: str, secrets: dict[str, dict[str, str]]
+) -> list[float]:
+    async def deploy(i: int) -> None:
+        model = {
+            "name": f"deployment_{i}_{uuid.uuid4()}",
+            "repo_name": f"my-saas-{i}",
+            "fly_app_name": f"my-saas-{i}",
+            "team": {"uuid": str(uuid.uuid4()), "type": "team", "name": "TwoAgentTeam"},
+            **secrets,
+        }
+        response = await client.post(
+            f"/user/{user_uuid}/models/deployment/Deployment/{uuid.uuid4()}",
+            json=model,
+        )
+        assert response.status_code == 200, response.text
+
+    deployments = [asyncio.create_task(deploy(i)) for i in range(DEPLOYMENTS)]
+    timings = await _api_latencies(client, user_uuid)
+    await asyncio.gather(*deployments)
+    return timings
+
+
+@pytest.mark.skipif(shutil.which("sh") is None, reason="sh is not installed")
+@pytest.mark.asyncio
+async def test_deployment_jobs_benchmark(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _create_stand_ins(tmp_path / "bin")
+    monkeypatch.setenv("PATH", f"{tmp_path / 'bin'}:{environ['PATH']}")
+    # the deployments are pushed by the workers, the API only enqueues them
+    monkeypatch.setattr(helpers, "enqueue_deployment", AsyncMock())
+
+    user_uuid = str(uuid.uuid4())
+    backend_db, frontend_db = InMemoryBackendDB(), InMemoryFrontendDB()
+    await frontend_db._create_user(user_uuid, "user@example.com", "user")
+    secrets = await _create_secrets(backend_db, user_uuid)
+
+    transport = httpx.ASGITransport(app=app)
+    with DefaultDB.set(backend_db=backend_db, frontend_db=frontend_db):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            results: list[BenchmarkResult] = [
+                summarize(
+                    "API latency, no deployments",
+                    await _api_latencies(client, user_uuid),
+                    {"variant": "idle"},
+                )
+            ]
+            with _blocking_subprocesses(monkeypatch):
+                results.append(
+                    summarize(
+                        "API latency, gh and fly commands on the event loop",
+                        await _deployment_burst(client, user_uuid, secrets),
+                        {"variant": "event_loop"},
+                    )
+                )
+            results.append(
+                summarize(
+                    "API latency, gh and fly commands in threads",
+                    await _deployment_burst(client, user_uuid, secrets),
+                    {"variant": "threads"},
+                )
+            )
+
+    path = write_report(
+        "deployment_jobs",
+        results,
+        deployments=DEPLOYMENTS,
+        latency_s=LATENCY,
+        requests=REQUESTS,
+        interval_s=INTERVAL_S,
+    )
+    print(f"Benchmark report written to {path}")  # noqa: T201
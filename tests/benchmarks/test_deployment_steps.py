@@ -0,0 +1,96 @@
+import itertools
+import shutil
+import time
+from os import environ
+from pathlib import Path
+
+import pytest
+
+from fastagency_studio.saas_app_generator import SaasAppGenerator
+
+from .helpers import measure, write_report
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+# number of deployments per variant
+ITERATIONS = int(environ.get("BENCHMARK_DEPLOYMENT_STEPS_ITERATIONS", 5))
+# latency in seconds of a GitHub round trip, simulated by the gh and git push stand-ins
+LATENCY = float(environ.get("BENCHMARK_DEPLOYMENT_STEPS_LATENCY", 0.2))
+
+
+def _create_stand_ins(bin_dir: Path) -> None:
+    bin_dir.mkdir()
+    git = shutil.which("git")
+
+    gh = bin_dir / "gh"
+    gh.write_text(f"#!/bin/sh\nsleep {LATENCY}\n")
+    # the local git commands are real, only the push goes to GitHub
+    git_shim = bin_dir / "git"
+    git_shim.write_text(
+        f'#!/bin/sh\nif [ "$1" = push ]; then sleep {LATENCY}; exit 0; fi\nexec {git} "$@"\n'
+    )
+    for path in [gh, git_shim]:
+        path.chmod(0o755)
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_deployment_steps_benchmark(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _create_stand_ins(tmp_path / "bin")
+    env = {
+        **environ,
+        "PATH": f"{tmp_path / 'bin'}:{environ['PATH']}",
+        "GH_TOKEN": "token",
+    }
+
+    def get_github_username_and_email(self: SaasAppGenerator) -> tuple[str, str]:
+        # two requests to the GitHub API
+        time.sleep(2 * LATENCY)
+        return "John Doe", "john@doe.org"
+
+    monkeypatch.setattr(
+        SaasAppGenerator,
+        "_get_github_username_and_email",
+        get_github_username_and_email,
+    )
+
+    saas_app = SaasAppGenerator(
+        "fly-token",
+        "deployment-uuid",
+        "gh-token",
+        "My SaaS",
+        "my-saas",
+        "my-saas",
+        "auth-token",
+        "developer-uuid",
+    )
+    saas_app.gh_repo_url = "https://github.com/account/my-saas"
+
+    counter = itertools.count()
+
+    def deploy() -> None:
+        temp_dir_path = tmp_path / f"deployment-{next(counter)}"
+        template_dir = temp_dir_path / SaasAppGenerator.EXTRACTED_TEMPLATE_DIR_NAME
+        template_dir.mkdir(parents=True)
+        (template_dir / "main.wasp").write_text("app {}")
+
+        saas_app._initialize_git_and_push(temp_dir_path, env=env)
+
+    results = []
+    for max_parallel_steps in [1, SaasAppGenerator.MAX_PARALLEL_STEPS]:
+        monkeypatch.setattr(SaasAppGenerator, "MAX_PARALLEL_STEPS", max_parallel_steps)
+        results.append(
+            measure(
+                f"git and GitHub setup, {max_parallel_steps} parallel steps",
+                deploy,
+                iterations=ITERATIONS,
+                warmup=1,
+                extra={"max_parallel_steps": max_parallel_steps},
+            )
+        )
+
+    path = write_report(
+        "deployment_steps", results, iterations=ITERATIONS, latency_s=LATENCY
+    )
+    print(f"Benchmark report written to {path}")  # noqa: T201
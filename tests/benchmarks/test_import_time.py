@@ -0,0 +1,64 @@
+import subprocess  # nosec B404
+import sys
+from os import environ
+
+import pytest
+
+from .helpers import BenchmarkResult, write_report
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+MODULES = ["fastagency_studio.app", "fastagency_studio.models"]
+ITERATIONS = int(environ.get("BENCHMARK_IMPORT_ITERATIONS", 10))
+TOP_N = 20
+
+
+def _importtime(module: str) -> dict[str, int]:
+    """Import the module in a fresh interpreter and return cumulative times in us."""
+    output = subprocess.run(  # nosec B603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+
+    times: dict[str, int] = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+
+    return times
+
+
+def _measure(module: str) -> BenchmarkResult:
+    runs = [_importtime(module) for _ in range(ITERATIONS)]
+    totals = sorted(run[module] / 1_000_000 for run in runs)
+
+    slowest = sorted(runs[0].items(), key=lambda x: x[1], reverse=True)[:TOP_N]
+
+    total_s = sum(totals)
+    return BenchmarkResult(
+        name=module,
+        iterations=len(totals),
+        total_s=total_s,
+        mean_ms=total_s / len(totals) * 1000,
+        p50_ms=totals[len(totals) // 2] * 1000,
+        p99_ms=totals[-1] * 1000,
+        ops_per_sec=len(totals) / total_s,
+        extra={"slowest_us": dict(slowest), "modules": len(runs[0])},
+    )
+
+
+def test_import_time_benchmark() -> None:
+    results = [_measure(module) for module in MODULES]
+
+    path = write_report("import_time", results, iterations=ITERATIONS)
+    print(f"Benchmark report written to {path}")  # noqa: T201
+
+    budget_ms = environ.get("BENCHMARK_IMPORT_BUDGET_MS")
+    if budget_ms is not None:
+        for result in results:
+            assert result.p50_ms <= float(budget_ms), result
@@ -0,0 +1,87 @@
+import uuid
+from datetime import datetime
+from os import environ
+from typing import Any
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.testclient import TestClient
+
+from fastagency_studio.app import app
+from fastagency_studio.db.base import DefaultDB
+from fastagency_studio.db.inmemory import InMemoryBackendDB, InMemoryFrontendDB
+
+from .helpers import BenchmarkResult, measure, write_report
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+N_MODELS = int(environ.get("BENCHMARK_JSON_MODELS", 10_000))
+ITERATIONS = int(environ.get("BENCHMARK_JSON_ITERATIONS", 20))
+
+
+def _model(user_uuid: uuid.UUID, i: int) -> dict[str, Any]:
+    return {
+        "uuid": uuid.uuid4(),
+        "user_uuid": user_uuid,
+        "type_name": "agent",
+        "model_name": "AssistantAgent",
+        "json_str": {
+            "name": f"agent_{i}",
+            "llm": {"type": "llm", "name": "AzureOAI", "uuid": str(uuid.uuid4())},
+            "toolbox_1": None,
+            "toolbox_2": None,
+            "toolbox_3": None,
+            "system_message": "You are a helpful assistant." * 4,
+        },
+        "created_at": datetime.now(),
+        "updated_at": datetime.now(),
+    }
+
+
+def _measure_render(models: list[dict[str, Any]]) -> list[BenchmarkResult]:
+    extra = {"models": len(models)}
+
+    return [
+        measure(
+            "render/jsonable_encoder+JSONResponse",
+            lambda: JSONResponse(jsonable_encoder(models)),
+            iterations=ITERATIONS,
+            extra=extra,
+        ),
+        measure(
+            "render/ORJSONResponse",
+            lambda: ORJSONResponse(models),
+            iterations=ITERATIONS,
+            extra=extra,
+        ),
+    ]
+
+
+def _measure_route(
+    models: list[dict[str, Any]], user_uuid: uuid.UUID
+) -> BenchmarkResult:
+    backend_db = InMemoryBackendDB()
+    backend_db._models = [
+        {**model, "uuid": str(model["uuid"]), "user_uuid": str(user_uuid)}
+        for model in models
+    ]
+    client = TestClient(app)
+
+    with DefaultDB.set(backend_db=backend_db, frontend_db=InMemoryFrontendDB()):
+        return measure(
+            f"GET /user/{{user_uuid}}/models/{app.router.default_response_class.__name__}",
+            lambda: client.get(f"/user/{user_uuid}/models"),
+            iterations=ITERATIONS,
+            extra={"models": len(models)},
+        )
+
+
+def test_json_response_benchmark() -> None:
+    user_uuid = uuid.uuid4()
+    models = [_model(user_uuid, i) for i in range(N_MODELS)]
+
+    results = [*_measure_render(models), _measure_route(models, user_uuid)]
+
+    path = write_report("json_response", results, models=N_MODELS)
+    print(f"Benchmark report written to {path}")  # noqa: T201
@@ -0,0 +1,105 @@
+import json
+import uuid
+from os import environ
+from typing import Any, Union, get_args, get_origin
+
+import pytest
+from pydantic_core import Url
+
+import fastagency_studio.models  # noqa: F401
+from fastagency_studio.models.base import Model, ObjectReference
+from fastagency_studio.models.registry import Registry
+
+from .helpers import BenchmarkResult, measure, write_report
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+ITERATIONS = int(environ.get("BENCHMARK_VALIDATION_ITERATIONS", 10_000))
+
+# values for fields with validators rejecting the generic sample values
+SAMPLE_OVERRIDES: dict[tuple[str, str], Any] = {
+    ("AnthropicAPIKey", "api_key"): "sk-ant-api03-" + "a" * 95,
+    ("OpenAIAPIKey", "api_key"): "sk-proj-" + "a" * 48,
+    ("TogetherAIAPIKey", "api_key"): "a" * 64,
+}
+
+
+def _sample_value(annotation: Any) -> Any:
+    if get_origin(annotation) is Union:
+        return _sample_value(get_args(annotation)[0])
+
+    if isinstance(annotation, type) and issubclass(annotation, ObjectReference):
+        return annotation.create(uuid.uuid4()).model_dump(mode="json")
+
+    if annotation is Url:
+        return "https://example.com/openapi.json"
+
+    return "whatever"
+
+
+def _sample(model_type: type[Model]) -> dict[str, Any]:
+    return {
+        name: SAMPLE_OVERRIDES.get(
+            (model_type.__name__, name), _sample_value(field.annotation)
+        )
+        for name, field in model_type.model_fields.items()
+        if field.is_required()
+    }
+
+
+def _registered_models(registry: Registry) -> list[tuple[str, str]]:
+    return [
+        (type_name, model_name)
+        for type_name, models in registry._store.items()
+        for model_name, (model, _) in models.items()
+        if model is not None
+    ]
+
+
+def _measure_model(
+    registry: Registry, type_name: str, model_name: str
+) -> list[BenchmarkResult]:
+    model_type = registry.get_model_type(type_name, model_name)
+    model = _sample(model_type)
+    json_str = json.dumps(model)
+    extra = {"type_name": type_name, "model_name": model_name}
+
+    return [
+        measure(
+            f"{type_name}/{model_name}/kwargs",
+            lambda: registry.get_model_type(type_name, model_name)(**model),
+            iterations=ITERATIONS,
+            extra=extra,
+        ),
+        measure(
+            f"{type_name}/{model_name}/validate",
+            lambda: registry.validate(type_name, model_name, model),
+            iterations=ITERATIONS,
+            extra=extra,
+        ),
+        measure(
+            f"{type_name}/{model_name}/json_loads_validate",
+            lambda: registry.validate(type_name, model_name, json.loads(json_str)),
+            iterations=ITERATIONS,
+            extra=extra,
+        ),
+        measure(
+            f"{type_name}/{model_name}/validate_json",
+            lambda: registry.validate_json(type_name, model_name, json_str),
+            iterations=ITERATIONS,
+            extra=extra,
+        ),
+    ]
+
+
+def test_registry_validation_benchmark() -> None:
+    registry = Registry.get_default()
+
+    results = [
+        result
+        for type_name, model_name in _registered_models(registry)
+        for result in _measure_model(registry, type_name, model_name)
+    ]
+
+    path = write_report("registry_validation", results, iterations=ITERATIONS)
+    print(f"Benchmark report written to {path}")  # noqa: T201
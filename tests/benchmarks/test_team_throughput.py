@@ -0,0 +1,134 @@
+import asyncio
+import contextlib
+import io
+import time
+from collections.abc import Awaitable
+from os import environ
+from typing import Any, Callable
+
+import pytest
+from asyncer import asyncify
+
+from fastagency_studio.helpers import create_autogen
+from fastagency_studio.models.base import ObjectReference
+from fastagency_studio.models.teams.multi_agent_team import AutogenMultiAgentTeam
+
+from ..fake_llm import FakeLLM
+from .helpers import summarize, write_report
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow, pytest.mark.db]
+
+# number of chats running at the same time
+CHATS = int(environ.get("BENCHMARK_TEAM_CHATS", 10))
+# number of rounds of concurrent chats
+ROUNDS = int(environ.get("BENCHMARK_TEAM_ROUNDS", 3))
+# how long the fake LLM takes before responding, in seconds
+LLM_LATENCY = float(environ.get("BENCHMARK_LLM_LATENCY", 0.05))
+
+
+def run_chat(team: Any) -> int:
+    """Run a chat and return the number of messages in the chat history."""
+    # autogen prints every message, which would dominate the measurements
+    with contextlib.redirect_stdout(io.StringIO()):
+        history = team.initiate_chat("What is 2 + 2?")
+
+    # the multi-agent team returns the chat result of the group chat manager
+    return len(history.chat_history)
+
+
+async def run_rounds(
+    create_team: Callable[[], Awaitable[Any]], chats: int, rounds: int
+) -> tuple[list[float], list[float], int, float]:
+    """Run rounds of concurrent chats.
+
+    Returns:
+        The create_autogen and the chat timings, the number of messages and the wall time.
+    """
+    create_timings: list[float] = []
+    chat_timings: list[float] = []
+    messages = 0
+
+    async def run_one() -> None:
+        nonlocal messages
+
+        start = time.perf_counter()
+        team = await create_team()
+        create_timings.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        chat_messages = await asyncify(run_chat)(team)
+        chat_timings.append(time.perf_counter() - start)
+        messages += chat_messages
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await asyncio.gather(*(run_one() for _ in range(chats)))
+
+    return create_timings, chat_timings, messages, time.perf_counter() - start
+
+
+@pytest.mark.asyncio
+async def test_team_throughput_benchmark(
+    user_uuid: str,
+    fake_llm: FakeLLM,
+    fake_two_agent_team_ref: ObjectReference,
+    fake_assistant_ref: ObjectReference,
+    user_proxy_agent_ref: ObjectReference,
+) -> None:
+    fake_llm.latency = LLM_LATENCY
+
+    async def create_two_agent_team() -> Any:
+        return await create_autogen(
+            model_ref=fake_two_agent_team_ref, user_uuid=user_uuid
+        )
+
+    # MultiAgentTeam is not in the registry yet, so the team is built from its agents
+    async def create_multi_agent_team() -> Any:
+        agents_and_clients = [
+            await create_autogen(
+                model_ref=agent_ref, user_uuid=user_uuid, human_input_mode="NEVER"
+            )
+            for agent_ref in [user_proxy_agent_ref, fake_assistant_ref]
+        ]
+        return AutogenMultiAgentTeam(agents_and_clients)
+
+    teams = {
+        "two_agent_team": create_two_agent_team,
+        "multi_agent_team": create_multi_agent_team,
+    }
+
+    # warm up imports and connections before measuring
+    for create_team in teams.values():
+        await run_rounds(create_team, chats=1, rounds=1)
+
+    results = []
+    metadata: dict[str, Any] = {}
+    for name, create_team in teams.items():
+        fake_llm.reset()
+        create_timings, chat_timings, messages, wall_s = await run_rounds(
+            create_team, CHATS, ROUNDS
+        )
+
+        extra = {"chats": CHATS, "rounds": ROUNDS}
+        results += [
+            summarize(f"{name}_create_autogen", create_timings, extra),
+            summarize(f"{name}_chat", chat_timings, extra),
+        ]
+        metadata[name] = {
+            "wall_s": wall_s,
+            "chats_per_sec": CHATS * ROUNDS / wall_s,
+            "messages_per_sec": messages / wall_s,
+            "llm_requests_per_sec": len(fake_llm.requests) / wall_s,
+            # connections opened to the LLM, reused across chats by the client pool
+            "llm_connections": len(fake_llm.connections),
+        }
+
+    path = write_report(
+        "team_throughput",
+        results,
+        chats=CHATS,
+        rounds=ROUNDS,
+        llm_latency_s=LLM_LATENCY,
+        **metadata,
+    )
+    print(f"Benchmark report written to {path}")  # noqa: T201
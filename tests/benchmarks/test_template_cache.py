@@ -0,0 +1,78 @@
+import itertools
+import shutil
+import zipfile
+from os import environ
+from pathlib import Path
+
+import pytest
+
+from fastagency_studio.template_cache import LocalArchiveSource, TemplateCache
+
+from .helpers import measure, write_report
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+# number of deployments created from the template per variant
+ITERATIONS = int(environ.get("BENCHMARK_TEMPLATE_ITERATIONS", 50))
+# number and size of the files in the template, roughly like the wasp app template
+FILES = int(environ.get("BENCHMARK_TEMPLATE_FILES", 500))
+FILE_SIZE = int(environ.get("BENCHMARK_TEMPLATE_FILE_SIZE", 4096))
+
+
+def _create_archive(path: Path) -> Path:
+    with zipfile.ZipFile(str(path), "w", compression=zipfile.ZIP_DEFLATED) as zip_file:
+        for i in range(FILES):
+            zip_file.writestr(
+                f"fastagency-wasp-app-template-main/src/{i % 20}/file_{i}.ts",
+                f"// file {i}\n".encode() + b"x" * FILE_SIZE,
+            )
+    return path
+
+
+def test_template_cache_benchmark(tmp_path: Path) -> None:
+    archive_path = _create_archive(tmp_path / "template.zip")
+    counter = itertools.count()
+
+    def unpack() -> None:
+        # the previous path, without the network: write, unpack and delete the archive
+        deployment = tmp_path / f"deployment-{next(counter)}"
+        deployment.mkdir()
+        zip_path = deployment / "template.zip"
+        shutil.copyfile(archive_path, zip_path)
+        shutil.unpack_archive(str(zip_path), str(deployment))
+        zip_path.unlink()
+
+    results = [
+        measure(
+            "unpack the archive",
+            unpack,
+            iterations=ITERATIONS,
+            extra={"variant": "unpack"},
+        )
+    ]
+
+    for link in ["copy", "hardlink"]:
+        cache = TemplateCache(
+            LocalArchiveSource(archive_path), cache_dir=tmp_path / "cache", link=link
+        )
+
+        def copy_to(cache: TemplateCache = cache) -> None:
+            cache.copy_to("main", tmp_path / f"deployment-{next(counter)}")
+
+        results.append(
+            measure(
+                f"template cache, {link}",
+                copy_to,
+                iterations=ITERATIONS,
+                extra={"variant": link},
+            )
+        )
+
+    path = write_report(
+        "template_cache",
+        results,
+        iterations=ITERATIONS,
+        files=FILES,
+        file_size=FILE_SIZE,
+    )
+    print(f"Benchmark report written to {path}")  # noqa: T201
@@ -0,0 +1,109 @@
+from os import environ
+
+import pytest
+from pydantic import BaseModel
+
+from fastagency_studio.io.encoding import (
+    Encoding,
+    decode_message,
+    encode_message,
+)
+from fastagency_studio.io.messages import (
+    DeltaModel,
+    InputRequestModel,
+    InputResponseModel,
+    PrintModel,
+    ServerResponseModel,
+)
+
+from .helpers import BenchmarkResult, measure, write_report
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+ITERATIONS = int(environ.get("BENCHMARK_ENCODING_ITERATIONS", 10_000))
+
+MESSAGES: dict[str, BaseModel] = {
+    "delta": ServerResponseModel(data=DeltaModel(msg=" weather"), type="delta"),
+    "print": ServerResponseModel(
+        data=PrintModel(msg="The weather in New York is sunny. " * 100), type="print"
+    ),
+    "input_request": ServerResponseModel(
+        data=InputRequestModel(
+            prompt="Provide feedback to chat_manager:", is_password=False
+        ),
+        type="input",
+    ),
+    "input_response": InputResponseModel(msg="What's the weather in New York?"),
+}
+
+
+def _measure_json_text(name: str, msg: BaseModel) -> list[BenchmarkResult]:
+    # the previous path: serialize to str and decode the payload before parsing
+    payload = msg.model_dump_json().encode("utf-8")
+    extra = {"message": name, "encoding": "json_text", "bytes": len(payload)}
+
+    return [
+        measure(
+            f"{name}/json_text/encode",
+            lambda: msg.model_dump_json().encode("utf-8"),
+            iterations=ITERATIONS,
+            extra=extra,
+        ),
+        measure(
+            f"{name}/json_text/decode",
+            lambda: type(msg).model_validate_json(payload.decode("utf-8")),
+            iterations=ITERATIONS,
+            extra=extra,
+        ),
+    ]
+
+
+def _measure_encoding(
+    name: str, msg: BaseModel, encoding: Encoding
+) -> list[BenchmarkResult]:
+    payload, headers = encode_message(msg, encoding)
+    content_type = headers["content-type"]
+    extra = {"message": name, "encoding": encoding, "bytes": len(payload)}
+
+    return [
+        measure(
+            f"{name}/{encoding}/encode",
+            lambda: encode_message(msg, encoding),
+            iterations=ITERATIONS,
+            extra=extra,
+        ),
+        measure(
+            f"{name}/{encoding}/decode",
+            lambda: decode_message(type(msg), payload, content_type),
+            iterations=ITERATIONS,
+            extra=extra,
+        ),
+    ]
+
+
+def test_wire_encoding_benchmark() -> None:
+    encodings: list[Encoding] = ["json"]
+    try:
+        import msgpack  # noqa: F401
+
+        encodings.append("msgpack")
+    except ImportError:
+        pass
+
+    results = [
+        result
+        for name, msg in MESSAGES.items()
+        for result in [
+            *_measure_json_text(name, msg),
+            *(
+                r
+                for encoding in encodings
+                for r in _measure_encoding(name, msg, encoding)
+            ),
+        ]
+    ]
+
+    path = write_report(
+        "wire_encoding", results, iterations=ITERATIONS, encodings=encodings
+    )
+    print(f"Benchmark report written to {path}")  # noqa: T201
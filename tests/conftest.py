@@ -40,6 +40,7 @@ from fastagency_studio.models.llms.together import TogetherAI, TogetherAIAPIKey
 from fastagency_studio.models.teams.two_agent_teams import TwoAgentTeam
 from fastagency_studio.models.toolboxes.toolbox import OpenAPIAuth, Toolbox
 
+from .fake_llm import FakeLLM, create_fake_llm_app
 from .helpers import add_random_suffix, expand_fixture, get_by_tag, tag, tag_list
 
 F = TypeVar("F", bound=Callable[..., Any])
@@ -817,3 +818,146 @@ async def placeholder_team_weatherapi_ref(
 # Fixtures for application
 ###
 ################################################################################
+
+
+################################################################################
+###
+# Fixtures for the fake LLM
+###
+################################################################################
+
+
+@pytest.fixture(scope="session")
+def fake_llm_server() -> Iterator[FakeLLM]:
+    host = "127.0.0.1"
+    port = find_free_port()
+    fake = FakeLLM()
+    app = create_fake_llm_app(fake)
+
+    config = uvicorn.Config(app, host=host, port=port, log_level="warning")
+    server = Server(config=config)
+    with server.run_in_thread():
+        fake.url = f"http://{host}:{port}"
+        yield fake
+
+
+@pytest.fixture
+def fake_llm(fake_llm_server: FakeLLM) -> FakeLLM:
+    fake_llm_server.latency = 0.0
+    fake_llm_server.token_latency = 0.0
+    fake_llm_server.error_rate = 0.0
+    fake_llm_server.reset()
+    return fake_llm_server
+
+
+@tag("fake-llm")
+@pytest_asyncio.fixture()
+async def fake_openai_ref(user_uuid: str, fake_llm: FakeLLM) -> ObjectReference:
+    api_key = await create_model_ref(
+        OpenAIAPIKey,
+        "secret",
+        user_uuid=user_uuid,
+        name=add_random_suffix("fake_openai_key"),
+        api_key="sk-proj-fake",  # pragma: allowlist secret
+    )
+    return await create_model_ref(
+        OpenAI,
+        "llm",
+        user_uuid=user_uuid,
+        name=add_random_suffix("fake_openai"),
+        model="gpt-4o-mini",
+        api_key=api_key,
+        base_url=fake_llm.openai_url,
+    )
+
+
+@tag("fake-llm")
+@pytest_asyncio.fixture()
+async def fake_azure_oai_ref(user_uuid: str, fake_llm: FakeLLM) -> ObjectReference:
+    api_key = await create_model_ref(
+        AzureOAIAPIKey,
+        "secret",
+        user_uuid=user_uuid,
+        name=add_random_suffix("fake_azure_oai_key"),
+        api_key="*" * 64,
+    )
+    return await create_model_ref(
+        AzureOAI,
+        "llm",
+        user_uuid=user_uuid,
+        name=add_random_suffix("fake_azure_oai"),
+        model="gpt-4o-mini",
+        api_key=api_key,
+        base_url=fake_llm.url,
+    )
+
+
+@tag("fake-llm")
+@pytest_asyncio.fixture()
+async def fake_anthropic_ref(user_uuid: str, fake_llm: FakeLLM) -> ObjectReference:
+    api_key = await create_model_ref(
+        AnthropicAPIKey,
+        "secret",
+        user_uuid=user_uuid,
+        name=add_random_suffix("fake_anthropic_key"),
+        api_key="sk-ant-api03-" + "_" * 95,  # pragma: allowlist secret
+    )
+    return await create_model_ref(
+        Anthropic,
+        "llm",
+        user_uuid=user_uuid,
+        name=add_random_suffix("fake_anthropic"),
+        model="claude-3-5-sonnet-20240620",
+        api_key=api_key,
+        base_url=fake_llm.anthropic_url,
+    )
+
+
+@tag("fake-llm")
+@pytest_asyncio.fixture()
+async def fake_together_ai_ref(user_uuid: str, fake_llm: FakeLLM) -> ObjectReference:
+    api_key = await create_model_ref(
+        TogetherAIAPIKey,
+        "secret",
+        user_uuid=user_uuid,
+        name=add_random_suffix("fake_together_ai_key"),
+        api_key="*" * 64,
+    )
+    return await create_model_ref(
+        TogetherAI,
+        "llm",
+        user_uuid=user_uuid,
+        name=add_random_suffix("fake_together_ai"),
+        api_key=api_key,
+        base_url=fake_llm.openai_url,
+    )
+
+
+@pytest_asyncio.fixture()
+async def fake_assistant_ref(
+    user_uuid: str, fake_openai_ref: ObjectReference
+) -> ObjectReference:
+    return await create_model_ref(
+        AssistantAgent,
+        "agent",
+        user_uuid=user_uuid,
+        name=add_random_suffix("fake_assistant"),
+        llm=fake_openai_ref,
+    )
+
+
+@pytest_asyncio.fixture()
+async def fake_two_agent_team_ref(
+    user_uuid: str,
+    fake_assistant_ref: ObjectReference,
+    user_proxy_agent_ref: ObjectReference,
+) -> ObjectReference:
+    return await create_model_ref(
+        TwoAgentTeam,
+        "team",
+        user_uuid=user_uuid,
+        name=add_random_suffix("fake_two_agent_team"),
+        initial_agent=user_proxy_agent_ref,
+        secondary_agent=fake_assistant_ref,
+        human_input_mode="NEVER",
+    )
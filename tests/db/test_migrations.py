@@ -0,0 +1,23 @@
+from pathlib import Path
+
+import pytest
+
+MIGRATIONS_PATH = Path(__file__).parents[2] / "migrations"
+
+# expression indexes Prisma cannot express in schema.prisma, so "prisma migrate dev"
+# generates a DROP INDEX for them in every new migration
+EXPRESSION_INDEXES = ["Model_user_uuid_json_str_name_idx"]
+
+
+@pytest.mark.parametrize("index", EXPRESSION_INDEXES)
+def test_expression_index_is_not_dropped(index: str) -> None:
+    migrations = {
+        path.parent.name: path.read_text()
+        for path in sorted(MIGRATIONS_PATH.glob("*/migration.sql"))
+    }
+
+    assert any(f'CREATE INDEX "{index}"' in sql for sql in migrations.values())
+    dropped_in = [
+        name for name, sql in migrations.items() if f'DROP INDEX "{index}"' in sql
+    ]
+    assert dropped_in == [], f"Remove the DROP INDEX of {index} from the migrations"
@@ -1,3 +1,4 @@
+import json
 import random
 import uuid
 from datetime import datetime, timedelta
@@ -84,11 +85,26 @@ class TestPrismaBackendDB:
 
         found_model = await backend_db.find_model(model_uuid)
         assert found_model["uuid"] == str(model_uuid)
+        found_model = await backend_db.find_model(model_uuid, json_as_text=True)
+        assert json.loads(found_model["json_str"]) == azure_oai_api_key.model_dump()
 
         many_model = await backend_db.find_many_model(user_uuid)
         assert len(many_model) == 1
         assert many_model[0]["uuid"] == str(model_uuid)
 
+        many_model = await backend_db.find_many_model(user_uuid, type_name="secret")
+        assert len(many_model) == 1
+        many_model = await backend_db.find_many_model(user_uuid, type_name="llm")
+        assert len(many_model) == 0
+
+        many_model = await backend_db.find_many_model(user_uuid, name="who cares?")
+        assert len(many_model) == 1
+        assert many_model[0]["uuid"] == str(model_uuid)
+        assert many_model[0]["json_str"] == azure_oai_api_key.model_dump()
+        assert many_model[0].keys() == model.keys()
+        many_model = await backend_db.find_many_model(user_uuid, name="who else?")
+        assert len(many_model) == 0
+
         updated_model = await backend_db.update_model(
             model_uuid=model_uuid,
             user_uuid=user_uuid,
@@ -102,6 +118,71 @@ class TestPrismaBackendDB:
         deleted_model = await backend_db.delete_model(model_uuid)
         assert deleted_model["uuid"] == str(model_uuid)
 
+    async def test_many_model_CRUD(self) -> None:  # noqa: N802
+        # Setup
+        frontend_db = PrismaFrontendDB()
+        backend_db = PrismaBackendDB()
+        random_id = random.randint(1, 1_000_000)
+        user_uuid = await frontend_db._create_user(
+            uuid.uuid4(), f"user{random_id}@airt.ai", f"user{random_id}"
+        )
+        keys = [AzureOAIAPIKey(api_key="whatever", name=f"key_{i}") for i in range(3)]
+        models = [
+            {
+                "uuid": str(uuid.uuid4()),
+                "type_name": "secret",
+                "model_name": "AzureOAIAPIKey",
+                "json_str": key.model_dump_json(),
+            }
+            for key in keys
+        ]
+
+        # Tests
+        created_models = await backend_db.create_many_model(user_uuid, models)
+        assert [model["uuid"] for model in created_models] == [
+            model["uuid"] for model in models
+        ]
+        assert [model["json_str"] for model in created_models] == [
+            key.model_dump() for key in keys
+        ]
+        assert len(await backend_db.find_many_model(user_uuid)) == 3
+
+        found_models = await backend_db.find_many_model(
+            user_uuid, names=["key_0", "key_2", "key_3"]
+        )
+        assert {model["uuid"] for model in found_models} == {
+            models[0]["uuid"],
+            models[2]["uuid"],
+        }
+        found_models = await backend_db.find_many_model(
+            user_uuid, model_uuids=[models[1]["uuid"], str(uuid.uuid4())]
+        )
+        assert [model["uuid"] for model in found_models] == [models[1]["uuid"]]
+
+        updated_models = await backend_db.update_many_model(
+            user_uuid, [{**model, "model_name": "AzureOAIAPIKey2"} for model in models]
+        )
+        assert [model["model_name"] for model in updated_models] == [
+            "AzureOAIAPIKey2"
+        ] * 3
+
+        # Nothing is deleted if any of the models is missing
+        missing_uuid = uuid.uuid4()
+        with pytest.raises(KeyNotFoundError) as e:
+            await backend_db.delete_many_model(
+                user_uuid, [models[0]["uuid"], missing_uuid]
+            )
+        assert f"model_uuid {missing_uuid} not found" == str(e.value)
+        assert len(await backend_db.find_many_model(user_uuid)) == 3
+
+        deleted_models = await backend_db.delete_many_model(
+            user_uuid, [model["uuid"] for model in models]
+        )
+        assert {model["uuid"] for model in deleted_models} == {
+            model["uuid"] for model in models
+        }
+        assert await backend_db.find_many_model(user_uuid) == []
+
     async def test_auth_token_CRUD(self, monkeypatch: pytest.MonkeyPatch) -> None:  # noqa: N802
         # Setup
         frontend_db = PrismaFrontendDB()
@@ -0,0 +1,326 @@
+"""OpenAI and Anthropic compatible stub server for offline tests and benchmarks.
+
+The server answers with scripted responses, or echoes the last message if no
+responses are scripted, and can inject latency and errors. Point the `base_url`
+of the LLM models to `FakeLLM.openai_url` or `FakeLLM.anthropic_url`.
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import AsyncIterator, Iterable
+from typing import Any, Optional, Union
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
+
+__all__ = ["FakeLLM", "FakeResponse", "FakeToolCall", "create_fake_llm_app"]
+
+
+class FakeToolCall(BaseModel):
+    name: str
+    arguments: dict[str, Any] = {}
+
+
+class FakeResponse(BaseModel):
+    content: str = ""
+    tool_calls: list[FakeToolCall] = []
+
+
+class FakeLLM:
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        token_latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 42,
+    ) -> None:
+        """Initialize the fake LLM.
+
+        Args:
+            latency (float, optional): Time before the response or the first
+                streamed token, in seconds. Defaults to 0.0.
+            token_latency (float, optional): Time between streamed tokens, in
+                seconds. Defaults to 0.0.
+            error_rate (float, optional): Share of requests failing with a server
+                error. Defaults to 0.0.
+            seed (int, optional): Seed of the injected errors. Defaults to 42.
+        """
+        self.latency = latency
+        self.token_latency = token_latency
+        self.error_rate = error_rate
+        self.seed = seed
+        # set when the server is started
+        self.url = ""
+
+        self._lock = threading.Lock()
+        self.reset()
+
+    @property
+    def openai_url(self) -> str:
+        """Base URL for OpenAI and TogetherAI, Azure uses `url` as its endpoint."""
+        return f"{self.url}/v1"
+
+    @property
+    def anthropic_url(self) -> str:
+        return self.url
+
+    def reset(self) -> None:
+        """Forget the scripted responses and the received requests."""
+        with self._lock:
+            self._responses: deque[FakeResponse] = deque()
+            self._random = random.Random(self.seed)  # nosec B311
+            self.requests: list[dict[str, Any]] = []
+            # (host, port) of the clients, i.e. the opened connections
+            self.connections: set[tuple[str, int]] = set()
+
+    def script(self, *responses: Union[FakeResponse, str]) -> None:
+        """Add responses returned in order by the next requests."""
+        with self._lock:
+            self._responses.extend(
+                FakeResponse(content=r) if isinstance(r, str) else r for r in responses
+            )
+
+    def _next(
+        self,
+        request: dict[str, Any],
+        messages: list[Any],
+        client: Optional[tuple[str, int]] = None,
+    ) -> FakeResponse:
+        with self._lock:
+            self.requests.append(request)
+            if client is not None:
+                self.connections.add(client)
+            if self._responses:
+                return self._responses.popleft()
+
+        content = messages[-1].get("content") if messages else ""
+        if not isinstance(content, str):
+            content = json.dumps(content)
+        return FakeResponse(content=f"You said: {content}")
+
+    def _fails(self) -> bool:
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+
+def _tokens(content: str) -> list[str]:
+    words = content.split(" ")
+    return [w if i == 0 else f" {w}" for i, w in enumerate(words)] if content else []
+
+
+def _sse(events: Iterable[tuple[Optional[str], Any]]) -> list[str]:
+    return [
+        (f"event: {event}\n" if event else "") + f"data: {json.dumps(data)}\n\n"
+        for event, data in events
+    ]
+
+
+async def _stream(fake: FakeLLM, chunks: list[str]) -> AsyncIterator[str]:
+    for chunk in chunks:
+        yield chunk
+        if fake.token_latency:
+            await asyncio.sleep(fake.token_latency)
+
+
+def _openai_completion(model: str, response: FakeResponse) -> dict[str, Any]:
+    tool_calls = [
+        {
+            "id": f"call_{uuid.uuid4().hex[:24]}",
+            "type": "function",
+            "function": {"name": t.name, "arguments": json.dumps(t.arguments)},
+        }
+        for t in response.tool_calls
+    ]
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {
+                    "role": "assistant",
+                    "content": response.content or None,
+                    **({"tool_calls": tool_calls} if tool_calls else {}),
+                },
+                "finish_reason": "tool_calls" if tool_calls else "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": 10,
+            "completion_tokens": len(_tokens(response.content)) or 1,
+            "total_tokens": 10 + (len(_tokens(response.content)) or 1),
+        },
+    }
+
+
+def _openai_chunks(model: str, response: FakeResponse) -> list[str]:
+    completion = _openai_completion(model, response)
+    message = completion["choices"][0]["message"]
+
+    def chunk(delta: dict[str, Any], finish_reason: Optional[str] = None) -> Any:
+        return None, {
+            "id": completion["id"],
+            "object": "chat.completion.chunk",
+            "created": completion["created"],
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+
+    events = [chunk({"role": "assistant", "content": ""})]
+    events += [chunk({"content": token}) for token in _tokens(response.content)]
+    events += [
+        chunk({"tool_calls": [{"index": i, **tool_call}]})
+        for i, tool_call in enumerate(message.get("tool_calls", []))
+    ]
+    events.append(chunk({}, completion["choices"][0]["finish_reason"]))
+
+    return [*_sse(events), "data: [DONE]\n\n"]
+
+
+def _anthropic_message(model: str, response: FakeResponse) -> dict[str, Any]:
+    content: list[dict[str, Any]] = []
+    if response.content:
+        content.append({"type": "text", "text": response.content})
+    content += [
+        {
+            "type": "tool_use",
+            "id": f"toolu_{uuid.uuid4().hex[:24]}",
+            "name": t.name,
+            "input": t.arguments,
+        }
+        for t in response.tool_calls
+    ]
+    return {
+        "id": f"msg_{uuid.uuid4().hex[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": model,
+        "content": content,
+        "stop_reason": "tool_use" if response.tool_calls else "end_turn",
+        "stop_sequence": None,
+        "usage": {
+            "input_tokens": 10,
+            "output_tokens": len(_tokens(response.content)) or 1,
+        },
+    }
+
+
+def _anthropic_chunks(model: str, response: FakeResponse) -> list[str]:
+    message = _anthropic_message(model, response)
+
+    events: list[tuple[Optional[str], Any]] = [
+        (
+            "message_start",
+            {
+                "type": "message_start",
+                "message": {**message, "content": [], "stop_reason": None},
+            },
+        )
+    ]
+    for i, block in enumerate(message["content"]):
+        if block["type"] == "text":
+            start: dict[str, Any] = {"type": "text", "text": ""}
+            deltas = [
+                {"type": "text_delta", "text": token}
+                for token in _tokens(block["text"])
+            ]
+        else:
+            start = {**block, "input": {}}
+            deltas = [
+                {"type": "input_json_delta", "partial_json": json.dumps(block["input"])}
+            ]
+        events.append(
+            (
+                "content_block_start",
+                {"type": "content_block_start", "index": i, "content_block": start},
+            )
+        )
+        events += [
+            (
+                "content_block_delta",
+                {"type": "content_block_delta", "index": i, "delta": delta},
+            )
+            for delta in deltas
+        ]
+        events.append(
+            ("content_block_stop", {"type": "content_block_stop", "index": i})
+        )
+    events += [
+        (
+            "message_delta",
+            {
+                "type": "message_delta",
+                "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+                "usage": {"output_tokens": message["usage"]["output_tokens"]},
+            },
+        ),
+        ("message_stop", {"type": "message_stop"}),
+    ]
+
+    return _sse(events)
+
+
+def create_fake_llm_app(fake: FakeLLM) -> FastAPI:
+    app = FastAPI(title="Fake LLM")
+
+    async def openai_chat_completions(request: Request) -> Response:
+        body = await request.json()
+        client = (request.client.host, request.client.port) if request.client else None
+        response = fake._next(body, body.get("messages", []), client)
+
+        await asyncio.sleep(fake.latency)
+        if fake._fails():
+            return JSONResponse(
+                status_code=500,
+                content={
+                    "error": {"message": "Injected error", "type": "server_error"}
+                },
+            )
+
+        if body.get("stream"):
+            return StreamingResponse(
+                _stream(fake, _openai_chunks(body["model"], response)),
+                media_type="text/event-stream",
+            )
+        return JSONResponse(_openai_completion(body["model"], response))
+
+    # OpenAI and TogetherAI
+    app.post("/v1/chat/completions")(openai_chat_completions)
+    # Azure OpenAI uses the deployment name as the model
+    app.post("/openai/deployments/{deployment}/chat/completions")(
+        openai_chat_completions
+    )
+
+    @app.post("/v1/messages")
+    async def anthropic_messages(request: Request) -> Response:
+        body = await request.json()
+        client = (request.client.host, request.client.port) if request.client else None
+        response = fake._next(body, body.get("messages", []), client)
+
+        await asyncio.sleep(fake.latency)
+        if fake._fails():
+            return JSONResponse(
+                status_code=500,
+                content={
+                    "type": "error",
+                    "error": {"type": "api_error", "message": "Injected error"},
+                },
+            )
+
+        if body.get("stream"):
+            return StreamingResponse(
+                _stream(fake, _anthropic_chunks(body["model"], response)),
+                media_type="text/event-stream",
+            )
+        return JSONResponse(_anthropic_message(body["model"], response))
+
+    return app
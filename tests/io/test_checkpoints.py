@@ -0,0 +1,31 @@
+import pytest
+
+from fastagency_studio.io.checkpoints import (
+    ChatCheckpoint,
+    CheckpointStoreProtocol,
+    InMemoryCheckpointStore,
+    checkpoint_key,
+)
+
+
+def test_checkpoint_key() -> None:
+    assert checkpoint_key("u", "t") == "u.playground.t"
+    assert checkpoint_key("u", "t", "d") == "u.d.t"
+
+
+@pytest.mark.asyncio
+async def test_inmemory_checkpoint_store() -> None:
+    store = InMemoryCheckpointStore()
+    assert isinstance(store, CheckpointStoreProtocol)
+
+    assert await store.get("key") is None
+
+    checkpoint = ChatCheckpoint(inputs_received=2, state={"messages": [{"a": 1}]})
+    await store.put("key", checkpoint)
+    assert await store.get("key") == checkpoint
+
+    await store.delete("key")
+    assert await store.get("key") is None
+
+    # deleting a missing checkpoint is a no-op
+    await store.delete("key")
@@ -0,0 +1,54 @@
+import pytest
+
+from fastagency_studio.io.encoding import (
+    CONTENT_TYPE_HEADER,
+    JSON_CONTENT_TYPE,
+    MSGPACK_CONTENT_TYPE,
+    decode_message,
+    encode_message,
+    negotiate_encoding,
+)
+from fastagency_studio.io.messages import (
+    InputRequestModel,
+    InputResponseModel,
+    ServerResponseModel,
+)
+
+
+def test_json_encoding() -> None:
+    msg = InputResponseModel(msg="Hello")
+
+    payload, headers = encode_message(msg)
+
+    assert payload == b'{"msg":"Hello"}'
+    assert headers == {CONTENT_TYPE_HEADER: JSON_CONTENT_TYPE}
+    assert decode_message(InputResponseModel, payload, JSON_CONTENT_TYPE) == msg
+
+
+def test_decode_without_content_type() -> None:
+    assert decode_message(InputResponseModel, b'{"msg":"Hi"}') == InputResponseModel(
+        msg="Hi"
+    )
+
+
+def test_msgpack_encoding() -> None:
+    pytest.importorskip("msgpack")
+    msg = ServerResponseModel(
+        data=InputRequestModel(prompt="Password:", is_password=True), type="input"
+    )
+
+    payload, headers = encode_message(msg, "msgpack")
+
+    assert headers == {CONTENT_TYPE_HEADER: MSGPACK_CONTENT_TYPE}
+    assert len(payload) < len(encode_message(msg)[0])
+    assert decode_message(ServerResponseModel, payload, MSGPACK_CONTENT_TYPE) == msg
+
+
+def test_negotiate_encoding(monkeypatch: pytest.MonkeyPatch) -> None:
+    assert negotiate_encoding(None) == "json"
+    assert negotiate_encoding("json") == "json"
+
+    monkeypatch.setattr(
+        "fastagency_studio.io.encoding.is_msgpack_available", lambda: False
+    )
+    assert negotiate_encoding("msgpack") == "json"
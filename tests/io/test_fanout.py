@@ -0,0 +1,103 @@
+import asyncio
+import uuid
+
+import pytest
+from faststream.nats import NatsBroker, TestNatsBroker
+
+from fastagency_studio.io.encoding import encode_message
+from fastagency_studio.io.fanout import (
+    ChatFanOut,
+    chat_client_subject,
+    chat_server_subject,
+)
+from fastagency_studio.io.messages import (
+    InputResponseModel,
+    PrintModel,
+    ServerResponseModel,
+    TerminateModel,
+)
+
+
+def test_subjects() -> None:
+    assert chat_client_subject("u", "t") == "chat.client.messages.u.playground.t"
+    assert chat_server_subject("u", "t", "d") == "chat.server.messages.u.d.t"
+
+
+@pytest.mark.asyncio
+class TestChatFanOut:
+    async def test_listen(self) -> None:
+        broker = NatsBroker()
+        fan_out = ChatFanOut(broker)
+        user_id, thread_id, other_thread_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+        print_msg = ServerResponseModel(data=PrintModel(msg="Hello"), type="print")
+        terminate_msg = ServerResponseModel(data=TerminateModel(), type="terminate")
+
+        async with TestNatsBroker(broker) as br:
+            async with (
+                fan_out.listen(user_id, thread_id) as first,
+                fan_out.listen(user_id, thread_id) as second,
+                fan_out.listen(user_id, other_thread_id) as other,
+            ):
+                await br.publish(print_msg, chat_client_subject(user_id, thread_id))
+                await br.publish(terminate_msg, chat_client_subject(user_id, thread_id))
+
+                for queue in [first, second]:
+                    for expected in [print_msg, terminate_msg]:
+                        actual = await asyncio.wait_for(queue.get(), 1)
+                        assert actual.model_dump() == expected.model_dump()
+                assert other.empty()
+
+            assert fan_out._listeners == {}
+            await fan_out.close()
+
+    async def test_listen_msgpack(self) -> None:
+        pytest.importorskip("msgpack")
+        broker = NatsBroker()
+        fan_out = ChatFanOut(broker)
+        user_id, thread_id = uuid.uuid4(), uuid.uuid4()
+        msg = ServerResponseModel(data=PrintModel(msg="Hello"), type="print")
+
+        async with (
+            TestNatsBroker(broker) as br,
+            fan_out.listen(user_id, thread_id) as queue,
+        ):
+            payload, headers = encode_message(msg, "msgpack")
+            await br.publish(
+                payload, chat_client_subject(user_id, thread_id), headers=headers
+            )
+
+            assert await asyncio.wait_for(queue.get(), 1) == msg
+
+    async def test_slow_listener_drops_messages(self) -> None:
+        broker = NatsBroker()
+        fan_out = ChatFanOut(broker, max_queue_size=1)
+        user_id, thread_id = uuid.uuid4(), uuid.uuid4()
+
+        async with (
+            TestNatsBroker(broker) as br,
+            fan_out.listen(user_id, thread_id) as queue,
+        ):
+            for i in range(3):
+                await br.publish(
+                    ServerResponseModel(data=PrintModel(msg=f"{i}"), type="print"),
+                    chat_client_subject(user_id, thread_id),
+                )
+
+            assert queue.qsize() == 1
+            assert queue.get_nowait().data == PrintModel(msg="0")
+
+    async def test_send_input(self) -> None:
+        broker = NatsBroker()
+        fan_out = ChatFanOut(broker)
+        user_id, thread_id = uuid.uuid4(), uuid.uuid4()
+
+        @broker.subscriber(chat_server_subject(user_id, thread_id, "d"))
+        async def handle_input(body: InputResponseModel) -> None: ...
+
+        async with TestNatsBroker(broker):
+            await fan_out.send_input(
+                user_id, thread_id, InputResponseModel(msg="Hi"), "d"
+            )
+
+            handle_input.mock.assert_called_once_with({"msg": "Hi"})  # type: ignore[union-attr]
@@ -0,0 +1,448 @@
+import asyncio
+import logging
+import uuid
+from concurrent.futures import Executor
+from typing import Any, Callable, Optional
+from unittest.mock import AsyncMock
+
+import pytest
+from asyncer import asyncify, syncify
+from autogen.io.base import IOStream
+from faststream.nats import NatsMessage, TestNatsBroker
+
+import fastagency_studio.io.ionats
+from fastagency_studio.deployment_jobs import DEPLOYMENT_JOBS_SUBJECT, DeploymentWorker
+from fastagency_studio.io.app import broker
+from fastagency_studio.io.checkpoints import (
+    ChatCheckpoint,
+    InMemoryCheckpointStore,
+    checkpoint_key,
+)
+from fastagency_studio.io.encoding import (
+    CONTENT_TYPE_HEADER,
+    MSGPACK_CONTENT_TYPE,
+    Encoding,
+    decode_message,
+    encode_message,
+)
+from fastagency_studio.io.fanout import chat_client_subject, chat_server_subject
+from fastagency_studio.io.ionats import (
+    WORKER_STATUS_SUBJECT,
+    IONats,
+    InitiateModel,
+    WorkerStatusModel,
+    drain,
+    running_chats,
+)
+from fastagency_studio.io.messages import (
+    CacheInvalidationModel,
+    DeploymentJobModel,
+    InputResponseModel,
+    ServerResponseModel,
+)
+from fastagency_studio.io.metrics import InMemoryMetrics
+from fastagency_studio.models.secrets.cache import (
+    SECRET_CACHE_INVALIDATE_SUBJECT,
+    secret_cache,
+)
+
+
+def create_iostream(encoding: Encoding = "json") -> Any:
+    iostream = IONats(
+        user_id=str(uuid.uuid4()), thread_id=str(uuid.uuid4()), encoding=encoding
+    )
+    iostream.published = []  # type: ignore[attr-defined]
+    iostream.headers = []  # type: ignore[attr-defined]
+
+    async def publish(payload: bytes, subject: str, headers: dict[str, str]) -> None:
+        msg = decode_message(
+            ServerResponseModel, payload, headers.get(CONTENT_TYPE_HEADER)
+        )
+        iostream.published.append((msg.type, msg.data.msg, subject))  # type: ignore[attr-defined,union-attr]
+        iostream.headers.append(headers)  # type: ignore[attr-defined]
+
+    iostream._publisher = publish  # type: ignore[assignment]
+    return iostream
+
+
+@pytest.fixture
+def iostream() -> Any:
+    return create_iostream()
+
+
+@pytest.fixture
+def metrics(monkeypatch: pytest.MonkeyPatch) -> InMemoryMetrics:
+    metrics = InMemoryMetrics()
+    monkeypatch.setattr(fastagency_studio.io.ionats, "metrics", metrics)
+    return metrics
+
+
+# IONats is used from the worker thread running the chat
+@pytest.mark.asyncio
+class TestIONatsStreaming:
+    async def test_print(self, iostream: Any) -> None:
+        await asyncify(iostream.print)("Hello", "world", flush=True)
+
+        assert iostream.published == [
+            ("print", "Hello world\n", iostream._input_request_subject)
+        ]
+
+    async def test_deltas_are_coalesced(
+        self, iostream: Any, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        now = {"value": 100.0}
+        monkeypatch.setattr(
+            "fastagency_studio.io.ionats.time.monotonic", lambda: now["value"]
+        )
+
+        def stream_response() -> None:
+            # the first token is sent immediately
+            iostream.print("The", end="", flush=True)
+
+            # tokens arriving within the interval are buffered
+            now["value"] += IONats.DELTA_INTERVAL / 2
+            iostream.print(" weather", end="", flush=True)
+            iostream.print("", end="", flush=True)
+            iostream.print(" is", end="", flush=True)
+
+            # and sent together once the interval has passed
+            now["value"] += IONats.DELTA_INTERVAL
+            iostream.print(" sunny", end="", flush=True)
+            iostream.print(".", end="", flush=True)
+
+            # the remaining tokens are sent before any other message
+            iostream.print("Done")
+
+        await asyncify(stream_response)()
+
+        assert [(t, msg) for t, msg, _ in iostream.published] == [
+            ("delta", "The"),
+            ("delta", " weather is sunny"),
+            ("delta", "."),
+            ("print", "Done\n"),
+        ]
+
+    async def test_flush_deltas(self, iostream: Any) -> None:
+        await asyncify(iostream.flush_deltas)()
+        assert iostream.published == []
+
+        iostream._delta_buffer.append("token")
+        await asyncify(iostream.flush_deltas)()
+        assert [(t, msg) for t, msg, _ in iostream.published] == [("delta", "token")]
+
+    async def test_msgpack_encoding(self) -> None:
+        pytest.importorskip("msgpack")
+        iostream = create_iostream("msgpack")
+
+        await asyncify(iostream.print)("Hello")
+
+        assert iostream.published == [
+            ("print", "Hello\n", iostream._input_request_subject)
+        ]
+        assert iostream.headers == [{CONTENT_TYPE_HEADER: MSGPACK_CONTENT_TYPE}]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("encoding", ["json", "msgpack"])
+async def test_input(encoding: Encoding, metrics: InMemoryMetrics) -> None:
+    pytest.importorskip(encoding)
+    user_id, thread_id = uuid.uuid4(), uuid.uuid4()
+
+    async with TestNatsBroker(broker) as br:
+        iostream = await IONats.create(user_id, thread_id)
+
+        payload, headers = encode_message(InputResponseModel(msg="Hi"), encoding)
+        await br.publish(
+            payload, chat_server_subject(user_id, thread_id), headers=headers
+        )
+
+        assert await asyncify(iostream.input)("Name:") == "Hi"
+
+        await iostream.subscriber.close()
+
+    assert metrics.count("messages_total", type="input") == 1
+    assert len(metrics.values("chat_phase_duration_seconds", phase="input_wait")) == 1
+
+
+class FakeTeam:
+    def __init__(self, store: InMemoryCheckpointStore, key: str) -> None:
+        """Initialize the team."""
+        self.store = store
+        self.key = key
+        self.calls: list[tuple[str, Any]] = []
+
+    def on_checkpoint(self, callback: Callable[[dict[str, Any]], None]) -> None:
+        self.callback = callback
+
+    def on_reply_timing(self, callback: Callable[[str, float], None]) -> None:
+        self.timing_callback = callback
+
+    def initiate_chat(self, message: str) -> list[dict[str, Any]]:
+        self.callback({"messages": [message]})
+        self.timing_callback("llm", 0.5)
+        self.calls.append(("initiate_chat", syncify(self.store.get)(self.key)))
+        return []
+
+    def resume_chat(self, state: dict[str, Any]) -> list[dict[str, Any]]:
+        self.calls.append(("resume_chat", state))
+        return []
+
+
+class BlockingTeam(FakeTeam):
+    def initiate_chat(self, message: str) -> list[dict[str, Any]]:
+        self.callback({"messages": [message]})
+        IOStream.get_default().input("Waiting for a reply that never comes")
+        return []
+
+
+@pytest.mark.asyncio
+class TestInitiateHandler:
+    @pytest.mark.parametrize("resume", [False, True])
+    async def test_checkpoints(
+        self, resume: bool, monkeypatch: pytest.MonkeyPatch, metrics: InMemoryMetrics
+    ) -> None:
+        user_id, thread_id, team_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        key = checkpoint_key(user_id, thread_id)
+
+        store = InMemoryCheckpointStore()
+        if resume:
+            await store.put(
+                key, ChatCheckpoint(inputs_received=1, state={"messages": ["Hi"]})
+            )
+        team = FakeTeam(store, key)
+
+        async def create_team(team_id: uuid.UUID, user_id: uuid.UUID) -> FakeTeam:
+            return team
+
+        monkeypatch.setattr(fastagency_studio.io.ionats, "checkpoint_store", store)
+        monkeypatch.setattr(fastagency_studio.io.ionats, "create_team", create_team)
+
+        terminated = asyncio.Event()
+
+        @broker.subscriber(chat_client_subject(user_id, thread_id))
+        async def handle_message(body: ServerResponseModel) -> None:
+            if body.type == "terminate":
+                terminated.set()
+
+        async with TestNatsBroker(broker) as br:
+            await br.publish(
+                InitiateModel(
+                    user_id=user_id, thread_id=thread_id, team_id=team_id, msg="Hi"
+                ),
+                subject="chat.server.initiate_chat",
+            )
+            await asyncio.wait_for(terminated.wait(), 5)
+
+            # the checkpoint is deleted after the terminate message is sent
+            for _ in range(100):
+                if await store.get(key) is None and metrics.values(
+                    "chat_duration_seconds"
+                ):
+                    break
+                await asyncio.sleep(0.01)
+
+        if resume:
+            assert team.calls == [("resume_chat", {"messages": ["Hi"]})]
+        else:
+            assert team.calls == [
+                ("initiate_chat", ChatCheckpoint(state={"messages": ["Hi"]}))
+            ]
+        assert await store.get(key) is None
+
+        labels = {"deployment_id": "playground", "team_type": "FakeTeam"}
+        status = "resumed" if resume else "started"
+        assert metrics.count("chats_total", status=status, **labels) == 1
+        assert metrics.count("chats_total", status="completed", **labels) == 1
+        assert metrics.count("messages_total", type="terminate", **labels) == 1
+        assert len(metrics.values("chat_duration_seconds", **labels)) == 1
+        for phase in ["subscriber_setup", "create_team"]:
+            assert (
+                len(
+                    metrics.values("chat_phase_duration_seconds", phase=phase, **labels)
+                )
+                == 1
+            )
+        assert metrics.values("chat_phase_duration_seconds", phase="llm") == (
+            [] if resume else [0.5]
+        )
+
+    async def test_checkpoint_store_error(
+        self, monkeypatch: pytest.MonkeyPatch, metrics: InMemoryMetrics
+    ) -> None:
+        user_id, thread_id, team_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+        store = InMemoryCheckpointStore()
+        monkeypatch.setattr(
+            store, "get", AsyncMock(side_effect=Exception("KV store is down"))
+        )
+        monkeypatch.setattr(fastagency_studio.io.ionats, "checkpoint_store", store)
+
+        errors: list[ServerResponseModel] = []
+        received = asyncio.Event()
+
+        @broker.subscriber(chat_client_subject(user_id, thread_id))
+        async def handle_message(body: ServerResponseModel) -> None:
+            errors.append(body)
+            received.set()
+
+        async with TestNatsBroker(broker) as br:
+            await br.publish(
+                InitiateModel(
+                    user_id=user_id, thread_id=thread_id, team_id=team_id, msg="Hi"
+                ),
+                subject="chat.server.initiate_chat",
+            )
+            await asyncio.wait_for(received.wait(), 5)
+
+        # the client is told about the error instead of waiting forever
+        [error] = errors
+        assert error.type == "error"
+        assert error.data.msg == "KV store is down"  # type: ignore[union-attr]
+        assert metrics.count("chats_total", status="failed") == 1
+
+
+@pytest.mark.asyncio
+class TestDrain:
+    async def test_drain_hands_off_running_chats(
+        self, monkeypatch: pytest.MonkeyPatch, metrics: InMemoryMetrics
+    ) -> None:
+        user_id, thread_id, team_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        key = checkpoint_key(user_id, thread_id)
+
+        store = InMemoryCheckpointStore()
+
+        async def create_team(team_id: uuid.UUID, user_id: uuid.UUID) -> FakeTeam:
+            return BlockingTeam(store, key)
+
+        monkeypatch.setattr(fastagency_studio.io.ionats, "checkpoint_store", store)
+        monkeypatch.setattr(fastagency_studio.io.ionats, "create_team", create_team)
+
+        client_messages: list[str] = []
+        statuses: list[WorkerStatusModel] = []
+
+        @broker.subscriber(chat_client_subject(user_id, thread_id))
+        async def handle_message(body: ServerResponseModel) -> None:
+            client_messages.append(body.type)
+
+        @broker.subscriber(WORKER_STATUS_SUBJECT)
+        async def handle_status(body: WorkerStatusModel) -> None:
+            statuses.append(body)
+
+        async with TestNatsBroker(broker) as br:
+            await br.publish(
+                InitiateModel(
+                    user_id=user_id, thread_id=thread_id, team_id=team_id, msg="Hi"
+                ),
+                subject="chat.server.initiate_chat",
+            )
+            # wait for the chat to request an input
+            for _ in range(100):
+                if client_messages:
+                    break
+                await asyncio.sleep(0.01)
+            assert client_messages == ["input"]
+            chat = running_chats[key]
+
+            await drain(logging.getLogger(__name__), timeout=0.1)
+
+            await asyncio.wait_for(chat.task, 5)
+
+        assert chat.iostream.closed
+        assert running_chats == {}
+        assert [(s.status, s.running_chats) for s in statuses] == [
+            ("draining", 1),
+            ("stopped", 0),
+        ]
+        # the chat is resumed by another worker from its checkpoint
+        assert await store.get(key) == ChatCheckpoint(state={"messages": ["Hi"]})
+        assert client_messages == ["input"]
+        assert metrics.count("chats_total", status="handed_off") == 1
+        assert metrics.count("chats_total", status="failed") == 0
+
+    async def test_drain_waits_for_deployments(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def deploy(job: DeploymentJobModel, executor: Executor) -> None:
+            started.set()
+            await release.wait()
+
+        worker = DeploymentWorker(deploy=deploy, set_status=AsyncMock())
+        monkeypatch.setattr(fastagency_studio.io.ionats, "deployment_worker", worker)
+
+        async with TestNatsBroker(broker):
+            running = asyncio.create_task(
+                worker.handle(
+                    DeploymentJobModel(
+                        user_uuid="user",
+                        model_uuid="deployment",
+                        type_name="deployment",
+                        model_name="Deployment",
+                    ),
+                    attempt=1,
+                )
+            )
+            await started.wait()
+
+            # the thread of a deployment can't be stopped, so it is waited for
+            # after the timeout instead of being redelivered to another worker
+            draining = asyncio.create_task(
+                drain(logging.getLogger(__name__), timeout=0.01)
+            )
+            await asyncio.sleep(0.1)
+            assert not draining.done()
+
+            release.set()
+            await asyncio.wait_for(draining, 5)
+
+        assert await running is None
+
+
+@pytest.mark.asyncio
+class TestDeploymentHandler:
+    # the job is acked when done, redelivered after the delay for a retry
+    @pytest.mark.parametrize(
+        ("delay", "acks", "nack_delays"), [(None, 1, []), (30.0, 0, [30.0])]
+    )
+    async def test_deployment_handler(
+        self,
+        delay: Optional[float],
+        acks: int,
+        nack_delays: list[float],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        handle = AsyncMock(return_value=delay)
+        monkeypatch.setattr(
+            fastagency_studio.io.ionats.deployment_worker, "handle", handle
+        )
+        ack, nack = AsyncMock(), AsyncMock()
+        monkeypatch.setattr(NatsMessage, "ack", ack)
+        monkeypatch.setattr(NatsMessage, "nack", nack)
+
+        job = DeploymentJobModel(
+            user_uuid=str(uuid.uuid4()),
+            model_uuid=str(uuid.uuid4()),
+            type_name="deployment",
+            model_name="Deployment",
+        )
+        async with TestNatsBroker(broker) as br:
+            await br.publish(job, subject=DEPLOYMENT_JOBS_SUBJECT)
+
+        handle.assert_awaited_once_with(job, 1)
+        assert ack.await_count == acks
+        assert [c.kwargs["delay"] for c in nack.await_args_list] == nack_delays
+
+
+@pytest.mark.asyncio
+async def test_secret_invalidation_handler() -> None:
+    model_uuid = str(uuid.uuid4())
+    await secret_cache.get(model_uuid, AsyncMock(return_value="sk-old"))
+
+    async with TestNatsBroker(broker) as br:
+        await br.publish(
+            CacheInvalidationModel(model_uuids=[model_uuid]),
+            subject=SECRET_CACHE_INVALIDATE_SUBJECT,
+        )
+
+    assert model_uuid not in secret_cache._entries
@@ -0,0 +1,64 @@
+import pytest
+
+from fastagency_studio.io.metrics import (
+    InMemoryMetrics,
+    MetricsProtocol,
+    NoopMetrics,
+    PrometheusMetrics,
+    create_metrics,
+)
+
+LABELS = {"deployment_id": "playground", "team_type": "TwoAgentTeam"}
+
+
+def test_inmemory_metrics() -> None:
+    metrics = InMemoryMetrics()
+    assert isinstance(metrics, MetricsProtocol)
+
+    metrics.inc("chats_total", {**LABELS, "status": "started"})
+    metrics.inc("chats_total", {**LABELS, "status": "completed"})
+    metrics.inc("chats_total", {**LABELS, "status": "started"}, 2)
+    assert metrics.count("chats_total") == 4
+    assert metrics.count("chats_total", status="started") == 3
+    assert metrics.count("chats_total", team_type="MultiAgentTeam") == 0
+
+    metrics.observe("chat_phase_duration_seconds", 0.5, {**LABELS, "phase": "llm"})
+    metrics.observe("chat_phase_duration_seconds", 1.5, {**LABELS, "phase": "tool"})
+    assert metrics.values("chat_phase_duration_seconds") == [0.5, 1.5]
+    assert metrics.values("chat_phase_duration_seconds", phase="tool") == [1.5]
+
+
+def test_noop_metrics() -> None:
+    metrics = NoopMetrics()
+    assert isinstance(metrics, MetricsProtocol)
+
+    metrics.inc("chats_total", {**LABELS, "status": "started"})
+    metrics.observe("chat_duration_seconds", 1.0, LABELS)
+
+
+def test_prometheus_metrics() -> None:
+    pytest.importorskip("prometheus_client")
+    from prometheus_client import generate_latest
+
+    metrics = PrometheusMetrics()
+    assert isinstance(metrics, MetricsProtocol)
+    assert isinstance(create_metrics(), PrometheusMetrics)
+
+    metrics.inc("chats_total", {**LABELS, "status": "started"})
+    metrics.inc("messages_total", {**LABELS, "type": "delta"}, 3)
+    metrics.observe("chat_phase_duration_seconds", 0.2, {**LABELS, "phase": "llm"})
+
+    exposition = generate_latest(metrics.registry).decode()
+
+    assert (
+        'fastagency_chats_total{deployment_id="playground",status="started",team_type="TwoAgentTeam"} 1.0'
+        in exposition
+    )
+    assert (
+        'fastagency_messages_total{deployment_id="playground",team_type="TwoAgentTeam",type="delta"} 3.0'
+        in exposition
+    )
+    assert (
+        'fastagency_chat_phase_duration_seconds_bucket{deployment_id="playground",le="0.25",phase="llm",team_type="TwoAgentTeam"} 1.0'
+        in exposition
+    )
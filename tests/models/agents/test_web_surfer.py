@@ -5,7 +5,6 @@ import autogen.agentchat.contrib.web_surfer
 import pytest
 from asyncer import asyncify
 from fastagency.runtimes.autogen.tools.websurfer import WebSurferAnswer
-from fastapi import BackgroundTasks
 
 from fastagency_studio.app import add_model
 from fastagency_studio.helpers import create_autogen, get_model_by_ref
@@ -478,7 +477,6 @@ class TestBingAPIKey:
             model_name=BingAPIKey.__name__,  # type: ignore [attr-defined]
             model_uuid=api_key_model_uuid,
             model=api_key.model_dump(),
-            background_tasks=BackgroundTasks(),
         )
 
         # Call create_autogen
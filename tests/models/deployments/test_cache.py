@@ -0,0 +1,200 @@
+import asyncio
+import json
+import uuid
+from collections.abc import Iterator
+from typing import Any
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from fastagency_studio.app import app
+from fastagency_studio.db.base import DefaultDB, KeyNotFoundError
+from fastagency_studio.db.inmemory import InMemoryBackendDB, InMemoryFrontendDB
+from fastagency_studio.models.deployments.cache import (
+    DeploymentCache,
+    DeploymentInfo,
+    deployment_cache,
+)
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def backend_db() -> Iterator[InMemoryBackendDB]:
+    backend_db = InMemoryBackendDB()
+    with DefaultDB.set(backend_db=backend_db, frontend_db=InMemoryFrontendDB()):
+        yield backend_db
+
+
+async def create_deployment(backend_db: InMemoryBackendDB, user_uuid: str) -> str:
+    deployment_uuid = str(uuid.uuid4())
+    await backend_db.create_model(
+        model_uuid=deployment_uuid,
+        user_uuid=user_uuid,
+        type_name="deployment",
+        model_name="Deployment",
+        json_str=json.dumps(
+            {"name": "My SaaS", "team": {"uuid": "team-uuid", "type": "team"}}
+        ),
+    )
+    return deployment_uuid
+
+
+class TestDeploymentCache:
+    @pytest.mark.asyncio
+    async def test_get(
+        self, backend_db: InMemoryBackendDB, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        deployment_uuid = await create_deployment(backend_db, str(uuid.uuid4()))
+        find_model = AsyncMock(side_effect=backend_db.find_model)
+        monkeypatch.setattr(backend_db, "find_model", find_model)
+
+        deployments = DeploymentCache(ttl=60)
+        assert not deployments.cached(deployment_uuid)
+
+        infos = await asyncio.gather(
+            *[deployments.get(deployment_uuid) for _ in range(3)]
+        )
+        assert await deployments.get(uuid.UUID(deployment_uuid)) == infos[0]
+
+        assert infos[0].name == "My SaaS"
+        assert infos[0].team_uuid == "team-uuid"
+        assert infos == [infos[0]] * 3
+        assert deployments.cached(deployment_uuid)
+        # concurrent lookups share a single read
+        find_model.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_expired(
+        self, backend_db: InMemoryBackendDB, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        now = 1000.0
+        monkeypatch.setattr(
+            "fastagency_studio.models.deployments.cache.time.monotonic", lambda: now
+        )
+        deployment_uuid = await create_deployment(backend_db, str(uuid.uuid4()))
+
+        deployments = DeploymentCache(ttl=10)
+        info = await deployments.get(deployment_uuid)
+
+        await backend_db.update_model(
+            model_uuid=deployment_uuid,
+            user_uuid=str(uuid.uuid4()),
+            type_name="deployment",
+            model_name="Deployment",
+            json_str=json.dumps({"name": "Renamed", "team": {"uuid": "team-uuid"}}),
+        )
+        now += 9
+        assert await deployments.get(deployment_uuid) == info
+        now += 1
+        assert (await deployments.get(deployment_uuid)).name == "Renamed"
+
+    @pytest.mark.asyncio
+    async def test_cancelled(
+        self, backend_db: InMemoryBackendDB, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        deployment_uuid = await create_deployment(backend_db, str(uuid.uuid4()))
+        find_model = backend_db.find_model
+
+        async def slow_find_model(model_uuid: str) -> dict[str, Any]:
+            await asyncio.sleep(0.01)
+            return await find_model(model_uuid)
+
+        monkeypatch.setattr(backend_db, "find_model", slow_find_model)
+
+        deployments = DeploymentCache(ttl=60)
+        first = asyncio.create_task(deployments.get(deployment_uuid))
+        second = asyncio.create_task(deployments.get(deployment_uuid))
+        await asyncio.sleep(0)
+
+        # e.g. the client of the first request disconnected
+        first.cancel()
+        info = await asyncio.wait_for(second, timeout=1)
+
+        assert info.name == "My SaaS"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert deployments.cached(deployment_uuid)
+        assert not deployments._loading
+
+    @pytest.mark.asyncio
+    async def test_not_found(self, backend_db: InMemoryBackendDB) -> None:
+        deployments = DeploymentCache(ttl=60)
+
+        with pytest.raises(KeyNotFoundError):
+            await asyncio.gather(deployments.get("unknown"), deployments.get("unknown"))
+
+        assert len(deployments) == 0
+
+    @pytest.mark.asyncio
+    async def test_invalidate(self) -> None:
+        deployments = DeploymentCache(ttl=60)
+        deployments._entries = {
+            key: (DeploymentInfo(key, "team", "v1"), float("inf")) for key in "ab"
+        }
+
+        deployments.invalidate("a", uuid.uuid4())
+
+        assert not deployments.cached("a")
+        assert deployments.cached("b")
+
+
+class TestDeploymentRoutes:
+    @pytest.mark.asyncio
+    async def test_deployment_chat_after_update(
+        self, backend_db: InMemoryBackendDB
+    ) -> None:
+        user_uuid = str(uuid.uuid4())
+        deployment_uuid = await create_deployment(backend_db, user_uuid)
+
+        response = client.post(f"/deployment/{deployment_uuid}/chat")
+        assert response.status_code == 200
+        assert response.json() == {
+            "team_status": "inprogress",
+            "team_name": "My SaaS",
+            "team_uuid": "team-uuid",
+            "conversation_name": "New Chat",
+        }
+        assert deployment_cache.cached(deployment_uuid)
+
+        response = client.delete(
+            f"/user/{user_uuid}/models/deployment/{deployment_uuid}"
+        )
+        assert response.status_code == 200
+        assert not deployment_cache.cached(deployment_uuid)
+
+        response = client.post(f"/deployment/{deployment_uuid}/chat")
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_ping_ready(self, backend_db: InMemoryBackendDB) -> None:
+        deployment_uuid = await create_deployment(backend_db, str(uuid.uuid4()))
+        deployment_cache.invalidate(deployment_uuid)
+
+        response = client.get(f"/deployment/{deployment_uuid}/ping?ready=true")
+        assert response.status_code == 200
+        assert response.json() == {"status": "ok", "cache": "miss", "db": "ok"}
+
+        response = client.get(f"/deployment/{deployment_uuid}/ping?ready=true")
+        assert response.json() == {"status": "ok", "cache": "hit", "db": "skipped"}
+
+        response = client.get(f"/deployment/{uuid.uuid4()}/ping?ready=true")
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_ping_ready_db_error(
+        self, backend_db: InMemoryBackendDB, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(
+            backend_db, "find_model", AsyncMock(side_effect=ConnectionError())
+        )
+
+        response = client.get(f"/deployment/{uuid.uuid4()}/ping?ready=true")
+
+        assert response.status_code == 503
+        assert response.json() == {
+            "status": "unavailable",
+            "cache": "miss",
+            "db": "error",
+        }
@@ -41,6 +41,7 @@ class TestAnthropic:
             "base_url": "https://api.anthropic.com/v1",
             "api_type": "anthropic",
             "temperature": 0.0,
+            "response_cache": "disabled",
         }
         assert model.model_dump() == expected
 
@@ -146,6 +147,16 @@ class TestAnthropic:
                     "title": "Temperature",
                     "type": "number",
                 },
+                "response_cache": {
+                    "default": "disabled",
+                    "description": "Where to cache responses when the temperature is 0: 'disabled', 'memory' or 'sqlite'",
+                    "enum": ["disabled", "memory", "sqlite"],
+                    "metadata": {
+                        "tooltip_message": "Reuse the responses to repeated requests instead of sending them to the LLM again. Responses are cached only if the temperature is 0."
+                    },
+                    "title": "Response Cache",
+                    "type": "string",
+                },
             },
             "required": ["name", "api_key"],
             "title": "Anthropic",
@@ -182,6 +193,7 @@ class TestAnthropic:
                 }
             ],
             "temperature": 0.0,
+            "cache_seed": None,
         }
 
         assert actual_llm_config == expected
@@ -13,6 +13,7 @@ from fastagency_studio.models.llms.azure import (
     AzureOAIAPIKey,
     UrlModel,
 )
+from fastagency_studio.models.llms.client_pool import SharedHttpxClient
 
 
 def test_import(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -50,6 +51,8 @@ class TestAzureOAI:
             "api_type": "azure",
             "api_version": "2024-02-01",
             "temperature": 0.0,
+            "stream": False,
+            "response_cache": "disabled",
         }
         assert model.model_dump() == expected
 
@@ -190,6 +193,25 @@ class TestAzureOAI:
                     "title": "Temperature",
                     "type": "number",
                 },
+                "stream": {
+                    "default": False,
+                    "description": "Whether to stream the response token by token",
+                    "metadata": {
+                        "tooltip_message": "Enable streaming to see the response while it is being generated instead of waiting for the complete answer."
+                    },
+                    "title": "Stream",
+                    "type": "boolean",
+                },
+                "response_cache": {
+                    "default": "disabled",
+                    "description": "Where to cache responses when the temperature is 0: 'disabled', 'memory' or 'sqlite'",
+                    "enum": ["disabled", "memory", "sqlite"],
+                    "metadata": {
+                        "tooltip_message": "Reuse the responses to repeated requests instead of sending them to the LLM again. Responses are cached only if the temperature is 0."
+                    },
+                    "title": "Response Cache",
+                    "type": "string",
+                },
             },
             "required": ["name", "api_key"],
             "title": "AzureOAI",
@@ -216,8 +238,14 @@ class TestAzureOAI:
             user_uuid=user_uuid,
         )
         assert isinstance(actual_llm_config, dict)
+        http_client = actual_llm_config["config_list"][0].pop("http_client")
+        assert isinstance(http_client, SharedHttpxClient)
         assert (
             actual_llm_config["config_list"][0]
             == azure_gpt35_turbo_16k_llm_config["config_list"][0]
         )
-        assert actual_llm_config == azure_gpt35_turbo_16k_llm_config
+        assert actual_llm_config == {
+            **azure_gpt35_turbo_16k_llm_config,
+            "stream": False,
+            "cache_seed": None,
+        }
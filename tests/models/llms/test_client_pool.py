@@ -0,0 +1,143 @@
+import copy
+from typing import Any
+
+import httpx
+import pytest
+
+from fastagency_studio.helpers import create_autogen
+from fastagency_studio.io.metrics import InMemoryMetrics
+from fastagency_studio.models.base import ObjectReference
+from fastagency_studio.models.llms.client_pool import (
+    LLMClientPool,
+    SharedHttpxClient,
+    llm_client_pool,
+)
+
+from ...fake_llm import FakeLLM
+
+CONFIG = {
+    "model": "gpt-4o-mini",
+    "api_key": "sk-proj-fake",  # pragma: allowlist secret
+    "base_url": "https://api.openai.com/v1",
+    "api_type": "openai",
+}
+
+
+class TestLLMClientPool:
+    def test_get(self) -> None:
+        pool = LLMClientPool()
+        metrics = pool.metrics = InMemoryMetrics()
+
+        client = pool.get("openai", "https://api.openai.com/v1", "sk-proj-a")
+        assert pool.get("openai", "https://api.openai.com/v1", "sk-proj-a") is client
+
+        assert (
+            pool.get("openai", "https://api.openai.com/v1", "sk-proj-b") is not client
+        )
+        assert pool.get("azure", "https://api.openai.com/v1", "sk-proj-a") is not client
+        assert (
+            pool.get("openai", "https://api.openai.com/v1", "sk-proj-a", "2024-02-01")
+            is not client
+        )
+
+        assert len(pool) == 4
+        assert metrics.count("llm_client_pool_total", result="hit") == 1
+        assert metrics.count("llm_client_pool_total", result="miss") == 4
+
+    def test_limits(self) -> None:
+        pool = LLMClientPool(max_connections=7, keepalive_expiry=3)
+        client = pool.get(**{k: CONFIG[k] for k in ["api_type", "base_url", "api_key"]})
+
+        transport = client._transport
+        assert isinstance(transport, httpx.HTTPTransport)
+        pool_limits = transport._pool
+        assert pool_limits._max_connections == 7
+        assert pool_limits._keepalive_expiry == 3
+
+    def test_idle_eviction(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        now = 1000.0
+        monkeypatch.setattr(
+            "fastagency_studio.models.llms.client_pool.time.monotonic", lambda: now
+        )
+
+        pool = LLMClientPool(idle_timeout=60)
+        metrics = pool.metrics = InMemoryMetrics()
+
+        client = pool.get("openai", "https://api.openai.com/v1", "sk-proj-a")
+        now += 30
+        assert pool.get("openai", "https://api.openai.com/v1", "sk-proj-a") is client
+        now += 59
+        other = pool.get("openai", "https://api.openai.com/v1", "sk-proj-b")
+        assert len(pool) == 2
+
+        now += 1
+        assert pool.get("openai", "https://api.openai.com/v1", "sk-proj-b") is other
+        assert len(pool) == 1
+        assert metrics.count("llm_client_pool_total", result="evicted") == 1
+
+        # evicted clients are still usable by the agents holding them
+        assert not client.is_closed
+
+    def test_with_http_client(self) -> None:
+        pool = LLMClientPool()
+
+        config = pool.with_http_client(CONFIG)
+
+        assert config == {**CONFIG, "http_client": config["http_client"]}
+        assert isinstance(config["http_client"], SharedHttpxClient)
+        assert pool.with_http_client(CONFIG)["http_client"] is config["http_client"]
+
+    def test_disabled(self) -> None:
+        pool = LLMClientPool(enabled=False)
+
+        assert pool.with_http_client(CONFIG) == CONFIG
+        assert len(pool) == 0
+
+    def test_deepcopy(self) -> None:
+        pool = LLMClientPool()
+        llm_config: dict[str, Any] = {"config_list": [pool.with_http_client(CONFIG)]}
+
+        copied = copy.deepcopy(llm_config)
+
+        assert copied is not llm_config
+        assert (
+            copied["config_list"][0]["http_client"]
+            is llm_config["config_list"][0]["http_client"]
+        )
+
+    def test_close(self) -> None:
+        pool = LLMClientPool()
+        client = pool.get("openai", "https://api.openai.com/v1", "sk-proj-a")
+
+        pool.close()
+
+        assert client.is_closed
+        assert len(pool) == 0
+
+
+@pytest.mark.db
+class TestLLMClientPoolWithFakeLLM:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(("enabled", "connections"), [(True, 1), (False, 3)])
+    async def test_chats_reuse_connections(
+        self,
+        user_uuid: str,
+        fake_llm: FakeLLM,
+        fake_two_agent_team_ref: ObjectReference,
+        monkeypatch: pytest.MonkeyPatch,
+        enabled: bool,
+        connections: int,
+    ) -> None:
+        monkeypatch.setattr(llm_client_pool, "enabled", enabled)
+        # start with no open connections to the fake LLM
+        llm_client_pool.close()
+
+        for _ in range(3):
+            fake_llm.script("4. TERMINATE")
+            ag_team = await create_autogen(
+                model_ref=fake_two_agent_team_ref, user_uuid=user_uuid
+            )
+            ag_team.initiate_chat("What is 2 + 2?")
+
+        assert len(fake_llm.requests) == 3
+        assert len(fake_llm.connections) == connections
@@ -7,6 +7,7 @@ import pytest
 
 from fastagency_studio.helpers import get_model_by_ref
 from fastagency_studio.models.base import ObjectReference
+from fastagency_studio.models.llms.client_pool import SharedHttpxClient
 from fastagency_studio.models.llms.openai import OpenAI, OpenAIAPIKey, OpenAIModels
 from tests.helpers import get_by_tag, parametrize_fixtures
 
@@ -73,6 +74,8 @@ class TestOpenAI:
             "base_url": "https://api.openai.com/v1",
             "api_type": "openai",
             "temperature": 0.0,
+            "stream": False,
+            "response_cache": "disabled",
         }
         assert model.model_dump() == expected
 
@@ -195,6 +198,25 @@ class TestOpenAI:
                     "title": "Temperature",
                     "type": "number",
                 },
+                "stream": {
+                    "default": False,
+                    "description": "Whether to stream the response token by token",
+                    "metadata": {
+                        "tooltip_message": "Enable streaming to see the response while it is being generated instead of waiting for the complete answer."
+                    },
+                    "title": "Stream",
+                    "type": "boolean",
+                },
+                "response_cache": {
+                    "default": "disabled",
+                    "description": "Where to cache responses when the temperature is 0: 'disabled', 'memory' or 'sqlite'",
+                    "enum": ["disabled", "memory", "sqlite"],
+                    "metadata": {
+                        "tooltip_message": "Reuse the responses to repeated requests instead of sending them to the LLM again. Responses are cached only if the temperature is 0."
+                    },
+                    "title": "Response Cache",
+                    "type": "string",
+                },
             },
             "required": ["name", "api_key"],
             "title": "OpenAI",
@@ -220,6 +242,8 @@ class TestOpenAI:
             user_id=uuid.UUID(user_uuid),
         )
         assert isinstance(actual_llm_config, dict)
+        http_client = actual_llm_config["config_list"][0].pop("http_client")
+        assert isinstance(http_client, SharedHttpxClient)
         api_key = actual_llm_config["config_list"][0]["api_key"]
         model = actual_llm_config["config_list"][0]["model"]
         expected = {
@@ -232,6 +256,8 @@ class TestOpenAI:
                 }
             ],
             "temperature": 0.0,
+            "stream": False,
+            "cache_seed": None,
         }
 
         assert actual_llm_config == expected
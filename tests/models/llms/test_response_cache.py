@@ -0,0 +1,186 @@
+import copy
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from fastagency_studio.helpers import create_model_ref
+from fastagency_studio.io.metrics import InMemoryMetrics
+from fastagency_studio.models.llms.openai import OpenAI, OpenAIAPIKey
+from fastagency_studio.models.llms.response_cache import (
+    InMemoryResponseStore,
+    LLMResponseCache,
+    ModelResponseCache,
+    SQLiteResponseStore,
+    llm_response_cache,
+)
+
+from ...fake_llm import FakeLLM
+from ...helpers import add_random_suffix
+
+
+@dataclass
+class Response:
+    content: str
+    cost: float = 0.0
+
+
+class TestInMemoryResponseStore:
+    def test_lru(self) -> None:
+        store = InMemoryResponseStore(max_size=2)
+        store.set("a", b"a", 10)
+        store.set("b", b"b", 10)
+
+        assert store.get("a") == (b"a", 10)
+        store.set("c", b"c", 10)
+
+        assert len(store) == 2
+        assert store.get("b") is None
+        assert store.get("a") == (b"a", 10)
+
+
+class TestSQLiteResponseStore:
+    def test_lru(self, tmp_path: Path) -> None:
+        store = SQLiteResponseStore(tmp_path / "cache.sqlite", max_size=2)
+        store.set("a", b"a", 10)
+        store.set("b", b"b", 10)
+
+        assert store.get("a") == (b"a", 10)
+        store.set("c", b"c", 10)
+
+        assert len(store) == 2
+        assert store.get("b") is None
+        assert store.get("a") == (b"a", 10)
+
+    def test_persistent(self, tmp_path: Path) -> None:
+        store = SQLiteResponseStore(tmp_path / "cache.sqlite")
+        store.set("a", b"a", 10)
+        store.close()
+
+        store = SQLiteResponseStore(tmp_path / "cache.sqlite")
+        assert store.get("a") == (b"a", 10)
+
+        store.delete("a")
+        assert store.get("a") is None
+
+
+class TestLLMResponseCache:
+    @pytest.mark.parametrize(
+        ("backend", "temperature"),
+        [("disabled", 0.0), ("memory", 0.8), ("sqlite", 0.1)],
+    )
+    def test_llm_config_not_cached(self, backend: Any, temperature: float) -> None:
+        cache = LLMResponseCache()
+
+        assert cache.llm_config(uuid.uuid4(), backend, temperature) == {
+            "cache_seed": None
+        }
+
+    @pytest.mark.parametrize("backend", ["memory", "sqlite"])
+    def test_get_and_set(
+        self, backend: Any, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        now = 1000.0
+        monkeypatch.setattr(
+            "fastagency_studio.models.llms.response_cache.time.time", lambda: now
+        )
+
+        cache = LLMResponseCache(ttl=60, path=tmp_path / "cache.sqlite")
+        metrics = cache.metrics = InMemoryMetrics()
+        model_cache = cache.llm_config(uuid.uuid4(), backend, 0.0)["cache"]
+        assert isinstance(model_cache, ModelResponseCache)
+
+        assert model_cache.get("request") is None
+        model_cache.set("request", Response("4", cost=0.25))
+        now += 59
+        for _ in range(2):
+            # autogen enters and exits the cache on every request
+            with model_cache as c:
+                response = c.get("request")
+                assert response is not None
+                assert response.content == "4"
+
+        now += 1
+        assert model_cache.get("request", "expired") == "expired"
+
+        labels = {"backend": backend}
+        assert metrics.count("llm_response_cache_lookups_total", result="hit") == 2
+        assert metrics.count("llm_response_cache_lookups_total", result="miss") == 1
+        assert metrics.count("llm_response_cache_lookups_total", result="expired") == 1
+        assert metrics.count("llm_response_cache_saved_cost_total", **labels) == 0.5
+
+    def test_models_do_not_share_responses(self) -> None:
+        cache = LLMResponseCache()
+        a = cache.llm_config(uuid.uuid4(), "memory", 0.0)["cache"]
+        b = cache.llm_config(uuid.uuid4(), "memory", 0.0)["cache"]
+
+        a.set("request", Response("4"))
+
+        assert b.get("request") is None
+        assert len(cache.store("memory")) == 1
+
+    def test_unpicklable_response(self) -> None:
+        cache = LLMResponseCache()
+        model_cache = cache.llm_config(uuid.uuid4(), "memory", 0.0)["cache"]
+
+        model_cache.set("request", lambda: None)
+
+        assert model_cache.get("request") is None
+
+    def test_deepcopy(self) -> None:
+        cache = LLMResponseCache()
+        llm_config = cache.llm_config(uuid.uuid4(), "memory", 0.0)
+
+        assert copy.deepcopy(llm_config)["cache"] is llm_config["cache"]
+
+
+@pytest.mark.db
+class TestLLMResponseCacheWithFakeLLM:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("response_cache_backend", "temperature", "requests"),
+        [("memory", 0.0, 1), ("disabled", 0.0, 3), ("memory", 0.8, 3)],
+    )
+    async def test_repeated_requests(
+        self,
+        user_uuid: str,
+        fake_llm: FakeLLM,
+        response_cache_backend: str,
+        temperature: float,
+        requests: int,
+    ) -> None:
+        from autogen import OpenAIWrapper
+
+        api_key_ref = await create_model_ref(
+            OpenAIAPIKey,
+            "secret",
+            user_uuid=user_uuid,
+            name=add_random_suffix("fake_openai_key"),
+            api_key="sk-proj-fake",  # pragma: allowlist secret
+        )
+        llm_ref = await create_model_ref(
+            OpenAI,
+            "llm",
+            user_uuid=user_uuid,
+            name=add_random_suffix("fake_openai"),
+            model="gpt-4o-mini",
+            api_key=api_key_ref,
+            base_url=fake_llm.openai_url,
+            temperature=temperature,
+            response_cache=response_cache_backend,
+        )
+
+        llm_config = await OpenAI.create_autogen(llm_ref.uuid, uuid.UUID(user_uuid))
+        client = OpenAIWrapper(**llm_config)
+        contents = [
+            client.create(messages=[{"role": "user", "content": "What is 2 + 2?"}])
+            .choices[0]
+            .message.content
+            for _ in range(3)
+        ]
+
+        assert contents == ["You said: What is 2 + 2?"] * 3
+        assert len(fake_llm.requests) == requests
+        llm_response_cache.store("memory").clear()
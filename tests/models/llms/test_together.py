@@ -83,6 +83,7 @@ class TestTogetherAI:
             "base_url": "https://api.together.xyz/v1",
             "api_type": "togetherai",
             "temperature": 0.0,
+            "response_cache": "disabled",
         }
         assert model.model_dump() == expected
 
@@ -175,6 +176,16 @@ class TestTogetherAI:
                     "title": "Temperature",
                     "type": "number",
                 },
+                "response_cache": {
+                    "default": "disabled",
+                    "description": "Where to cache responses when the temperature is 0: 'disabled', 'memory' or 'sqlite'",
+                    "enum": ["disabled", "memory", "sqlite"],
+                    "metadata": {
+                        "tooltip_message": "Reuse the responses to repeated requests instead of sending them to the LLM again. Responses are cached only if the temperature is 0."
+                    },
+                    "title": "Response Cache",
+                    "type": "string",
+                },
             },
             "required": ["name", "api_key"],
             "title": "TogetherAI",
@@ -215,6 +226,7 @@ class TestTogetherAI:
                 }
             ],
             "temperature": 0.0,
+            "cache_seed": None,
         }
 
         assert actual_llm_config == expected
@@ -0,0 +1,174 @@
+import uuid
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from fastagency_studio.app import app
+from fastagency_studio.db.base import DefaultDB
+from fastagency_studio.helpers import create_model_ref
+from fastagency_studio.io.app import broker
+from fastagency_studio.io.messages import CacheInvalidationModel
+from fastagency_studio.io.metrics import InMemoryMetrics
+from fastagency_studio.models.llms.openai import OpenAI, OpenAIAPIKey
+from fastagency_studio.models.secrets.cache import (
+    SECRET_CACHE_INVALIDATE_SUBJECT,
+    SecretCache,
+    publish_secret_invalidation,
+    secret_cache,
+)
+
+from ...helpers import add_random_suffix
+
+client = TestClient(app)
+
+
+class TestSecretCache:
+    @pytest.mark.asyncio
+    async def test_get(self) -> None:
+        secrets = SecretCache(ttl=60)
+        metrics = secrets.metrics = InMemoryMetrics()
+        load = AsyncMock(return_value="sk-secret")  # pragma: allowlist secret
+        model_id = uuid.uuid4()
+
+        assert await secrets.get(model_id, load) == "sk-secret"
+        assert await secrets.get(str(model_id), load) == "sk-secret"
+
+        load.assert_awaited_once()
+        assert metrics.count("secret_cache_lookups_total", result="miss") == 1
+        assert metrics.count("secret_cache_lookups_total", result="hit") == 1
+
+    @pytest.mark.asyncio
+    async def test_expired(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        now = 1000.0
+        monkeypatch.setattr(
+            "fastagency_studio.models.secrets.cache.time.monotonic", lambda: now
+        )
+
+        secrets = SecretCache(ttl=60)
+        metrics = secrets.metrics = InMemoryMetrics()
+        load = AsyncMock(side_effect=["old", "new"])
+
+        assert await secrets.get("key", load) == "old"
+        now += 59
+        assert await secrets.get("key", load) == "old"
+        now += 1
+        assert await secrets.get("key", load) == "new"
+
+        assert load.await_count == 2
+        assert metrics.count("secret_cache_lookups_total", result="expired") == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate(self) -> None:
+        secrets = SecretCache(ttl=60)
+        load = AsyncMock(side_effect=["old", "new"])
+        model_id = uuid.uuid4()
+
+        assert await secrets.get(model_id, load) == "old"
+        secrets.invalidate(str(model_id), uuid.uuid4())
+        assert len(secrets) == 0
+        assert await secrets.get(model_id, load) == "new"
+
+    @pytest.mark.asyncio
+    async def test_disabled(self) -> None:
+        secrets = SecretCache(ttl=0)
+        load = AsyncMock(return_value="sk-secret")  # pragma: allowlist secret
+
+        await secrets.get("key", load)
+        await secrets.get("key", load)
+
+        assert load.await_count == 2
+        assert len(secrets) == 0
+
+    @pytest.mark.asyncio
+    async def test_max_size(self) -> None:
+        secrets = SecretCache(ttl=60, max_size=2)
+        for key in ["a", "b", "c"]:
+            await secrets.get(key, AsyncMock(return_value=key))
+
+        assert len(secrets) == 2
+        assert "a" not in secrets._entries
+
+    @pytest.mark.asyncio
+    async def test_values_are_masked(self) -> None:
+        secrets = SecretCache(ttl=60)
+        await secrets.get("key", AsyncMock(return_value="sk-secret"))
+
+        assert "sk-secret" not in repr(secrets._entries)
+        assert "sk-secret" not in str(secrets._entries)
+
+
+class TestPublishSecretInvalidation:
+    @pytest.mark.asyncio
+    async def test_publish(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        publish = AsyncMock()
+        monkeypatch.setattr(broker, "connect", AsyncMock())
+        monkeypatch.setattr(broker, "publish", publish)
+        model_id = uuid.uuid4()
+
+        await publish_secret_invalidation(model_id)
+
+        publish.assert_awaited_once_with(
+            CacheInvalidationModel(model_uuids=[str(model_id)]),
+            SECRET_CACHE_INVALIDATE_SUBJECT,
+        )
+
+    @pytest.mark.asyncio
+    async def test_publish_error(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(
+            broker, "connect", AsyncMock(side_effect=Exception("NATS is down"))
+        )
+
+        # the change is saved already, the workers catch up when the entries expire
+        await publish_secret_invalidation(uuid.uuid4())
+
+
+@pytest.mark.db
+class TestSecretCacheWithLLM:
+    @pytest.mark.asyncio
+    async def test_create_autogen_reads_secret_once(
+        self, user_uuid: str, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        key_name = add_random_suffix("openai_key")
+        api_key_ref = await create_model_ref(
+            OpenAIAPIKey,
+            "secret",
+            user_uuid=user_uuid,
+            name=key_name,
+            api_key="sk-proj-old",  # pragma: allowlist secret
+        )
+        llm_ref = await create_model_ref(
+            OpenAI,
+            "llm",
+            user_uuid=user_uuid,
+            name=add_random_suffix("openai"),
+            api_key=api_key_ref,
+        )
+
+        find_model = DefaultDB.backend().find_model
+        find_model_mock = AsyncMock(side_effect=find_model)
+        monkeypatch.setattr(DefaultDB.backend(), "find_model", find_model_mock)
+
+        for _ in range(3):
+            llm_config = await OpenAI.create_autogen(llm_ref.uuid, uuid.UUID(user_uuid))
+            assert llm_config["config_list"][0]["api_key"] == "sk-proj-old"
+
+        # the llm is read every time, the secret only once
+        read_uuids = [str(call.args[0]) for call in find_model_mock.await_args_list]
+        assert read_uuids.count(str(llm_ref.uuid)) == 3
+        assert read_uuids.count(str(api_key_ref.uuid)) == 1
+
+        # updating the secret invalidates the cache
+        response = client.put(
+            f"/user/{user_uuid}/models/secret/OpenAIAPIKey/{api_key_ref.uuid}",
+            json={"name": key_name, "api_key": "sk-proj-new"},
+        )
+        assert response.status_code == 200
+
+        llm_config = await OpenAI.create_autogen(llm_ref.uuid, uuid.UUID(user_uuid))
+        assert llm_config["config_list"][0]["api_key"] == "sk-proj-new"
+
+        # and so does deleting it
+        response = client.delete(f"/user/{user_uuid}/models/secret/{api_key_ref.uuid}")
+        assert response.status_code == 200
+        assert str(api_key_ref.uuid) not in secret_cache._entries
@@ -2,7 +2,6 @@ import uuid
 from typing import Any
 
 import pytest
-from fastapi import BackgroundTasks
 
 from fastagency_studio.app import add_model
 from fastagency_studio.models.base import Model
@@ -43,7 +42,6 @@ class TestFlyToken:
             model_name=fly_token_model.__name__,  # type: ignore [attr-defined]
             model_uuid=fly_token_model_uuid,
             model=fly_token.model_dump(),
-            background_tasks=BackgroundTasks(),
         )
 
         # Call create_autogen
@@ -2,7 +2,6 @@ import uuid
 from typing import Any
 
 import pytest
-from fastapi import BackgroundTasks
 
 from fastagency_studio.app import add_model
 from fastagency_studio.models.base import Model
@@ -43,7 +42,6 @@ class TestGitHubToken:
             model_name=gh_token_model.__name__,  # type: ignore [attr-defined]
             model_uuid=gh_token_model_uuid,
             model=gh_token.model_dump(),
-            background_tasks=BackgroundTasks(),
         )
 
         # Call create_autogen
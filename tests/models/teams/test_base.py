@@ -1,6 +1,34 @@
 import pytest
 
+from fastagency_studio.models.teams.base import time_replies
+
 
 @pytest.mark.skip(reason="Not implemented yet")
 class TestRegisterToolboxFunctions:
     pass
+
+
+class TestTimeReplies:
+    def test_time_replies(self) -> None:
+        from autogen import ConversableAgent
+
+        agent, sender = (
+            ConversableAgent(
+                name=name,
+                llm_config=False,
+                human_input_mode="NEVER",
+                default_auto_reply="done",
+            )
+            for name in ["agent", "sender"]
+        )
+
+        timings: list[tuple[str, float]] = []
+        time_replies(agent, lambda phase, seconds: timings.append((phase, seconds)))
+
+        reply = agent.generate_reply(
+            messages=[{"role": "user", "content": "Hi"}], sender=sender
+        )
+
+        assert reply == "done"
+        assert [phase for phase, _ in timings] == ["tool", "tool", "llm"]
+        assert all(seconds >= 0 for _, seconds in timings)
@@ -1,4 +1,5 @@
 import uuid
+from typing import Any, Optional
 
 import pytest
 from pydantic import ValidationError
@@ -9,7 +10,10 @@ from fastagency_studio.models.agents.web_surfer import WebSurferAgent
 from fastagency_studio.models.base import Model, ObjectReference
 from fastagency_studio.models.llms.azure import AzureOAI
 from fastagency_studio.models.llms.openai import OpenAI
-from fastagency_studio.models.teams.two_agent_teams import TwoAgentTeam
+from fastagency_studio.models.teams.two_agent_teams import (
+    AutogenTwoAgentTeam,
+    TwoAgentTeam,
+)
 from tests.helpers import get_by_tag, parametrize_fixtures
 
 
@@ -249,3 +253,62 @@ class TestTwoAgentTeamSimpleChat:
             )
             == 1
         )
+
+
+def create_scripted_team() -> AutogenTwoAgentTeam:
+    from autogen import ConversableAgent
+
+    def create_agent(name: str) -> ConversableAgent:
+        return ConversableAgent(
+            name=name,
+            llm_config=False,
+            human_input_mode="NEVER",
+        )
+
+    def reply(
+        recipient: ConversableAgent,
+        messages: list[dict[str, Any]],
+        sender: ConversableAgent,
+        config: Any,
+    ) -> tuple[bool, Optional[str]]:
+        # a None reply ends the chat
+        if len(messages) >= 5:
+            return True, None
+        return True, f"{recipient.name} {len(messages)}"
+
+    initial_agent, secondary_agent = create_agent("ping"), create_agent("pong")
+    initial_agent.register_reply(trigger=[secondary_agent], reply_func=reply)
+    secondary_agent.register_reply(trigger=[initial_agent], reply_func=reply)
+
+    return AutogenTwoAgentTeam(
+        initial_agent=initial_agent,
+        initial_agent_clients=[],
+        secondary_agent=secondary_agent,
+        secondary_agent_clients=[],
+    )
+
+
+class TestAutogenTwoAgentTeamResume:
+    @pytest.mark.parametrize("checkpoint", [0, 1, 2, 3])
+    def test_resume_chat(self, checkpoint: int) -> None:
+        team = create_scripted_team()
+        states: list[dict[str, Any]] = []
+        team.on_checkpoint(states.append)
+
+        history = team.initiate_chat("start").chat_history  # type: ignore[attr-defined]
+
+        assert [state["next_speaker"] for state in states] == [
+            "secondary_agent",
+            "initial_agent",
+            "secondary_agent",
+            "initial_agent",
+            "secondary_agent",
+        ]
+        assert [len(state["messages"]) for state in states] == [1, 2, 3, 4, 5]
+
+        resumed_team = create_scripted_team()
+        resumed_states: list[dict[str, Any]] = []
+        resumed_team.on_checkpoint(resumed_states.append)
+
+        assert resumed_team.resume_chat(states[checkpoint]) == history
+        assert resumed_states == states[checkpoint:]
@@ -1,7 +1,11 @@
+from typing import Any
+from uuid import UUID
+
 import pytest
+from pydantic import ValidationError
 
 from fastagency_studio.models.base import Model
-from fastagency_studio.models.registry import ModelSchema, Registry
+from fastagency_studio.models.registry import ModelSchema, Registry, Schemas
 
 
 class TestRegistry:
@@ -215,6 +219,75 @@ class TestRegistry:
         assert len(schemas.list_of_schemas[0].schemas) == 1
         assert schemas.list_of_schemas[0].schemas[0].name == "MyModel"
 
+    def test_get_schemas_json(self) -> None:
+        registry = Registry()
+
+        @registry.register("my_type")
+        class MyModel(Model):
+            i: int
+            s: str
+
+        content, etag = registry.get_schemas_json()
+        schemas = Schemas.model_validate_json(content)
+        assert schemas.list_of_schemas[0].schemas[0].name == "MyModel"
+        assert etag.startswith('"')
+        assert etag.endswith('"')
+
+        # cached
+        assert registry.get_schemas_json() == (content, etag)
+        assert registry.get_schemas_json()[0] is content
+
+        # invalidated on register
+        @registry.register("my_type")
+        class MyOtherModel(Model):
+            f: float
+
+        new_content, new_etag = registry.get_schemas_json()
+        assert new_etag != etag
+        assert b"MyOtherModel" in new_content
+
+    def test_validate(self) -> None:
+        registry = Registry()
+
+        @registry.register("my_type")
+        class MyModel(Model):
+            i: int
+            s: str
+
+            @classmethod
+            async def create_autogen(
+                cls, model_id: UUID, user_id: UUID, **kwargs: Any
+            ) -> Any:
+                raise NotImplementedError
+
+        expected = {"name": "x", "i": 1, "s": "s"}
+
+        model = registry.validate("my_type", "MyModel", expected)
+        assert isinstance(model, MyModel)
+        assert model.model_dump() == expected
+
+        model = registry.validate_json(
+            "my_type", "MyModel", b'{"name": "x", "i": 1, "s": "s"}'
+        )
+        assert isinstance(model, MyModel)
+        assert model.model_dump() == expected
+
+        with pytest.raises(ValidationError):
+            registry.validate_json("my_type", "MyModel", '{"name": "x", "i": "one"}')
+
+        with pytest.raises(ValueError, match="No model 'MyOtherModel' registered"):
+            registry.validate("my_type", "MyOtherModel", {})
+
+        validator = registry.get_validator("my_type", "MyModel")
+        assert registry.get_validator("my_type", "MyModel") is validator
+
+        # invalidated on register
+        @registry.register("my_type")
+        class MyOtherModel(Model):
+            f: float
+
+        assert ("my_type", "MyModel") not in registry._validators
+
     def test_get_models_refs_by_type(self) -> None:
         registry = Registry()
 
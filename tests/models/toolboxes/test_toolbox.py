@@ -1,14 +1,12 @@
 from typing import Optional
 
 import pytest
+from fastagency.api.openapi import OpenAPI
 from pydantic import BaseModel
 
 from fastagency_studio.helpers import create_autogen, get_model_by_ref
 from fastagency_studio.models.base import ObjectReference
-from fastagency_studio.models.toolboxes.toolbox import (
-    OpenAPI,
-    Toolbox,
-)
+from fastagency_studio.models.toolboxes.toolbox import Toolbox
 
 
 @pytest.mark.skip("Functionality is not implemented yet")
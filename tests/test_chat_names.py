@@ -0,0 +1,138 @@
+import asyncio
+import json
+from typing import Optional
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from fastagency_studio import chat_names
+from fastagency_studio.chat_names import (
+    ChatNamer,
+    generate_chat_names,
+    normalize_task,
+)
+
+
+async def upper(tasks: list[str]) -> list[Optional[str]]:
+    return [task.upper() for task in tasks]
+
+
+def test_normalize_task() -> None:
+    assert normalize_task("  Plan a \n trip  to Paris ") == "plan a trip to paris"
+
+
+class TestChatNamer:
+    @pytest.mark.asyncio
+    async def test_batching(self) -> None:
+        generate = AsyncMock(side_effect=upper)
+        namer = ChatNamer(generate=generate, batch_window=0.01)
+
+        names = await asyncio.gather(
+            namer.name("Plan a trip"),
+            namer.name("Write a poem"),
+            namer.name("  plan a   trip"),
+            namer.name("Fix a bug"),
+        )
+
+        assert list(names) == [
+            "PLAN A TRIP",
+            "WRITE A POEM",
+            "PLAN A TRIP",
+            "FIX A BUG",
+        ]
+        generate.assert_awaited_once_with(["Plan a trip", "Write a poem", "Fix a bug"])
+
+    @pytest.mark.asyncio
+    async def test_batch_size(self) -> None:
+        generate = AsyncMock(side_effect=upper)
+        namer = ChatNamer(generate=generate, batch_size=2, batch_window=0.01)
+
+        names = await asyncio.gather(*[namer.name(task) for task in "abc"])
+
+        assert names == ["A", "B", "C"]
+        # the first batch is sent when full, the last one after the window
+        assert [call.args[0] for call in generate.await_args_list] == [
+            ["a", "b"],
+            ["c"],
+        ]
+
+    @pytest.mark.asyncio
+    async def test_cache(self) -> None:
+        generate = AsyncMock(side_effect=upper)
+        namer = ChatNamer(generate=generate, batch_window=0, cache_size=2)
+
+        for task in ["a", "b", "a", "c"]:
+            await namer.name(task)
+
+        assert namer.cached_name("A") == "A"
+        assert namer.cached_name("b") is None
+        assert namer.cached_name("c") == "C"
+        assert generate.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_generate_error(self) -> None:
+        generate = AsyncMock(side_effect=Exception("Azure is down"))
+        namer = ChatNamer(generate=generate, batch_window=0)
+
+        assert await namer.name("a") is None
+        assert namer.cached_name("a") is None
+
+    @pytest.mark.asyncio
+    async def test_chat_name(self) -> None:
+        namer = ChatNamer(generate=upper, batch_window=0)
+
+        assert await namer.chat_name("a") == "A"
+
+    @pytest.mark.asyncio
+    async def test_chat_name_error(self) -> None:
+        generate = AsyncMock(side_effect=Exception("Azure is down"))
+        namer = ChatNamer(generate=generate, batch_window=0)
+
+        assert await namer.chat_name("a") == "a"
+
+    @pytest.mark.asyncio
+    async def test_chat_name_timeout(self) -> None:
+        async def slow_upper(tasks: list[str]) -> list[Optional[str]]:
+            await asyncio.sleep(0.05)
+            return await upper(tasks)
+
+        namer = ChatNamer(generate=slow_upper, batch_window=0, timeout=0.01)
+
+        # the chat is named after its task
+        assert await namer.chat_name("a") == "a"
+
+        # and the late name is kept for the next chat
+        await asyncio.sleep(0.1)
+        assert await namer.chat_name("a") == "A"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("names", "expected"),
+    [
+        (["Trip Planner", "Poem Writer"], ["Trip Planner", "Poem Writer"]),
+        (["Trip Planner"], ["Trip Planner", None]),
+        (["Trip Planner", "Poem Writer", "Extra"], ["Trip Planner", "Poem Writer"]),
+    ],
+)
+async def test_generate_chat_names(
+    names: list[str],
+    expected: list[Optional[str]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    tool_call = MagicMock(type="function")
+    tool_call.function.name = "generate_chat_names"
+    tool_call.function.arguments = json.dumps({"chat_names": names})
+    aclient = AsyncMock()
+    aclient.chat.completions.create.return_value = MagicMock(
+        choices=[MagicMock(message=MagicMock(tool_calls=[tool_call]))]
+    )
+    monkeypatch.setattr(
+        chat_names, "get_azure_llm_client", lambda: (aclient, "gpt-35-turbo")
+    )
+
+    generated = await generate_chat_names(["Plan a trip", "Write a poem"])
+
+    assert generated == expected
+    messages = aclient.chat.completions.create.await_args.kwargs["messages"]
+    assert "1. Plan a trip\n2. Write a poem" in messages[0]["content"]
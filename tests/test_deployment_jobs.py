@@ -0,0 +1,353 @@
+import asyncio
+import json
+import threading
+import uuid
+from collections.abc import Iterator
+from concurrent.futures import Executor
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from fastagency_studio import helpers
+from fastagency_studio.db.base import DefaultDB
+from fastagency_studio.db.inmemory import InMemoryBackendDB, InMemoryFrontendDB
+from fastagency_studio.deployment_jobs import (
+    DEPLOYMENT_JOBS_SUBJECT,
+    DeploymentWorker,
+    enqueue_deployment,
+)
+from fastagency_studio.helpers import (
+    add_model_to_user,
+    deploy_saas_app,
+    set_app_deploy_status,
+    validate_tokens_and_create_gh_repo,
+)
+from fastagency_studio.io.app import broker
+from fastagency_studio.io.messages import DeploymentJobModel
+from fastagency_studio.saas_app_generator import SaasAppGenerator
+
+
+def create_job() -> DeploymentJobModel:
+    return DeploymentJobModel(
+        user_uuid=str(uuid.uuid4()),
+        model_uuid=str(uuid.uuid4()),
+        type_name="deployment",
+        model_name="Deployment",
+    )
+
+
+class TestDeploymentWorker:
+    @pytest.mark.asyncio
+    async def test_completed(self) -> None:
+        threads: list[str] = []
+
+        async def deploy(job: DeploymentJobModel, executor: Executor) -> None:
+            await asyncio.get_running_loop().run_in_executor(
+                executor, lambda: threads.append(threading.current_thread().name)
+            )
+
+        set_status = AsyncMock()
+        worker = DeploymentWorker(deploy=deploy, set_status=set_status)
+        job = create_job()
+
+        assert await worker.handle(job, attempt=1) is None
+
+        set_status.assert_awaited_once_with(job, "completed")
+        # not in the default thread pool shared with the chats
+        assert threads[0].startswith("deployment")
+
+    @pytest.mark.asyncio
+    async def test_retry(self) -> None:
+        set_status = AsyncMock()
+        worker = DeploymentWorker(
+            deploy=AsyncMock(side_effect=Exception("GitHub is down")),
+            set_status=set_status,
+            max_attempts=3,
+            retry_delay=10,
+        )
+        job = create_job()
+
+        assert await worker.handle(job, attempt=1) == 10
+        assert await worker.handle(job, attempt=2) == 20
+        set_status.assert_not_awaited()
+
+        assert await worker.handle(job, attempt=3) is None
+        set_status.assert_awaited_once_with(job, "failed")
+
+    @pytest.mark.asyncio
+    async def test_concurrency(self) -> None:
+        running = 0
+        max_running = 0
+
+        async def deploy(job: DeploymentJobModel, executor: Executor) -> None:
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        worker = DeploymentWorker(deploy=deploy, set_status=AsyncMock(), concurrency=2)
+
+        await asyncio.gather(*[worker.handle(create_job(), 1) for _ in range(6)])
+
+        assert max_running == 2
+
+    @pytest.mark.asyncio
+    async def test_set_status_error(self) -> None:
+        worker = DeploymentWorker(
+            deploy=AsyncMock(),
+            set_status=AsyncMock(side_effect=Exception("Database is down")),
+        )
+
+        # the deployment isn't retried, it was pushed already
+        assert await worker.handle(create_job(), attempt=1) is None
+
+    @pytest.mark.asyncio
+    async def test_drain(self) -> None:
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def deploy(job: DeploymentJobModel, executor: Executor) -> None:
+            started.set()
+            await release.wait()
+
+        worker = DeploymentWorker(deploy=deploy, set_status=AsyncMock())
+        running = asyncio.create_task(worker.handle(create_job(), attempt=1))
+        await started.wait()
+
+        draining = asyncio.create_task(worker.drain(timeout=5))
+        await asyncio.sleep(0.01)
+        assert not draining.done()
+
+        # new jobs are redelivered right away to other workers
+        assert await worker.handle(create_job(), attempt=1) == 0
+
+        release.set()
+        assert await draining
+        assert await running is None
+
+    @pytest.mark.asyncio
+    async def test_drain_timeout(self) -> None:
+        started = asyncio.Event()
+
+        async def deploy(job: DeploymentJobModel, executor: Executor) -> None:
+            started.set()
+            await asyncio.Event().wait()
+
+        worker = DeploymentWorker(deploy=deploy, set_status=AsyncMock())
+        running = asyncio.create_task(worker.handle(create_job(), attempt=1))
+        await started.wait()
+
+        assert not await worker.drain(timeout=0.01)
+        running.cancel()
+
+
+@pytest.mark.asyncio
+async def test_enqueue_deployment(monkeypatch: pytest.MonkeyPatch) -> None:
+    publish = AsyncMock()
+    monkeypatch.setattr(broker, "connect", AsyncMock())
+    monkeypatch.setattr(broker, "publish", publish)
+    job = create_job()
+
+    await enqueue_deployment(job)
+
+    # published to the stream, so it is stored until a worker deploys it
+    publish.assert_awaited_once_with(job, DEPLOYMENT_JOBS_SUBJECT, stream="FastAgency")
+
+
+class TestDeploySaasApp:
+    @pytest.fixture
+    def frontend_db(self) -> InMemoryFrontendDB:
+        return InMemoryFrontendDB()
+
+    @pytest.fixture
+    def backend_db(
+        self, frontend_db: InMemoryFrontendDB
+    ) -> Iterator[InMemoryBackendDB]:
+        backend_db = InMemoryBackendDB()
+        with DefaultDB.set(backend_db=backend_db, frontend_db=frontend_db):
+            yield backend_db
+
+    async def create_deployment(
+        self, backend_db: InMemoryBackendDB, job: DeploymentJobModel
+    ) -> None:
+        tokens = {}
+        for name in ["gh_token", "fly_token"]:
+            tokens[name] = str(uuid.uuid4())
+            await backend_db.create_model(
+                model_uuid=tokens[name],
+                user_uuid=job.user_uuid,
+                type_name="secret",
+                model_name="GitHubToken" if name == "gh_token" else "FlyToken",
+                json_str=json.dumps({"name": name, name: f"{name}-value"}),
+            )
+
+        await backend_db.create_model(
+            model_uuid=job.model_uuid,
+            user_uuid=job.user_uuid,
+            type_name=job.type_name,
+            model_name=job.model_name,
+            json_str=json.dumps(
+                {
+                    "name": "My SaaS",
+                    "repo_name": "my-saas",
+                    "fly_app_name": "my-saas",
+                    "team": {"uuid": str(uuid.uuid4()), "type": "team"},
+                    "gh_token": {"uuid": tokens["gh_token"], "type": "secret"},
+                    "fly_token": {"uuid": tokens["fly_token"], "type": "secret"},
+                    "app_deploy_status": "inprogress",
+                    "gh_repo_url": "https://github.com/account/my-saas",
+                }
+            ),
+        )
+
+    @pytest.mark.asyncio
+    async def test_validate_tokens_and_create_gh_repo(
+        self, backend_db: InMemoryBackendDB, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        job = create_job()
+        await self.create_deployment(backend_db, job)
+        found_model = await backend_db.find_model(model_uuid=job.model_uuid)
+
+        threads: list[threading.Thread] = []
+        for name in ["validate_tokens", "create_new_repository"]:
+            monkeypatch.setattr(
+                SaasAppGenerator,
+                name,
+                lambda self: threads.append(threading.current_thread()),
+            )
+
+        await validate_tokens_and_create_gh_repo(
+            found_model["json_str"], job.model_uuid
+        )
+
+        # the gh and fly commands don't block the event loop of the API
+        assert len(threads) == 2
+        assert threading.main_thread() not in threads
+
+    @pytest.mark.asyncio
+    async def test_deploy_saas_app(
+        self, backend_db: InMemoryBackendDB, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        job = create_job()
+        await self.create_deployment(backend_db, job)
+
+        saas_apps: list[SaasAppGenerator] = []
+        monkeypatch.setattr(SaasAppGenerator, "is_pushed", lambda self: False)
+        monkeypatch.setattr(
+            SaasAppGenerator, "execute", lambda self: saas_apps.append(self)
+        )
+        monkeypatch.setattr(
+            helpers,
+            "create_deployment_auth_token",
+            AsyncMock(return_value=MagicMock(auth_token="auth-token")),
+        )
+
+        await deploy_saas_app(job)
+
+        [saas_app] = saas_apps
+        assert saas_app.github_token == "gh_token-value"
+        assert saas_app.fly_api_token == "fly_token-value"
+        assert saas_app.gh_repo_url == "https://github.com/account/my-saas"
+        assert saas_app.deployment_auth_token == "auth-token"
+        assert saas_app.developer_uuid == job.user_uuid
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("auth_token_stored", [False, True])
+    async def test_deploy_saas_app_revokes_auth_token(
+        self,
+        auth_token_stored: bool,
+        frontend_db: InMemoryFrontendDB,
+        backend_db: InMemoryBackendDB,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        job = create_job()
+        await frontend_db._create_user(job.user_uuid, "user@example.com", "user")
+        await self.create_deployment(backend_db, job)
+
+        def execute(self: SaasAppGenerator) -> None:
+            self.auth_token_stored = auth_token_stored
+            raise Exception("GitHub is down")
+
+        monkeypatch.setattr(SaasAppGenerator, "is_pushed", lambda self: False)
+        monkeypatch.setattr(SaasAppGenerator, "execute", execute)
+
+        with pytest.raises(Exception, match="GitHub is down"):
+            await deploy_saas_app(job)
+
+        # the retry creates a new token, the one of the failed attempt is revoked
+        # unless it was stored in the secrets of the repository already
+        auth_tokens = await backend_db.find_many_auth_token(
+            user_uuid=job.user_uuid, deployment_uuid=job.model_uuid
+        )
+        assert len(auth_tokens) == (1 if auth_token_stored else 0)
+
+    @pytest.mark.asyncio
+    async def test_deploy_saas_app_already_pushed(
+        self, backend_db: InMemoryBackendDB, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        job = create_job()
+        await self.create_deployment(backend_db, job)
+
+        execute = MagicMock()
+        create_deployment_auth_token = AsyncMock()
+        monkeypatch.setattr(SaasAppGenerator, "is_pushed", lambda self: True)
+        monkeypatch.setattr(SaasAppGenerator, "execute", execute)
+        monkeypatch.setattr(
+            helpers, "create_deployment_auth_token", create_deployment_auth_token
+        )
+
+        # a redelivered job of a pushed deployment is completed without pushing again
+        await deploy_saas_app(job)
+
+        execute.assert_not_called()
+        create_deployment_auth_token.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_add_model_to_user_enqueue_error(
+        self,
+        frontend_db: InMemoryFrontendDB,
+        backend_db: InMemoryBackendDB,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        job = create_job()
+        await frontend_db._create_user(job.user_uuid, "user@example.com", "user")
+        monkeypatch.setattr(
+            helpers,
+            "validate_tokens_and_create_gh_repo",
+            AsyncMock(return_value=MagicMock(gh_repo_url="https://github.com/my-saas")),
+        )
+        monkeypatch.setattr(
+            helpers,
+            "enqueue_deployment",
+            AsyncMock(side_effect=Exception("NATS is down")),
+        )
+
+        model = await add_model_to_user(
+            user_uuid=job.user_uuid,
+            type_name=job.type_name,
+            model_name=job.model_name,
+            model_uuid=job.model_uuid,
+            model={
+                "name": "My SaaS",
+                "repo_name": "my-saas",
+                "fly_app_name": "my-saas",
+                "team": {"uuid": str(uuid.uuid4()), "type": "team"},
+                "gh_token": {"uuid": str(uuid.uuid4()), "type": "secret"},
+                "fly_token": {"uuid": str(uuid.uuid4()), "type": "secret"},
+            },
+        )
+
+        # the deployment is created, so it is marked as failed instead of an error
+        assert model["app_deploy_status"] == "failed"
+        found_model = await backend_db.find_model(model_uuid=job.model_uuid)
+        assert found_model["json_str"]["app_deploy_status"] == "failed"
+
+    @pytest.mark.asyncio
+    async def test_set_app_deploy_status(self, backend_db: InMemoryBackendDB) -> None:
+        job = create_job()
+        await self.create_deployment(backend_db, job)
+
+        await set_app_deploy_status(job, "failed")
+
+        found_model = await backend_db.find_model(model_uuid=job.model_uuid)
+        assert found_model["json_str"]["app_deploy_status"] == "failed"
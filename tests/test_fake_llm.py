@@ -0,0 +1,166 @@
+import time
+
+import anthropic
+import openai
+import pytest
+
+from fastagency_studio.helpers import create_autogen
+from fastagency_studio.models.base import ObjectReference
+
+from .fake_llm import FakeLLM, FakeResponse, FakeToolCall
+
+
+@pytest.fixture
+def openai_client(fake_llm: FakeLLM) -> openai.OpenAI:
+    return openai.OpenAI(
+        api_key="sk-proj-fake",  # pragma: allowlist secret
+        base_url=fake_llm.openai_url,
+        max_retries=0,
+    )
+
+
+class TestFakeOpenAI:
+    def test_echo(self, fake_llm: FakeLLM, openai_client: openai.OpenAI) -> None:
+        completion = openai_client.chat.completions.create(
+            model="gpt-4o-mini", messages=[{"role": "user", "content": "Hello"}]
+        )
+
+        assert completion.choices[0].message.content == "You said: Hello"
+        assert fake_llm.requests[0]["messages"][-1]["content"] == "Hello"
+
+    def test_scripted_responses(
+        self, fake_llm: FakeLLM, openai_client: openai.OpenAI
+    ) -> None:
+        fake_llm.script("first", FakeResponse(content="second"))
+
+        contents = [
+            openai_client.chat.completions.create(
+                model="gpt-4o-mini", messages=[{"role": "user", "content": "Hi"}]
+            )
+            .choices[0]
+            .message.content
+            for _ in range(3)
+        ]
+
+        assert contents == ["first", "second", "You said: Hi"]
+
+    def test_tool_calls(self, fake_llm: FakeLLM, openai_client: openai.OpenAI) -> None:
+        fake_llm.script(
+            FakeResponse(
+                tool_calls=[
+                    FakeToolCall(name="get_weather", arguments={"city": "New York"})
+                ]
+            )
+        )
+
+        completion = openai_client.chat.completions.create(
+            model="gpt-4o-mini", messages=[{"role": "user", "content": "Weather?"}]
+        )
+
+        assert completion.choices[0].finish_reason == "tool_calls"
+        tool_calls = completion.choices[0].message.tool_calls
+        assert tool_calls is not None
+        tool_call = tool_calls[0]
+        assert tool_call.type == "function"
+        assert tool_call.function.name == "get_weather"
+        assert tool_call.function.arguments == '{"city": "New York"}'
+
+    def test_streaming(self, fake_llm: FakeLLM, openai_client: openai.OpenAI) -> None:
+        fake_llm.script("Hello there, how are you?")
+
+        stream = openai_client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "Hi"}],
+            stream=True,
+        )
+        tokens = [chunk.choices[0].delta.content or "" for chunk in stream]
+
+        assert "".join(tokens) == "Hello there, how are you?"
+        assert len(tokens) > 2
+
+    def test_latency(self, fake_llm: FakeLLM, openai_client: openai.OpenAI) -> None:
+        fake_llm.latency = 0.2
+
+        start = time.perf_counter()
+        openai_client.chat.completions.create(
+            model="gpt-4o-mini", messages=[{"role": "user", "content": "Hi"}]
+        )
+
+        assert time.perf_counter() - start >= 0.2
+
+    def test_error_injection(
+        self, fake_llm: FakeLLM, openai_client: openai.OpenAI
+    ) -> None:
+        fake_llm.error_rate = 1.0
+
+        with pytest.raises(openai.InternalServerError):
+            openai_client.chat.completions.create(
+                model="gpt-4o-mini", messages=[{"role": "user", "content": "Hi"}]
+            )
+
+    def test_azure(self, fake_llm: FakeLLM) -> None:
+        client = openai.AzureOpenAI(
+            api_key="fake",  # pragma: allowlist secret
+            azure_endpoint=fake_llm.url,
+            api_version="2024-02-01",
+            max_retries=0,
+        )
+
+        completion = client.chat.completions.create(
+            model="gpt-4o-mini", messages=[{"role": "user", "content": "Hello"}]
+        )
+
+        assert completion.choices[0].message.content == "You said: Hello"
+
+
+class TestFakeAnthropic:
+    @pytest.fixture
+    def client(self, fake_llm: FakeLLM) -> anthropic.Anthropic:
+        return anthropic.Anthropic(
+            api_key="sk-ant-fake",  # pragma: allowlist secret
+            base_url=fake_llm.anthropic_url,
+            max_retries=0,
+        )
+
+    def test_echo(self, client: anthropic.Anthropic) -> None:
+        message = client.messages.create(
+            model="claude-3-5-sonnet-20240620",
+            max_tokens=100,
+            messages=[{"role": "user", "content": "Hello"}],
+        )
+
+        assert message.content[0].type == "text"
+        assert message.content[0].text == "You said: Hello"
+
+    def test_streaming(self, fake_llm: FakeLLM, client: anthropic.Anthropic) -> None:
+        fake_llm.script("Hello there, how are you?")
+
+        with client.messages.stream(
+            model="claude-3-5-sonnet-20240620",
+            max_tokens=100,
+            messages=[{"role": "user", "content": "Hi"}],
+        ) as stream:
+            text = "".join(stream.text_stream)
+
+        assert text == "Hello there, how are you?"
+
+
+@pytest.mark.db
+class TestFakeLLMTeams:
+    @pytest.mark.asyncio
+    async def test_two_agent_team_chat(
+        self,
+        user_uuid: str,
+        fake_llm: FakeLLM,
+        fake_two_agent_team_ref: ObjectReference,
+    ) -> None:
+        fake_llm.script("2 + 2 is 4. TERMINATE")
+
+        ag_team = await create_autogen(
+            model_ref=fake_two_agent_team_ref, user_uuid=user_uuid
+        )
+        history = ag_team.initiate_chat("What is 2 + 2?")
+
+        assert history.chat_history[-1]["content"] == "2 + 2 is 4. TERMINATE"
+        assert len(fake_llm.requests) == 1
+        assert fake_llm.requests[0]["model"] == "gpt-4o-mini"
@@ -3,19 +3,19 @@ import json
 import os
 import uuid
 from datetime import datetime
-from typing import Any, Callable
+from typing import Any
 from unittest.mock import MagicMock
 
 # from autogen.agentchat import AssistantAgent, UserProxyAgent
 import autogen
 import pytest
 from autogen.io.console import IOConsole
-from fastapi import BackgroundTasks
 from faststream.nats import TestNatsBroker
 from pydantic import BaseModel
 
 import fastagency_studio.io.ionats
 from fastagency_studio.app import add_model
+from fastagency_studio.io.checkpoints import InMemoryCheckpointStore
 from fastagency_studio.io.ionats import (  # type: ignore [attr-defined]
     InputResponseModel,
     ServerResponseModel,
@@ -26,7 +26,18 @@ from fastagency_studio.models.agents.assistant import AssistantAgent
 from fastagency_studio.models.agents.user_proxy import UserProxyAgent
 from fastagency_studio.models.base import Model
 from fastagency_studio.models.llms.azure import AzureOAI, AzureOAIAPIKey
-from fastagency_studio.models.teams.two_agent_teams import TwoAgentTeam
+from fastagency_studio.models.teams.two_agent_teams import (
+    AutogenTwoAgentTeam,
+    TwoAgentTeam,
+)
+
+
+@pytest.fixture(autouse=True)
+def checkpoint_store(monkeypatch: pytest.MonkeyPatch) -> InMemoryCheckpointStore:
+    # TestNatsBroker doesn't support key-value buckets
+    store = InMemoryCheckpointStore()
+    monkeypatch.setattr(fastagency_studio.io.ionats, "checkpoint_store", store)
+    return store
 
 
 def as_dict(model: BaseModel) -> dict[str, Any]:
@@ -142,7 +153,7 @@ class TestAutogen:
 
         async def create_team(
             team_id: uuid.UUID, user_id: uuid.UUID
-        ) -> Callable[[str], list[dict[str, Any]]]:
+        ) -> AutogenTwoAgentTeam:
             weather_man = autogen.agentchat.AssistantAgent(
                 name="weather_man",
                 system_message="You are the weather man. Ask the user to give you the name of a city and then provide the weather forecast for that city.",
@@ -161,14 +172,18 @@ class TestAutogen:
                 get_forecast_for_city_mock(city)
                 return f"The weather in {city} is sunny today."
 
-            def initiate_chat(msg: str) -> list[dict[str, Any]]:
-                chat_result: list[dict[str, Any]] = weather_man.initiate_chat(
-                    recipient=user_proxy,
-                    message="Hi! Tell me the city for which you want the weather forecast.",
-                )
-                return chat_result
-
-            return initiate_chat
+            class WeatherTeam(AutogenTwoAgentTeam):
+                def initiate_chat(self, message: str) -> list[dict[str, Any]]:
+                    return super().initiate_chat(
+                        "Hi! Tell me the city for which you want the weather forecast."
+                    )
+
+            return WeatherTeam(
+                initial_agent=weather_man,
+                initial_agent_clients=[],
+                secondary_agent=user_proxy,
+                secondary_agent_clients=[],
+            )
 
         monkeypatch.setattr(fastagency_studio.io.ionats, "create_team", create_team)
 
@@ -229,9 +244,9 @@ class TestAutogen:
 
             assert len(actual) == len(expected)
             for i in range(len(expected)):
-                assert (
-                    expected[i]["msg"] in actual[i]["msg"]
-                ), f"{actual[i]} != {expected[i]}"
+                assert expected[i]["msg"] in actual[i]["msg"], (
+                    f"{actual[i]} != {expected[i]}"
+                )
 
             result_set, _ = await asyncio.wait(
                 (asyncio.create_task(terminate_chat_queue.get()),),
@@ -293,7 +308,7 @@ class TestAutogen:
 
         async def create_team(
             team_id: uuid.UUID, user_id: uuid.UUID
-        ) -> Callable[[str], list[dict[str, Any]]]:
+        ) -> AutogenTwoAgentTeam:
             raise ValueError("Triggering error in test")
 
         monkeypatch.setattr(fastagency_studio.io.ionats, "create_team", create_team)
@@ -350,7 +365,6 @@ class TestAutogen:
             model_name=api_key_model.__name__,  # type: ignore [attr-defined]
             model_uuid=api_key_model_uuid,
             model=api_key.model_dump(),
-            background_tasks=BackgroundTasks(),
         )
 
         llm = llm_model(  # type: ignore [operator]
@@ -369,7 +383,6 @@ class TestAutogen:
             model_name=llm_model.__name__,  # type: ignore [attr-defined]
             model_uuid=llm_model_uuid,
             model=llm.model_dump(),
-            background_tasks=BackgroundTasks(),
         )
 
         weatherman_assistant_model = AssistantAgent(
@@ -384,7 +397,6 @@ class TestAutogen:
             model_name=AssistantAgent.__name__,
             model_uuid=weatherman_assistant_model_uuid,
             model=weatherman_assistant_model.model_dump(),
-            background_tasks=BackgroundTasks(),
         )
 
         user_proxy_model = UserProxyAgent(
@@ -398,7 +410,6 @@ class TestAutogen:
             model_name=UserProxyAgent.__name__,
             model_uuid=user_proxy_model_uuid,
             model=user_proxy_model.model_dump(),
-            background_tasks=BackgroundTasks(),
         )
 
         team_model_uuid = str(uuid.uuid4())
@@ -419,7 +430,6 @@ class TestAutogen:
             model_name=TwoAgentTeam.__name__,
             model_uuid=team_model_uuid,
             model=team.model_dump(),
-            background_tasks=BackgroundTasks(),
         )
 
         ### begin sending inputs to server
@@ -0,0 +1,214 @@
+import os
+import time
+import zipfile
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from fastagency_studio.template_cache import (
+    GitHubTemplateSource,
+    LocalArchiveSource,
+    TemplateCache,
+    TemplateRef,
+)
+
+SHA = "a" * 40
+
+
+def create_archive(path: Path, content: str = "v1") -> Path:
+    with zipfile.ZipFile(str(path), "w") as zip_file:
+        zip_file.writestr("template-main/README.md", content)
+        zip_file.writestr("template-main/app/main.wasp", "app {}")
+    return path
+
+
+@pytest.fixture
+def archive_path(tmp_path: Path) -> Path:
+    return create_archive(tmp_path / "template.zip")
+
+
+@pytest.fixture
+def source(archive_path: Path) -> MagicMock:
+    # a local archive, with the calls recorded
+    return MagicMock(wraps=LocalArchiveSource(archive_path))
+
+
+class TestLocalArchiveSource:
+    def test_resolve(self, archive_path: Path) -> None:
+        source = LocalArchiveSource(archive_path)
+
+        ref = source.resolve("main", None)
+
+        assert ref is not None
+        assert len(ref.sha) == 64
+        assert source.resolve("dev", None) == ref
+        assert source.resolve("main", ref.etag) is None
+
+        create_archive(archive_path, content="v2")
+        new_ref = source.resolve("main", ref.etag)
+        assert new_ref is not None
+        assert new_ref.sha != ref.sha
+
+
+class TestGitHubTemplateSource:
+    def test_resolve(self) -> None:
+        requests: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            if request.headers.get("If-None-Match") == '"etag"':
+                return httpx.Response(304)
+            return httpx.Response(200, text=SHA, headers={"ETag": '"etag"'})
+
+        source = GitHubTemplateSource(
+            "https://github.com/airtai/fastagency-wasp-app-template",
+            transport=httpx.MockTransport(handler),
+        )
+
+        ref = source.resolve("main", None)
+        assert ref == TemplateRef(sha=SHA, etag='"etag"')
+        assert source.resolve("main", ref.etag) is None
+
+        assert str(requests[0].url) == (
+            "https://api.github.com/repos/airtai/fastagency-wasp-app-template/commits/main"
+        )
+        assert requests[0].headers["Accept"] == "application/vnd.github.sha"
+
+    def test_download(self, tmp_path: Path) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert (
+                request.url.path
+                == f"/airtai/fastagency-wasp-app-template/archive/{SHA}.zip"
+            )
+            return httpx.Response(200, content=b"zip")
+
+        source = GitHubTemplateSource(
+            "https://github.com/airtai/fastagency-wasp-app-template",
+            transport=httpx.MockTransport(handler),
+        )
+
+        archive_path = source.download(TemplateRef(SHA, None), tmp_path)
+
+        assert archive_path.read_bytes() == b"zip"
+
+    def test_download_error(self, tmp_path: Path) -> None:
+        source = GitHubTemplateSource(
+            "https://github.com/airtai/fastagency-wasp-app-template",
+            transport=httpx.MockTransport(lambda _: httpx.Response(404)),
+        )
+
+        with pytest.raises(Exception, match="Error downloading repository: 404"):
+            source.download(TemplateRef(SHA, None), tmp_path)
+
+
+class TestTemplateCache:
+    def test_copy_to(self, source: MagicMock, tmp_path: Path) -> None:
+        cache = TemplateCache(source, cache_dir=tmp_path / "cache", ttl=60)
+
+        for i in range(3):
+            cache.copy_to("main", tmp_path / f"deployment-{i}")
+
+        for i in range(3):
+            deployment = tmp_path / f"deployment-{i}"
+            assert (deployment / "README.md").read_text() == "v1"
+            assert (deployment / "app" / "main.wasp").exists()
+
+        # extracted once and checked once within the ttl
+        source.download.assert_called_once()
+        source.resolve.assert_called_once()
+        assert len(cache) == 1
+
+        # the deployments share the cached files
+        tree = cache.tree("main")
+        assert (tree / "README.md").samefile(tmp_path / "deployment-0" / "README.md")
+        assert (tree / "README.md").stat().st_mode & 0o222 == 0
+
+    def test_copy(self, source: MagicMock, tmp_path: Path) -> None:
+        cache = TemplateCache(source, cache_dir=tmp_path / "cache", link="copy")
+
+        cache.copy_to("main", tmp_path / "deployment")
+
+        copied = tmp_path / "deployment" / "README.md"
+        assert not copied.samefile(cache.tree("main") / "README.md")
+        copied.write_text("changed")
+        assert (cache.tree("main") / "README.md").read_text() == "v1"
+
+    def test_refresh(
+        self, archive_path: Path, source: MagicMock, tmp_path: Path
+    ) -> None:
+        cache = TemplateCache(source, cache_dir=tmp_path / "cache", ttl=0, keep=0)
+
+        tree = cache.tree("main")
+        # not modified, the etag of the cached commit is sent
+        assert cache.tree("main") == tree
+        assert source.resolve.call_args.args[1] is not None
+        source.download.assert_called_once()
+
+        create_archive(archive_path, content="v2")
+        new_tree = cache.tree("main")
+
+        assert new_tree != tree
+        assert (new_tree / "README.md").read_text() == "v2"
+        # the previous commit isn't used anymore
+        assert not tree.exists()
+        assert len(cache) == 1
+
+    def test_shared_cache_dir(self, source: MagicMock, tmp_path: Path) -> None:
+        # like the caches of two processes on the same host
+        caches = [TemplateCache(source, cache_dir=tmp_path / "cache") for _ in range(2)]
+
+        assert caches[0].tree("main") == caches[1].tree("main")
+        source.download.assert_called_once()
+
+    def test_source_unavailable(self, source: MagicMock, tmp_path: Path) -> None:
+        cache = TemplateCache(source, cache_dir=tmp_path / "cache", ttl=0)
+        tree = cache.tree("main")
+
+        source.resolve.side_effect = Exception("GitHub is down")
+
+        assert cache.tree("main") == tree
+        cache.clear()
+        with pytest.raises(Exception, match="GitHub is down"):
+            cache.tree("main")
+
+    def test_invalid_sha(self, tmp_path: Path) -> None:
+        source = MagicMock()
+        source.resolve.return_value = TemplateRef("../../etc", None)
+        cache = TemplateCache(source, cache_dir=tmp_path / "cache")
+
+        with pytest.raises(ValueError, match="Invalid commit SHA"):
+            cache.tree("main")
+
+        source.download.assert_not_called()
+
+    def test_invalidate(self, source: MagicMock, tmp_path: Path) -> None:
+        cache = TemplateCache(source, cache_dir=tmp_path / "cache", ttl=60)
+        cache.tree("main")
+
+        cache.invalidate("main", "unknown")
+        cache.tree("main")
+
+        assert source.resolve.call_count == 2
+        # the cached commit is kept
+        source.download.assert_called_once()
+
+    def test_keep(self, archive_path: Path, source: MagicMock, tmp_path: Path) -> None:
+        cache = TemplateCache(source, cache_dir=tmp_path / "cache", ttl=0, keep=60)
+        tree = cache.tree("main")
+
+        create_archive(archive_path, content="v2")
+        cache.tree("main")
+        # recently used, e.g. by a deployment still being copied
+        assert tree.exists()
+
+        past = time.time() - 120
+        os.utime(tree, (past, past))
+        create_archive(archive_path, content="v3")
+        cache.tree("main")
+        assert not tree.exists()
+
+    def test_unknown_link_mode(self, source: MagicMock) -> None:
+        with pytest.raises(ValueError, match="Unknown link mode"):
+            TemplateCache(source, link="symlink")
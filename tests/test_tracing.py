@@ -0,0 +1,191 @@
+import asyncio
+import json
+import uuid
+from pathlib import Path
+from typing import Any
+
+import pytest
+from faststream.nats import NatsMessage, TestNatsBroker
+
+import fastagency_studio.tracing
+from fastagency_studio.io.app import broker
+from fastagency_studio.models.llms.azure import AzureOAIAPIKey
+from fastagency_studio.models.registry import Registry
+from fastagency_studio.models.teams.base import trace_replies
+from fastagency_studio.tracing import (
+    configure_tracing,
+    create_exporter,
+    extract_context,
+    start_span,
+    traced,
+)
+
+pytest.importorskip("opentelemetry.sdk")
+
+from opentelemetry import trace
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+
+
+@pytest.fixture(scope="module")
+def span_exporter() -> InMemorySpanExporter:
+    # the global tracer provider can be set only once per process
+    exporter = InMemorySpanExporter()
+    configure_tracing("fastagency-studio-test", exporter=exporter)
+    return exporter
+
+
+@pytest.fixture
+def spans(span_exporter: InMemorySpanExporter) -> Any:
+    span_exporter.clear()
+
+    def finished_spans() -> tuple[ReadableSpan, ...]:
+        trace.get_tracer_provider().force_flush()  # type: ignore[attr-defined]
+        return span_exporter.get_finished_spans()
+
+    return finished_spans
+
+
+def test_configure_tracing_without_exporter(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("TRACING_EXPORTER", raising=False)
+    assert not configure_tracing("fastagency-studio-test")
+
+
+def test_start_span(spans: Any) -> None:
+    outer_span = start_span("outer", model_id=uuid.UUID(int=1), missing=None)
+    with outer_span, start_span("inner", answer=42):
+        pass
+
+    inner, outer = spans()
+    assert (inner.name, outer.name) == ("inner", "outer")
+    assert inner.parent.span_id == outer.context.span_id  # type: ignore[union-attr]
+    assert dict(outer.attributes) == {"model_id": str(uuid.UUID(int=1))}  # type: ignore[arg-type]
+    assert dict(inner.attributes) == {"answer": 42}  # type: ignore[arg-type]
+
+
+@pytest.mark.asyncio
+async def test_traced(spans: Any) -> None:
+    @traced("sync", kind="sync")
+    def f(x: int) -> int:
+        return x + 1
+
+    @traced("async")
+    async def g(x: int) -> int:
+        return f(x) * 2
+
+    assert await g(1) == 4
+
+    assert [span.name for span in spans()] == ["sync", "async"]
+
+
+def test_not_configured(spans: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(fastagency_studio.tracing, "_tracing_configured", False)
+
+    @traced("untraced")
+    def f(x: int) -> int:
+        return x + 1
+
+    with start_span("untraced") as span:
+        assert f(1) == 2
+
+    assert span is None
+    assert spans() == ()
+
+
+def test_registry_validate(spans: Any) -> None:
+    registry = Registry.get_default()
+    key = AzureOAIAPIKey(api_key="whatever", name="key")  # pragma: allowlist secret
+
+    registry.validate("secret", "AzureOAIAPIKey", key.model_dump())
+    registry.validate_json("secret", "AzureOAIAPIKey", key.model_dump_json())
+
+    assert [span.name for span in spans()] == ["registry.validate"] * 2
+
+
+def test_extract_context(spans: Any) -> None:
+    trace_id = "0af7651916cd43dd8448eb211c80319c"
+    headers = {"traceparent": f"00-{trace_id}-b7ad6b7169203331-01"}
+
+    with start_span("request", context=extract_context(headers)):
+        pass
+
+    (span,) = spans()
+    assert format(span.context.trace_id, "032x") == trace_id  # type: ignore[union-attr]
+
+
+def test_file_exporter(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setenv("TRACING_FILE", str(path))
+
+    exporter = create_exporter("file")
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    tracer = provider.get_tracer(__name__)
+    for name in ["find_model", "create_autogen"]:
+        with tracer.start_as_current_span(name):
+            pass
+    provider.shutdown()
+
+    # the file is closed with the tracer provider
+    assert exporter.out.closed  # type: ignore[attr-defined]
+
+    lines = path.read_text().splitlines()
+    assert [json.loads(line)["name"] for line in lines] == [
+        "find_model",
+        "create_autogen",
+    ]
+
+
+def test_unknown_exporter() -> None:
+    with pytest.raises(ValueError, match="Unknown tracing exporter"):
+        create_exporter("stdout")
+
+
+@pytest.mark.asyncio
+async def test_trace_context_in_nats_headers(spans: Any) -> None:
+    subject = f"test.tracing.{uuid.uuid4()}"
+    received: list[dict[str, Any]] = []
+
+    @broker.subscriber(subject)
+    async def handle(msg: NatsMessage) -> None:
+        received.append(msg.headers)
+
+    async with TestNatsBroker(broker) as br:
+        with start_span("publish") as span:
+            await br.publish("Hi", subject)
+
+        for _ in range(100):
+            if received:
+                break
+            await asyncio.sleep(0.01)
+
+    trace_id = format(span.get_span_context().trace_id, "032x")  # type: ignore[union-attr]
+    assert trace_id in received[0]["traceparent"]
+
+
+def test_trace_replies(spans: Any) -> None:
+    from autogen import ConversableAgent
+
+    agent = ConversableAgent(
+        name="agent",
+        llm_config=False,
+        human_input_mode="NEVER",
+        default_auto_reply="done",
+        function_map={"get_weather": lambda city: f"Sunny in {city}"},
+    )
+    trace_replies(agent)
+
+    agent.generate_reply(messages=[{"role": "user", "content": "Hi"}])
+    assert agent.function_map["get_weather"]("Zagreb") == "Sunny in Zagreb"
+
+    assert [
+        (span.name, dict(span.attributes))  # type: ignore[arg-type]
+        for span in spans()
+        if span.name in ["llm", "tool"]
+    ] == [
+        ("llm", {"agent": "agent"}),
+        ("tool", {"agent": "agent", "tool": "get_weather"}),
+    ]